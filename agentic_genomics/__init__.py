@@ -1 +1,8 @@
-from . import agent
+def __getattr__(name):
+    # ADK looks up `agentic_genomics.agent`; building the agent tree is deferred
+    # until then, so importing the package (e.g. by a server) stays cheap.
+    if name == "agent":
+        from . import agent
+
+        return agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,7 +1,13 @@
 
 from google.adk.agents import LlmAgent  
 from google.adk.tools import get_user_choice  
-from tools.deployment_workflow import DeploymentWorkflowTool  
+from tools.deployment_workflow import BatchDeploymentWorkflowTool, DeploymentBatchResultsTool, DeploymentWorkflowTool  
+from tools.registry import lazy_tools  
+from tools.tracing import tracer  
+  
+# Shared so single and batch runs use the same SequentialAgent.  
+deployment_workflow_tool = DeploymentWorkflowTool()  
+batch_workflow_tool = BatchDeploymentWorkflowTool(deployment_workflow_tool)  
   
 root_agent = LlmAgent(  
     name="orchestrator_agent",  
@@ -16,12 +22,20 @@ root_agent = LlmAgent(
     3.  After the `DeploymentWorkflowTool` finishes its job, it will return a final result. You must clearly report this outcome to the user.
         - If successful, provide all relevant details, such as cluster access information.
         - If it fails, clearly explain the error that occurred.
-    4.  Your interaction with the user should be high-level. Do not get involved in the details of pipeline selection or configuration; that is the job of the tools you are calling.
+        - Always give the user the `run_id`. If the `status` is not "completed", tell them which stage it stopped at (`next_stage`).
+    4.  If the user asks to retry or continue an earlier run that did not complete (e.g. after fixing a quota error), call `run_deployment_workflow` with `resume` set to its `run_id`. The stages that already completed are not repeated and the user is not asked about them again.
+    5.  If the user asks for several independent analyses at once (e.g. one per project), call `run_deployment_workflow_batch` with one request per analysis instead of calling `DeploymentWorkflowTool` repeatedly. Confirm once for the whole batch. It returns a `batch_id` at once; then call `get_deployment_batch_results` with it, passing the number of results already reported as `since`, and report each run's outcome to the user as it arrives until `done` is true.
+    6.  A deployed cluster stays up while its run holds it. When the user says their pipeline has finished or they no longer need the cluster, call `release_cluster` with the run's `run_id`; it is torn down after it has been idle for a while.
+    7.  Your interaction with the user should be high-level. Do not get involved in the details of pipeline selection or configuration; that is the job of the tools you are calling.
     """,  
     tools=[  
         get_user_choice,  
-        DeploymentWorkflowTool(),  
+        deployment_workflow_tool,  
+        batch_workflow_tool,  
+        DeploymentBatchResultsTool(batch_workflow_tool),  
+        *lazy_tools("release_cluster"),  
     ],  
     sub_agents=[  
-    ]  
+    ],  
+    **tracer.callbacks(),  
 )
\ No newline at end of file
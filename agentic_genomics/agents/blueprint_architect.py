@@ -1,6 +1,10 @@
 from google.adk.agents import LlmAgent
 from google.adk.tools import get_user_choice
-from tools.terraform_tools import CreateClusterToolkitBlueprintTool
+from tools.handoff import publish_handoffs
+from tools.registry import lazy_tools
+from tools.stage_memo import BLUEPRINT_KEY
+from tools.tracing import tracer
+from tools.workflow_runs import checkpoint_after_agent, checkpoint_before_agent
 
 
 BlueprintArchitectAgent = LlmAgent(
@@ -9,20 +13,26 @@ BlueprintArchitectAgent = LlmAgent(
     description="Generates a Terraform blueprint for provisioning a GCP cluster for Nextflow.",
     instruction="""
     You are a specialist agent that designs cloud infrastructure for running a Nextflow pipeline on Google Cloud Platform (GCP) using the official Google Cloud Cluster Toolkit.
-    Your input will be the configuration details and resource requirements from the previous agent.
+    The user's request and the run's working directory: {handoff_request?}
+    The selected pipeline: {handoff_pipeline?}
+    The pipeline configuration from the previous agent (GCP project, region and file paths): {handoff_configuration?}
 
     Your workflow is as follows:
-    1.  Analyze the input to determine the appropriate parameters for the Google Cloud Cluster Toolkit. This includes mapping high-level requirements (e.g., 'small compute cluster') to specific toolkit variables like `project_id`, `location`, `cluster_name`, machine types, etc.
-    2.  Propose the infrastructure plan to the user, summarizing the key Cluster Toolkit parameters you've chosen. Ask for approval using the `get_user_choice` tool.
-    3.  Upon approval, call the `create_cluster_toolkit_blueprint` tool. You must provide two arguments:
-        - `blueprint_path`: A temporary path for the new blueprint, for example `/tmp/gcp_cluster_toolkit_blueprint`.
-        - `toolkit_variables`: A dictionary containing the parameters you determined in step 1. Make sure that it contains values for `project_id`, `location`, and `cluster_name`. You must also include the `blueprint_path` in this dictionary.
-    4.  Your final output must be a JSON object containing the path to the generated Terraform blueprint directory, which you will get from the tool's output.
-        - Example: {"blueprint_path": "/tmp/gcp_cluster_toolkit_blueprint"}
+    1.  Analyze the input to determine the appropriate parameters for the Google Cloud Cluster Toolkit: `project_id`, `location` and `cluster_name`.
+    2.  Do not choose machine types or node counts yourself. Call the `recommend_cluster_size` tool with the pipeline, the number of `samples` from the configuration (ask the user if it has none) and the `location`, plus a `deadline_hours` or `budget_usd` if the user gave one. Use its `toolkit_variables` (machine type, node pool min/max size, Spot) as they are.
+    3.  Propose the infrastructure plan to the user, summarizing the key Cluster Toolkit parameters you've chosen and the estimated run time and cost from `recommend_cluster_size`. Ask for approval using the `get_user_choice` tool.
+    4.  Upon approval, call the `create_cluster_toolkit_blueprint` tool. You must provide two arguments:
+        - `blueprint_path`: A `blueprint` directory inside the run's working directory, for example `<work_dir>/blueprint`, so a resumed run finds it.
+        - `toolkit_variables`: A dictionary containing the parameters you determined in step 1 and the `toolkit_variables` from step 2. Make sure that it contains values for `project_id`, `location`, and `cluster_name`. You must also include the `blueprint_path` in this dictionary.
+    5.  Your final output must be a JSON object containing the path to the generated Terraform blueprint directory, which you will get from the tool's output.
+        - Example: {"blueprint_path": "<work_dir>/blueprint"}
         A resource summary is not necessary for this step, since the cost estimation will be performed in a future step, and can be inferred from the blueprint.
     """,
     tools=[
         get_user_choice,
-        CreateClusterToolkitBlueprintTool(),
+        *lazy_tools("recommend_cluster_size", "create_cluster_toolkit_blueprint"),
     ],
+    include_contents="none",
+    output_key=BLUEPRINT_KEY,
+    **tracer.callbacks(before_agent=[publish_handoffs, checkpoint_before_agent], after_agent=[checkpoint_after_agent]),
 )
@@ -1,6 +1,10 @@
 from google.adk.agents import LlmAgent
 from google.adk.tools import get_user_choice
-from tools.nextflow_tools import CreateNextflowConfigTool, CreateParamsJsonTool
+from tools.handoff import publish_handoffs
+from tools.registry import lazy_tools
+from tools.stage_memo import CONFIGURATION_KEY, configurator_memo
+from tools.tracing import tracer
+from tools.workflow_runs import checkpoint_after_agent, checkpoint_before_agent
 
 ConfiguratorAgent = LlmAgent(
     name="configurator_agent",
@@ -8,25 +12,37 @@ ConfiguratorAgent = LlmAgent(
     description="Configures a Nextflow pipeline with user-provided parameters.",
     instruction="""
     You are a specialist agent that configures a Nextflow pipeline for a specific run.
-    Your input will be the name and schema of a pipeline selected by the PipelineScoutAgent.
+    The user's request and the run's working directory: {handoff_request?}
+    The pipeline selected by the PipelineScoutAgent, with its required parameters and their types: {handoff_pipeline?}
     
     Your workflow is as follows:
-    1.  Analyze the pipeline schema to identify mandatory parameters that the user must provide (e.g., input file paths, output directory).
+    1.  Take the mandatory parameters that the user must provide (e.g., input file paths, output directory) from the `required` list above. If you need a parameter's description, default or allowed values, or want to offer optional parameters from a group, call the `get_pipeline_params` tool with the `pipeline` and `revision` joined as 'pipeline@revision' and the parameter `names` or a `group`. Only look up what you need.
     2.  Interact with the user to collect values for these mandatory parameters.
     3.  You must also ask the user for Google Cloud configuration details: the GCP Project ID, the region (e.g., 'us-central1'), and a GCS bucket path for the `workDir` (e.g., 'gs://my-bucket/work').
-    4.  Once you have all parameters, use the `get_user_choice` tool to present a summary of the configuration to the user for final approval.
-    5.  After approval, call the `create_params_json` tool with the user-provided pipeline parameters:
+    4.  If the pipeline takes an `input` samplesheet, call the `validate_samplesheet` tool with its path and the pipeline (as 'pipeline@revision'). It checks the columns and that every referenced file exists. If it is not valid, show the user the problems and the totals, ask for a corrected samplesheet and validate again. Do not continue until it passes; a bad samplesheet would otherwise only fail after the cluster has been provisioned.
+    5.  Once you have all parameters, use the `get_user_choice` tool to present a summary of the configuration to the user for final approval.
+    6.  After approval, call the `create_params_json` tool with the user-provided pipeline parameters:
         - `file_path`: The full path to `params.json` (e.g., `/tmp/your_temp_dir/params.json`).
         - `content`: The dictionary of pipeline parameters.
-    6.  Next, you must construct the content for a `nextflow.config` file that is configured for execution on Google Cloud Batch. This content MUST specify `process.executor = 'google-batch'`, the `workDir`, `google.project`, and `google.region`. It should also enable Docker.
-    7.  Call the `create_nextflow_config` tool with the generated configuration content:
+    7.  Next, call the `create_nextflow_config` tool with the configuration values. Do not write the config text yourself; the tool renders and validates it for Google Cloud Batch:
         - `file_path`: The full path to `nextflow.config` (e.g., `/tmp/your_temp_dir/nextflow.config`).
-        - `content`: The string content of the Nextflow configuration.
-    8.  Your final output must be a JSON object containing the path to the generated `nextflow.config` in the key `nextflow_config_path` and to the `params.json` in the key `params_json_path`.
+        - `project`, `region` and `work_dir`: The values the user provided.
+        - Optionally `queue_size`, `spot`, `labels` and `process_overrides` (e.g., `{'withLabel:process_high': {'cpus': 16, 'memory': '64 GB'}}`) if the user asked for them.
+    8.  If the tool reports an error, fix the offending value (ask the user if needed) and call it again.
+    9.  Call the `register_nextflow_run` tool with the pipeline (as 'pipeline@revision') and the paths of `params.json` and `nextflow.config`. Tell the user where the run's task files go (`work_dir_note`). If an earlier run had the same or similar params, it returns a `launch_command` with `-resume`; tell the user which run is resumed, which params changed and which processes will be reused or re-run (`reuse`). Use the `work_dir` it returns from here on.
+    10. Your final output must be a JSON object containing the path to the generated `nextflow.config` in the key `nextflow_config_path`, the path to the `params.json` in the key `params_json_path`, the `project`, `region` and `work_dir` you used, the number of samples (the `rows` reported by `validate_samplesheet`) in the key `samples`, and the `run_id` and `launch_command` returned by `register_nextflow_run`.
     """,
     tools=[
         get_user_choice,
-        CreateNextflowConfigTool(),
-        CreateParamsJsonTool(),
+        *lazy_tools("get_pipeline_params", "validate_samplesheet", "create_nextflow_config", "create_params_json",
+                    "register_nextflow_run"),
     ],
+    # The earlier stages reach this agent as the compact handoffs in the
+    # instruction, not as their full conversation.
+    include_contents="none",
+    # Repeat requests for the same pipeline revision and schema reuse the cached
+    # params.json and nextflow.config instead of calling the model.
+    output_key=CONFIGURATION_KEY,
+    **tracer.callbacks(before_agent=[publish_handoffs, checkpoint_before_agent, configurator_memo.before_agent],
+                       after_agent=[configurator_memo.after_agent, checkpoint_after_agent]),
 )
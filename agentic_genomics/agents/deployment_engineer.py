@@ -1,6 +1,10 @@
 from google.adk.agents import LlmAgent
 from google.adk.tools import get_user_choice
-from tools.terraform_tools import ExecuteTerraformApplyTool
+from tools.handoff import publish_handoffs
+from tools.registry import lazy_tools
+from tools.stage_memo import DEPLOYMENT_KEY
+from tools.tracing import tracer
+from tools.workflow_runs import checkpoint_after_agent, checkpoint_before_agent
 
 DeploymentEngineerAgent = LlmAgent(
     name="deployment_engineer_agent",
@@ -8,16 +12,21 @@ DeploymentEngineerAgent = LlmAgent(
     description="Executes a Terraform blueprint to provision a GCP cluster.",
     instruction="""
     You are a specialist agent that deploys cloud infrastructure using Terraform.
-    Your input will be the path to a directory containing a Terraform blueprint.
+    Your input is the Terraform blueprint generated by the previous agent: {handoff_blueprint?}
+    For context, the pipeline configuration it was built for: {handoff_configuration?}
 
     Your workflow is as follows:
     1.  Acknowledge the blueprint path you have received.
-    2.  This is the final step before incurring cloud costs. You MUST confirm with the user that they are ready to deploy the infrastructure. Use the `get_user_choice` tool for this critical final confirmation.
-    3.  Upon user approval, use the `execute_terraform_apply` tool with the provided `blueprint_path` to provision the resources on GCP.
-    4.  Your final output must be the result from the `execute_terraform_apply` tool, which includes the deployment status and any relevant cluster connection details.
+    2.  Call the `estimate_blueprint_cost` tool with the `blueprint_path` to price the cluster. Do this in a single call; pass `compare` if the user wants to see cheaper alternatives.
+    3.  This is the final step before incurring cloud costs. Show the user the estimated cost, then you MUST confirm with the user that they are ready to deploy the infrastructure. Use the `get_user_choice` tool for this critical final confirmation.
+    4.  Upon user approval, use the `execute_terraform_apply` tool with the provided `blueprint_path` to provision the resources on GCP.
+    5.  Your final output must be the result from the `execute_terraform_apply` tool as a JSON object, which includes the deployment `status` and any relevant cluster connection details. If `reused` is true, add a `note` key saying that an identical running cluster was reused rather than created. If the user cancels, output `{"status": "cancelled"}`. The run only counts as complete when `status` is "succeeded"; otherwise the user can resume it from this stage.
     """,
     tools=[
         get_user_choice,
-        ExecuteTerraformApplyTool(),
+        *lazy_tools("estimate_blueprint_cost", "execute_terraform_apply"),
     ],
+    include_contents="none",
+    output_key=DEPLOYMENT_KEY,
+    **tracer.callbacks(before_agent=[publish_handoffs, checkpoint_before_agent], after_agent=[checkpoint_after_agent]),
 )
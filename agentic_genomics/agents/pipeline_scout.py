@@ -1,6 +1,9 @@
 from google.adk.agents import LlmAgent
 from google.adk.tools import get_user_choice
-from tools.nf_core_tools import ListNfCorePipelinesTool, GetPipelineSchemaTool
+from tools.registry import lazy_tools
+from tools.stage_memo import PIPELINE_SELECTION_KEY, pin_pipeline_selection, pipeline_scout_memo
+from tools.tracing import tracer
+from tools.workflow_runs import checkpoint_after_agent, checkpoint_before_agent
 
 PipelineScoutAgent = LlmAgent(
     name="pipeline_scout_agent",
@@ -9,15 +12,18 @@ PipelineScoutAgent = LlmAgent(
     instruction="""
     You are a specialist agent that identifies suitable nf-core pipelines based on a user's genomic analysis request.
     1.  Analyze the user's request to understand the type of analysis needed (e.g., 'RNA-Seq analysis', 'variant calling').
-    2.  Use the `list_nf_core_pipelines` tool to see available pipelines.
-    3.  Based on the user's request and the pipeline list, identify one or more suitable pipelines.
+    2.  Use the `search_nf_core_pipelines` tool with a short keyword query (e.g. 'rna-seq gene expression') to get the best matching pipelines. Search again with different keywords if nothing fits.
+    3.  Based on the user's request and the search results, identify one or more suitable pipelines.
     4.  If you find multiple good candidates, present them to the user with brief descriptions and ask them to confirm their choice using the `get_user_choice` tool.
-    5.  Once a single pipeline is selected, use the `get_pipeline_schema` tool to retrieve its details.
-    6.  Your final output must be a clear statement of the selected pipeline's name and its schema, which will be passed to the next agent. For example: "Selected pipeline: nf-core/rnaseq. Schema: [schema details]".
+    5.  Once a single pipeline is selected, use the `get_pipeline_schema` tool to confirm it exists and to get its release (the `revision` field). Only pass `revision` if the user asked for a specific release or branch (e.g. 'dev'); without it the tool returns the latest release.
+    6.  Your final output must be a single line naming the selected pipeline and release, for example: "Selected pipeline: nf-core/rnaseq@3.14.0". Use the `revision` the tool returned: the latest release tag, or the release or branch the user asked for. Do not repeat the schema; the next agents receive a digest of it automatically.
     """,
     tools=[
         get_user_choice,
-        ListNfCorePipelinesTool(),
-        GetPipelineSchemaTool(),
+        *lazy_tools("search_nf_core_pipelines", "get_pipeline_schema"),
     ],
+    # Repeat requests reuse the cached selection instead of calling the model.
+    output_key=PIPELINE_SELECTION_KEY,
+    **tracer.callbacks(before_agent=[checkpoint_before_agent, pipeline_scout_memo.before_agent],
+                       after_agent=[pin_pipeline_selection, pipeline_scout_memo.after_agent, checkpoint_after_agent]),
 )
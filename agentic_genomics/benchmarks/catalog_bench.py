@@ -0,0 +1,65 @@
+"""
+Compares the tool payload and lookup latency of the full nf-core catalog dump
+(`list_nf_core_pipelines`) against ranked search (`search_nf_core_pipelines`).
+
+Run from the `agentic_genomics/` directory:
+
+    python -m benchmarks.catalog_bench
+"""
+import json
+import tempfile
+import timeit
+from pathlib import Path
+
+from tools.nf_core_catalog import SNAPSHOT_PATH, NfCoreCatalog
+
+# The real catalog has 100+ pipelines; pad the bundled snapshot up to that size
+# with entries whose description length matches the real ones.
+CATALOG_SIZE = 120
+QUERIES = [
+    "RNA-Seq on GRCh38, paired-end",
+    "somatic variant calling",
+    "single cell rna",
+    "shotgun metagenomics taxonomic profiling",
+]
+
+
+def build_catalog(work_dir: Path) -> NfCoreCatalog:
+    snapshot = json.loads(SNAPSHOT_PATH.read_text())
+    workflows = snapshot["remote_workflows"]
+    for i in range(CATALOG_SIZE - len(workflows)):
+        workflows.append({
+            "full_name": f"nf-core/synthetic{i}",
+            "description": f"Synthetic workflow {i} for benchmarking: quality control, trimming, "
+                           "alignment, quantification and reporting of sequencing data with MultiQC summaries",
+            "topics": [f"topic{i % 17}", "sequencing", "workflow", "benchmark"],
+        })
+    snapshot_path = work_dir / "pipelines.json"
+    snapshot_path.write_text(json.dumps(snapshot))
+    catalog = NfCoreCatalog(cache_path=work_dir / "catalog.json", offline=True)
+    catalog.load_snapshot(snapshot_path)
+    return catalog
+
+
+def full_dump(catalog: NfCoreCatalog) -> str:
+    # Same payload ListNfCorePipelinesTool returns.
+    return json.dumps([{"name": p["name"], "description": p["description"]} for p in catalog.pipelines])
+
+
+def main(number: int = 2000):
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = build_catalog(Path(tmp))
+        dump_bytes = len(full_dump(catalog))
+        dump_us = timeit.timeit(lambda: full_dump(catalog), number=number) / number * 1e6
+        print(f"catalog size: {len(catalog.pipelines)} pipelines")
+        print(f"{'full dump':<45} {dump_bytes:>8} bytes {dump_us:>9.1f} us")
+        for query in QUERIES:
+            payload = json.dumps(catalog.search(query, top_k=3))
+            search_us = timeit.timeit(lambda: json.dumps(catalog.search(query, top_k=3)), number=number) / number * 1e6
+            print(f"search {query!r:<38} {len(payload):>8} bytes {search_us:>9.1f} us "
+                  f"({dump_bytes / len(payload):.0f}x smaller)")
+            print(f"    -> {[r['name'] for r in json.loads(payload)]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Times getting a cluster for a blueprint through the cluster pool against the
+fake terraform binary: a cold apply, a reuse of the running cluster (with and
+without a `terraform plan` health check), concurrent identical requests, and
+the idle teardown.
+
+The fake apply takes `--apply-s` seconds; a real GKE apply takes 10-20 min,
+and a plan well under one.
+
+Run from the `agentic_genomics/` directory:
+
+    python -m benchmarks.cluster_pool_bench [--apply-s 2] [--concurrent 8]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.harness import isolate, report
+
+# The module block of tools/terraform_tools.py's template, which needs ADK to import.
+MAIN_TF = """
+module "gke_cluster" {
+  source  = "GoogleCloudPlatform/cluster-toolkit/google//modules/gke"
+  version = "2.0.0"
+}
+""".strip()
+
+
+def _blueprint(root: Path, name: str) -> str:
+    from tools.tfvars import render_tfvars
+
+    path = root / name
+    path.mkdir()
+    (path / "main.tf").write_text(MAIN_TF)
+    (path / "terraform.tfvars").write_text(render_tfvars({
+        "project_id": "bench-project", "location": "us-central1", "cluster_name": "bench-cluster",
+        "blueprint_path": str(path),
+    }))
+    return str(path)
+
+
+async def _timed(coro) -> tuple[float, dict]:
+    started = time.perf_counter()
+    result = await coro
+    return time.perf_counter() - started, result
+
+
+async def run(root: Path, concurrent: int) -> dict:
+    import tools.cluster_pool as cluster_pool
+    from tools.cluster_pool import ClusterPool
+    from tools.terraform_runner import apply_blueprint
+
+    cluster_pool.POLL_INTERVAL_SECONDS = 0.1
+    pool = ClusterPool(path=root / "pool", idle_ttl_seconds=0)
+    cold_s, cold = await _timed(pool.lease(_blueprint(root, "cold"), apply_blueprint))
+    reuse_s, reused = await _timed(pool.lease(_blueprint(root, "reuse"), apply_blueprint))
+    cluster_pool.HEALTH_CHECK_MAX_AGE_SECONDS = 0
+    checked_s, checked = await _timed(pool.lease(_blueprint(root, "checked"), apply_blueprint))
+    assert not cold["reused"] and reused["reused"] and checked["reused"]
+    for result in (cold, reused, checked):
+        pool.release(result["lease_id"])
+    teardown_s, destroyed = await _timed(pool.reap_idle())
+
+    # Identical requests at once: one applies, the rest wait for it and share the cluster.
+    paths = [_blueprint(root, f"concurrent_{i}") for i in range(concurrent)]
+    concurrent_s, results = await _timed(asyncio.gather(*(pool.lease(path, apply_blueprint) for path in paths)))
+    return {
+        "cluster_pool.cold_apply.s": cold_s,
+        "cluster_pool.reuse.s": reuse_s,
+        "cluster_pool.reuse_with_plan.s": checked_s,
+        "cluster_pool.teardown.s": teardown_s,
+        "cluster_pool.teardown.clusters": len(destroyed),
+        f"cluster_pool.concurrent_{concurrent}.s": concurrent_s,
+        f"cluster_pool.concurrent_{concurrent}.applies": sum(not r["reused"] for r in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--apply-s", type=float, default=2.0)
+    parser.add_argument("--concurrent", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ag_cluster_pool_bench_") as tmp:
+        os.environ["FAKE_TERRAFORM_APPLY_DELAY"] = str(args.apply_s)
+        isolate(Path(tmp))
+        report(asyncio.run(run(Path(tmp), args.concurrent)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Times pricing a grid of cluster configurations with the vectorized cost engine
+against pricing them one at a time, as repeated per-SKU lookups would.
+
+Run from the `agentic_genomics/` directory:
+
+    python -m benchmarks.cost_bench
+"""
+import time
+
+from tools.cost_engine import cost_grid, get_sku_index, parse_machine_type
+
+MACHINE_TYPES = [f"{family}-{shape}-{vcpus}" for family in ("n2", "e2", "n2d")
+                 for shape in ("standard", "highmem") for vcpus in (4, 8)] + ["c2-standard-4", "c2-standard-8"]
+NODE_COUNTS = list(range(1, 17))
+REGIONS = ["us-central1", "europe-west1", "asia-southeast1"]
+HOURS = [6, 12, 24, 48, 96, 168]
+DISK_SIZE_GB = 100
+
+
+def scalar_prices() -> list[float]:
+    # One config at a time, with separate CPU, RAM and disk price lookups per config.
+    index = get_sku_index()
+    totals = []
+    for machine_type in MACHINE_TYPES:
+        family, vcpus, memory = parse_machine_type(machine_type)
+        for nodes in NODE_COUNTS:
+            for region in REGIONS:
+                for hours in HOURS:
+                    f, r = index.family_index(family), index.region_index(region)
+                    cpu = index.cpu["ondemand"][f, r]
+                    ram = index.ram["ondemand"][f, r]
+                    disk = index.disk["pd-standard"][r]
+                    node = vcpus * cpu + memory * ram + DISK_SIZE_GB * disk
+                    totals.append((nodes * node + index.cluster_fee[r]) * hours)
+    return totals
+
+
+def main(repeat: int = 20):
+    get_sku_index()  # Load the snapshot outside the timed region.
+    configurations = len(MACHINE_TYPES) * len(NODE_COUNTS) * len(REGIONS) * len(HOURS)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        grid = cost_grid(MACHINE_TYPES, NODE_COUNTS, REGIONS, HOURS, disk_size_gb=DISK_SIZE_GB)
+        grid.cheapest(5)
+    vector_ms = (time.perf_counter() - start) / repeat * 1e3
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        totals = scalar_prices()
+    scalar_ms = (time.perf_counter() - start) / repeat * 1e3
+
+    assert abs(sum(totals) - float(grid.usd.sum())) < 1e-6 * sum(totals)
+    print(f"configurations: {configurations}")
+    print(f"vectorized grid + top-5: {vector_ms:8.2f} ms")
+    print(f"one config at a time:    {scalar_ms:8.2f} ms  ({scalar_ms / vector_ms:.0f}x slower)")
+    print(f"per-SKU tool calls the old GetSkuPriceTool would have needed: {configurations * 3}")
+    print(f"cheapest: {grid.cheapest(3)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Runs the whole agent tree end to end: root_agent -> DeploymentWorkflowTool ->
+the four specialist agents, with the stub model, scripted user choices and
+the fake terraform binary. Reports per-stage latency, model tokens, tool
+payload sizes and memory from the tracing spans.
+
+The first run is cold; repeat runs of the same request hit the stage result
+cache, as a user re-running an analysis would.
+
+Run from the `agentic_genomics/` directory:
+
+    python -m benchmarks.e2e_bench [--runs 5] [--model-latency 0.5]
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.harness import isolate, report
+
+REQUEST = "I need to run an RNA-Seq analysis on GRCh38 for project bench"
+APP_NAME = "agentic_genomics_bench"
+USER_ID = "bench"
+
+
+def _workflow_summaries(trace_dir: Path, seen: int) -> tuple[list[dict], int]:
+    from tools.tracing import tracer
+
+    tracer.flush()
+    path = trace_dir / "summaries.jsonl"
+    lines = path.read_text().splitlines() if path.exists() else []
+    summaries = [json.loads(line) for line in lines[seen:]]
+    return [summary for summary in summaries if summary.get("kind") == "workflow"], len(lines)
+
+
+async def _run_once(runner, request: str) -> str:
+    from google.genai import types
+
+    session = await runner.session_service.create_session(app_name=APP_NAME, user_id=USER_ID)
+    final = ""
+    async for event in runner.run_async(user_id=USER_ID, session_id=session.id,
+                                        new_message=types.Content(role="user", parts=[types.Part(text=request)])):
+        if event.content and event.content.parts and event.is_final_response():
+            final = "".join(part.text or "" for part in event.content.parts)
+    return final
+
+
+def _run_metrics(prefix: str, elapsed_s: float, summary: dict) -> dict:
+    metrics = {f"{prefix}.wall_s": round(elapsed_s, 4)}
+    for operation, totals in summary["by_operation"].items():
+        kind, name = operation.split(":", 1)
+        if kind == "agent":
+            metrics[f"{prefix}.stage.{name}_ms"] = totals.get("total_ms", 0)
+            metrics[f"{prefix}.stage.{name}.tokens_in"] = totals.get("tokens_in", 0)
+            metrics[f"{prefix}.stage.{name}.tokens_out"] = totals.get("tokens_out", 0)
+        elif kind == "tool":
+            metrics[f"{prefix}.tool.{name}.args_bytes"] = totals.get("args_bytes", 0)
+            metrics[f"{prefix}.tool.{name}.result_bytes"] = totals.get("result_bytes", 0)
+        elif kind == "model":
+            metrics[f"{prefix}.model_calls"] = metrics.get(f"{prefix}.model_calls", 0) + totals["count"]
+            metrics[f"{prefix}.tokens_in"] = metrics.get(f"{prefix}.tokens_in", 0) + totals.get("tokens_in", 0)
+            metrics[f"{prefix}.tokens_out"] = metrics.get(f"{prefix}.tokens_out", 0) + totals.get("tokens_out", 0)
+        elif kind == "subprocess":
+            metrics[f"{prefix}.subprocess.{name.replace(' ', '_')}_ms"] = totals["total_ms"]
+    return metrics
+
+
+def run_e2e(runs: int = 3, model_latency_s: float = 0.0) -> dict:
+    """Runs the workflow `runs` times; metrics for the first (cold) run and the mean of the rest."""
+    from google.adk.runners import InMemoryRunner
+
+    from benchmarks import stub_llm
+
+    tracemalloc.start()
+    import_start = time.perf_counter()
+    try:
+        from agent import deployment_workflow_tool, root_agent
+    except ImportError:
+        tracemalloc.stop()
+        raise
+    import_s = time.perf_counter() - import_start
+
+    stub_llm.install([root_agent, *deployment_workflow_tool.workflow_agent.sub_agents], latency_s=model_latency_s)
+    runner = InMemoryRunner(agent=root_agent, app_name=APP_NAME)
+    trace_dir = Path(os.environ["AGENTIC_GENOMICS_TRACE_DIR"])
+    _, seen = _workflow_summaries(trace_dir, 0)
+
+    per_run = []
+    for i in range(runs):
+        start = time.perf_counter()
+        asyncio.run(_run_once(runner, REQUEST))
+        elapsed = time.perf_counter() - start
+        summaries, seen = _workflow_summaries(trace_dir, seen)
+        if not summaries:
+            raise RuntimeError(f"Run {i} produced no workflow trace; did DeploymentWorkflowTool run?")
+        per_run.append(_run_metrics("run", elapsed, summaries[-1]))
+
+    _, tracemalloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    metrics = {"e2e.import_s": round(import_s, 4),
+               "e2e.python_peak_kb": tracemalloc_peak // 1024,
+               "e2e.peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+    metrics.update({key.replace("run.", "e2e.cold.", 1): value for key, value in per_run[0].items()})
+    repeats = per_run[1:]
+    for key in sorted({key for run in repeats for key in run}):
+        values = [run.get(key, 0) for run in repeats]
+        metrics[key.replace("run.", "e2e.repeat.", 1)] = round(sum(values) / len(values), 4)
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--model-latency", type=float, default=0.0, help="Simulated seconds per model call.")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate(Path(tmp))
+        report(run_e2e(args.runs, args.model_latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+A stand-in for the `terraform` binary used by the benchmarks.
+
+It mimics the parts of terraform's behaviour that matter for timing:
+`init` "downloads" modules and providers (sleeping to simulate the network)
+unless they are already installed or available in TF_PLUGIN_CACHE_DIR,
+`apply` and `destroy` print the same progress lines real terraform does and
+keep a terraform.tfstate, `plan -detailed-exitcode` exits 2 unless the
+state matches the config, and `providers mirror <dir>` copies the provider
+into a filesystem mirror. Point the tools at it with:
+
+    AGENTIC_GENOMICS_TERRAFORM_BIN=benchmarks/fake_terraform.py
+
+Delays (seconds) are set with FAKE_TERRAFORM_MODULE_DELAY,
+FAKE_TERRAFORM_PROVIDER_DELAY, FAKE_TERRAFORM_APPLY_DELAY,
+FAKE_TERRAFORM_PLAN_DELAY and FAKE_TERRAFORM_DESTROY_DELAY; set
+FAKE_TERRAFORM_FAIL to a subcommand name to make it exit non-zero, and
+FAKE_TERRAFORM_LONG_LINE_BYTES to make apply print one line that long first
+(like a large JSON diagnostic).
+"""
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+PROVIDER_PATH = Path("registry.terraform.io/hashicorp/google/5.0.0/linux_amd64")
+PROVIDER_BINARY = "terraform-provider-google"
+RESOURCES = [
+    "module.gke_cluster.google_compute_network.network",
+    "module.gke_cluster.google_container_cluster.gke_cluster",
+    "module.gke_cluster.google_container_node_pool.node_pool",
+]
+
+
+def _delay(name: str, default: float) -> float:
+    return float(os.environ.get(f"FAKE_TERRAFORM_{name}_DELAY", default))
+
+
+def init(args: list[str]):
+    dot_terraform = Path(".terraform")
+    modules_manifest = dot_terraform / "modules" / "modules.json"
+    if not modules_manifest.exists():
+        if "-get=false" in args:
+            sys.exit("Error: Module not installed")
+        time.sleep(_delay("MODULE", 0.5))
+        modules_manifest.parent.mkdir(parents=True, exist_ok=True)
+        (modules_manifest.parent / "gke_cluster").mkdir(exist_ok=True)
+        (modules_manifest.parent / "gke_cluster" / "main.tf").write_text("# fake cluster-toolkit module\n")
+        modules_manifest.write_text(json.dumps({"Modules": [{"Key": "gke_cluster", "Version": "2.0.0"}]}))
+        print("- gke_cluster in .terraform/modules/gke_cluster")
+
+    installed = dot_terraform / "providers" / PROVIDER_PATH / PROVIDER_BINARY
+    if not installed.exists():
+        installed.parent.mkdir(parents=True, exist_ok=True)
+        cache = os.environ.get("TF_PLUGIN_CACHE_DIR")
+        cached = Path(cache) / PROVIDER_PATH / PROVIDER_BINARY if cache else None
+        if cached is not None and cached.exists():
+            print("- Using hashicorp/google v5.0.0 from the shared cache directory")
+        else:
+            time.sleep(_delay("PROVIDER", 1.0))
+            print("- Installing hashicorp/google v5.0.0...")
+            if cached is not None:
+                cached.parent.mkdir(parents=True, exist_ok=True)
+                cached.write_text("fake provider binary\n")
+        if cached is not None:
+            installed.symlink_to(cached)
+        else:
+            installed.write_text("fake provider binary\n")
+    Path(".terraform.lock.hcl").write_text('provider "registry.terraform.io/hashicorp/google" {\n  version = "5.0.0"\n}\n')
+    print("Terraform has been successfully initialized!")
+
+
+def apply(args: list[str]):
+    if not Path(".terraform/modules/modules.json").exists():
+        sys.exit("Error: Module not installed. Run terraform init.")
+    delay = _delay("APPLY", 0.1)
+    long_line = int(os.environ.get("FAKE_TERRAFORM_LONG_LINE_BYTES", 0))
+    if long_line:
+        print(json.dumps({"diagnostic": "x" * long_line}), flush=True)
+    for resource in RESOURCES:
+        print(f"{resource}: Creating...", flush=True)
+        time.sleep(delay / len(RESOURCES))
+        print(f"{resource}: Creation complete after {delay / len(RESOURCES):.0f}s [id={resource.rsplit('.', 1)[-1]}]", flush=True)
+    Path("terraform.tfstate").write_text(json.dumps({"resources": RESOURCES}))
+    print(f"Apply complete! Resources: {len(RESOURCES)} added, 0 changed, 0 destroyed.")
+
+
+def plan(args: list[str]):
+    if not Path(".terraform/modules/modules.json").exists():
+        sys.exit("Error: Module not installed. Run terraform init.")
+    time.sleep(_delay("PLAN", 0.05))
+    state = Path("terraform.tfstate")
+    if state.exists() and json.loads(state.read_text()).get("resources"):
+        print("No changes. Your infrastructure matches the configuration.")
+        return
+    print(f"Plan: {len(RESOURCES)} to add, 0 to change, 0 to destroy.")
+    if "-detailed-exitcode" in args:
+        sys.exit(2)
+
+
+def destroy(args: list[str]):
+    state = Path("terraform.tfstate")
+    resources = json.loads(state.read_text()).get("resources", []) if state.exists() else []
+    delay = _delay("DESTROY", 0.1)
+    for resource in reversed(resources):
+        print(f"{resource}: Destroying... [id={resource.rsplit('.', 1)[-1]}]", flush=True)
+        time.sleep(delay / len(resources))
+        print(f"{resource}: Destruction complete after {delay / len(resources):.0f}s", flush=True)
+    state.write_text(json.dumps({"resources": []}))
+    print(f"Destroy complete! Resources: {len(resources)} destroyed.")
+
+
+def providers(args: list[str]):
+    if args[:1] != ["mirror"] or len(args) < 2:
+        sys.exit("fake terraform: only `providers mirror <dir>` is supported")
+    time.sleep(_delay("PROVIDER", 1.0))
+    package = Path(args[-1]) / PROVIDER_PATH.parent.parent / f"{PROVIDER_BINARY}_5.0.0_linux_amd64.zip"
+    package.parent.mkdir(parents=True, exist_ok=True)
+    package.write_text("fake provider package\n")
+    print("- Mirroring hashicorp/google...")
+
+
+def main():
+    command, args = (sys.argv[1], sys.argv[2:]) if len(sys.argv) > 1 else ("help", [])
+    if os.environ.get("FAKE_TERRAFORM_FAIL") == command:
+        print(f"Error: simulated {command} failure", file=sys.stderr)
+        sys.exit(1)
+    handlers = {"init": init, "apply": apply, "plan": plan, "destroy": destroy, "providers": providers}
+    if command not in handlers:
+        sys.exit(f"fake terraform: unsupported command '{command}'")
+    handlers[command](args)
+
+
+if __name__ == "__main__":
+    main()
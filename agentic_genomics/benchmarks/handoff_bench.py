@@ -0,0 +1,92 @@
+"""
+Compares the context each workflow stage inherits from the earlier stages:
+the full conversation (tool results plus a prose restatement of the schema)
+against the typed handoffs injected into its instruction.
+
+Uses a synthetic schema the size of nf-core/rnaseq's (about 130 visible
+params in 12 groups). Tokens are estimated at four characters per token.
+
+Run from the `agentic_genomics/` directory:
+
+    python -m benchmarks.handoff_bench
+"""
+import json
+from dataclasses import asdict
+
+from tools.handoff import BlueprintHandoff, ConfigurationHandoff, RequestHandoff, schema_handoff
+from tools.nf_core_schema_store import parse_schema
+
+CHARS_PER_TOKEN = 4
+GROUPS = 12
+PARAMS_PER_GROUP = 11
+WORK_DIR = "/tmp/agentic_genomics_abc123"
+REQUEST = "I need to run an RNA-Seq analysis on GRCh38, paired-end, for project X"
+
+# Model calls each stage makes in a typical run; each one resends the inherited context.
+MODEL_CALLS = {"configurator_agent": 5, "blueprint_architect_agent": 3, "deployment_engineer_agent": 4}
+
+
+def synthetic_schema() -> dict:
+    defs = {}
+    for g in range(GROUPS):
+        properties = {}
+        for p in range(PARAMS_PER_GROUP):
+            properties[f"option_{g}_{p}"] = {
+                "type": ["string", "boolean", "integer", "number"][p % 4],
+                "description": f"Controls step {p} of stage {g}: a one-sentence description like nf-core's. "
+                               "Further detail follows here.",
+                "help_text": "Long help text shown on the nf-core website, often several paragraphs. " * 4,
+                **({"default": "auto"} if p % 3 == 0 else {}),
+                **({"enum": ["fast", "balanced", "sensitive"]} if p % 5 == 0 else {}),
+                **({"hidden": True} if p == PARAMS_PER_GROUP - 1 else {}),
+            }
+        defs[f"group_{g}"] = {"title": f"Group {g} options", "properties": properties,
+                              "required": ["option_0_0", "option_0_1"] if g == 0 else []}
+    return {"$defs": defs}
+
+
+def tokens(value) -> int:
+    return len(value if isinstance(value, str) else json.dumps(value)) // CHARS_PER_TOKEN
+
+
+def main():
+    schema = {"pipeline": "nf-core/rnaseq", "revision": "3.14.0", **parse_schema(synthetic_schema())}
+    search_results = [{"name": "nf-core/rnaseq", "description": "RNA sequencing analysis pipeline " * 3, "score": 7.0}] * 3
+    configuration = {"nextflow_config_path": f"{WORK_DIR}/nextflow.config", "params_json_path": f"{WORK_DIR}/params.json",
+                     "project": "project-x", "region": "us-central1", "work_dir": "gs://bucket/work"}
+    blueprint = {"blueprint_path": f"{WORK_DIR}/blueprint"}
+
+    # Before: every stage sees the request and everything the earlier stages said and got back.
+    scout_turn = [REQUEST, search_results, schema, f"Selected pipeline: nf-core/rnaseq. Schema: {json.dumps(schema)}"]
+    configurator_turn = ["(questions, answers and tool calls)" * 20, configuration]
+    architect_turn = ["(plan, approval and tool call)" * 10, blueprint]
+    before = {
+        "configurator_agent": sum(map(tokens, scout_turn)),
+        "blueprint_architect_agent": sum(map(tokens, scout_turn + configurator_turn)),
+        "deployment_engineer_agent": sum(map(tokens, scout_turn + configurator_turn + architect_turn)),
+    }
+
+    # After: only the handoffs each instruction references.
+    request = asdict(RequestHandoff(request=REQUEST, work_dir=WORK_DIR))
+    pipeline = asdict(schema_handoff(schema))
+    config = asdict(ConfigurationHandoff(**configuration))
+    after = {
+        # Plus one on-demand `get_pipeline_params` lookup of a couple of params.
+        "configurator_agent": tokens(request) + tokens(pipeline)
+                              + tokens({name: schema["params"][name] for name in list(schema["params"])[:2]}),
+        "blueprint_architect_agent": tokens(request) + tokens(pipeline) + tokens(config),
+        "deployment_engineer_agent": tokens(asdict(BlueprintHandoff(**blueprint))) + tokens(config),
+    }
+
+    print(f"schema: {len(schema['params'])} visible params, parsed {tokens(schema):,} tokens; "
+          f"pipeline handoff {tokens(pipeline):,} tokens")
+    print(f"{'stage':<28} {'inherited before':>17} {'after':>8} {'per run before':>15} {'after':>8}")
+    for stage, calls in MODEL_CALLS.items():
+        print(f"{stage:<28} {before[stage]:>17,} {after[stage]:>8,} {before[stage] * calls:>15,} {after[stage] * calls:>8,}")
+    total_before = sum(before[s] * c for s, c in MODEL_CALLS.items())
+    total_after = sum(after[s] * c for s, c in MODEL_CALLS.items())
+    print(f"{'total':<28} {'':>17} {'':>8} {total_before:>15,} {total_after:>8,}  ({total_before / total_after:.0f}x less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Shared setup for the benchmark suite: an isolated, offline environment and a
+small timing helper.
+"""
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Callable
+
+FAKE_TERRAFORM = Path(__file__).with_name("fake_terraform.py")
+
+# Fast fake terraform by default; export the variables to simulate a slower one.
+FAKE_TERRAFORM_DELAYS = {
+    "FAKE_TERRAFORM_MODULE_DELAY": "0.05",
+    "FAKE_TERRAFORM_PROVIDER_DELAY": "0.05",
+    "FAKE_TERRAFORM_APPLY_DELAY": "0.05",
+    "FAKE_TERRAFORM_PLAN_DELAY": "0.05",
+    "FAKE_TERRAFORM_DESTROY_DELAY": "0.05",
+}
+
+
+def isolate(root: Path):
+    """
+    Points every cache, trace and store at `root`, uses the fake terraform
+    binary and keeps the catalog and terraform offline. Must run before the
+    tools are first used.
+    """
+    os.environ["AGENTIC_GENOMICS_CACHE_DIR"] = str(root / "cache")
+    os.environ["AGENTIC_GENOMICS_TRACE_DIR"] = str(root / "traces")
+    os.environ["AGENTIC_GENOMICS_TERRAFORM_BIN"] = str(FAKE_TERRAFORM)
+    os.environ["AGENTIC_GENOMICS_TERRAFORM_OFFLINE"] = "1"
+    os.environ["AGENTIC_GENOMICS_CATALOG_OFFLINE"] = "1"
+    for name, value in FAKE_TERRAFORM_DELAYS.items():
+        os.environ.setdefault(name, value)
+
+
+def time_calls(fn: Callable[[int], object], iterations: int, warmup: int = 1) -> tuple[dict, object]:
+    """
+    Calls fn(i) `warmup + iterations` times and returns the median and p95
+    of the timed calls in milliseconds, plus the last result.
+    """
+    result = None
+    for i in range(warmup):
+        result = fn(-1 - i)
+    timings = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        result = fn(i)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, round(0.95 * (len(timings) - 1)))]
+    return {"median_ms": round(statistics.median(timings), 3), "p95_ms": round(p95, 3)}, result
+
+
+def report(metrics: dict):
+    width = max(map(len, metrics), default=0)
+    for key, value in sorted(metrics.items()):
+        print(f"{key:<{width}}  {value:>14,}" if isinstance(value, int) else f"{key:<{width}}  {value:>14,.4f}")
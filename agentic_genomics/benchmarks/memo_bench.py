@@ -0,0 +1,67 @@
+"""
+Shows how many model calls the persistent stage result cache saves on a
+realistic mix of repeated requests, using a stub model in place of Gemini.
+
+Run from the `agentic_genomics/` directory:
+
+    python -m benchmarks.memo_bench
+"""
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from tools.result_cache import ResultCache
+
+STUB_MODEL_LATENCY_SECONDS = 0.02
+
+# The same few analyses, phrased the way different people type them.
+REQUESTS = [
+    ["RNA-Seq on GRCh38, paired-end, project X", "rna-seq on grch38 paired end project x", "RNA-Seq on GRCh38 paired-end project X"],
+    ["Somatic variant calling on GRCh38 for project Y", "somatic variant-calling GRCh38 project y"],
+    ["Single cell RNA-Seq, 10x, project Z", "single-cell rna-seq 10x project z"],
+    ["Shotgun metagenomics profiling for project W", "shotgun metagenomics profiling project W, please"],
+]
+
+
+class StubModel:
+    """Stands in for the LLM: deterministic answers, counted calls, fixed latency."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def select_pipeline(self, request: str) -> str:
+        self.calls += 1
+        time.sleep(STUB_MODEL_LATENCY_SECONDS)
+        return f"Selected pipeline: nf-core/{'rnaseq' if 'rna' in request.lower() else 'sarek'}"
+
+
+def run(workload: list[str], cache: ResultCache | None, near_duplicates: bool = False) -> tuple[int, float]:
+    model = StubModel()
+    start = time.perf_counter()
+    for request in workload:
+        if cache is not None:
+            cached = cache.get("pipeline_scout", request, near_duplicates=near_duplicates)
+            if cached is not None:
+                continue
+        result = model.select_pipeline(request)
+        if cache is not None:
+            cache.put("pipeline_scout", request, result)
+    return model.calls, time.perf_counter() - start
+
+
+def main(runs: int = 60):
+    rng = random.Random(0)
+    workload = [rng.choice(rng.choice(REQUESTS)) for _ in range(runs)]
+    print(f"{runs} requests, {len(REQUESTS)} distinct analyses")
+    print(f"{'no cache':<28} model calls {run(workload, None)[0]:>4}")
+    for near_duplicates in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResultCache(path=Path(tmp) / "results.sqlite3")
+            calls, elapsed = run(workload, cache, near_duplicates)
+            label = "cache + near duplicates" if near_duplicates else "cache (exact, normalized)"
+            print(f"{label:<28} model calls {calls:>4}   {elapsed:5.2f}s   {cache.stats()['pipeline_scout']}")
+
+
+if __name__ == "__main__":
+    main()
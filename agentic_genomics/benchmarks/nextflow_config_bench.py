@@ -0,0 +1,110 @@
+"""
+Estimates the output tokens and wall time the ConfiguratorAgent saves by
+passing structured settings to `create_nextflow_config` instead of writing
+the nextflow.config text itself.
+
+Nothing here calls a model: output tokens are estimated at ~4 characters
+per token and converted to time with an assumed decode rate
+(--tokens-per-second). Only the render+write time is measured.
+
+Run from the `agentic_genomics/` directory:
+
+    python -m benchmarks.nextflow_config_bench
+"""
+import argparse
+import json
+import tempfile
+import timeit
+from pathlib import Path
+
+from tools.nextflow_config import render_nextflow_config, write_atomic
+
+CHARS_PER_TOKEN = 4
+
+SETTINGS = {
+    "project": "core-facility-prod",
+    "region": "us-central1",
+    "work_dir": "gs://core-facility-work/rnaseq",
+    "queue_size": 200,
+    "spot": True,
+    "labels": {"project": "x", "pipeline": "rnaseq"},
+    "process_overrides": {
+        "withLabel:process_high": {"cpus": 16, "memory": "64 GB", "time": "16h"},
+        "withLabel:process_medium": {"cpus": 8, "memory": "32 GB"},
+    },
+}
+
+# A representative config as the model used to author it for the same settings,
+# including the explanatory comments it tends to add.
+LLM_AUTHORED_CONFIG = """\
+// Nextflow configuration for running nf-core/rnaseq on Google Cloud Batch
+// Generated for project core-facility-prod in region us-central1
+
+// Working directory for intermediate files on Google Cloud Storage
+workDir = 'gs://core-facility-work/rnaseq'
+
+process {
+    // Use the Google Cloud Batch executor for all processes
+    executor = 'google-batch'
+    // Attach labels to all Batch jobs for cost tracking
+    resourceLabels = [pipeline: 'rnaseq', project: 'x']
+
+    // Resource overrides for high-demand processes such as alignment
+    withLabel:'process_high' {
+        cpus = 16
+        memory = '64 GB'
+        time = '16h'
+    }
+
+    // Resource overrides for medium-demand processes
+    withLabel:'process_medium' {
+        cpus = 8
+        memory = '32 GB'
+    }
+}
+
+google {
+    // Google Cloud project and region for the Batch jobs
+    project = 'core-facility-prod'
+    location = 'us-central1'
+    // Run tasks on Spot VMs to reduce cost
+    batch.spot = true
+}
+
+executor {
+    // Maximum number of tasks submitted to Batch at the same time
+    queueSize = 200
+}
+
+// Enable Docker so each process runs in its container
+docker.enabled = true
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tokens-per-second", type=float, default=60.0, help="Model decode rate.")
+    args = parser.parse_args()
+
+    file_path = "/tmp/agentic_genomics_run/nextflow.config"
+    before_args = json.dumps({"file_path": file_path, "content": LLM_AUTHORED_CONFIG})
+    after_args = json.dumps({"file_path": file_path, **SETTINGS})
+    before_tokens = len(before_args) / CHARS_PER_TOKEN
+    after_tokens = len(after_args) / CHARS_PER_TOKEN
+
+    with tempfile.TemporaryDirectory() as tmp:
+        target = Path(tmp) / "nextflow.config"
+        number = 1000
+        render_s = timeit.timeit(lambda: write_atomic(target, render_nextflow_config(**SETTINGS)), number=number) / number
+
+    before_s = before_tokens / args.tokens_per_second
+    after_s = after_tokens / args.tokens_per_second + render_s
+    print(f"estimates at ~{CHARS_PER_TOKEN} chars/token and {args.tokens_per_second:g} tokens/s; only render+write is measured")
+    print(f"{'':<28}{'est. tokens':>14}{'est. time':>12}")
+    print(f"{'LLM-authored config':<28}{before_tokens:>14.0f}{before_s:>11.2f}s")
+    print(f"{'structured settings':<28}{after_tokens:>14.0f}{after_s:>11.2f}s  (render+write {render_s * 1e3:.2f} ms)")
+    print(f"estimated saving per configuration step: {before_tokens - after_tokens:.0f} output tokens, {before_s - after_s:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Times the samplesheet preflight on a large rnaseq samplesheet whose fastqs
+live in a simulated object store: each existence check waits `--latency-ms`,
+like a GCS metadata request. Compares one check at a time (on a sample of the
+rows, extrapolated) with the default concurrency, and a second pass answered
+from the existence cache.
+
+Run from the `agentic_genomics/` directory:
+
+    python -m benchmarks.preflight_bench [--rows 5000] [--latency-ms 20]
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.harness import report
+from tools.samplesheet_preflight import (DEFAULT_CONCURRENCY, ExistenceCache, get_input_schema, register_backend,
+                                         validate_samplesheet)
+
+SCHEME = "bench"
+SEQUENTIAL_SAMPLE_ROWS = 100
+
+
+class SlowStorage:
+    """An in-memory object store with a fixed latency per existence check."""
+
+    def __init__(self, objects: set[str], latency_s: float):
+        self.objects = objects
+        self.latency_s = latency_s
+
+    async def exists(self, uri: str) -> bool:
+        await asyncio.sleep(self.latency_s)
+        return uri in self.objects
+
+
+def write_samplesheet(path: Path, rows: int, missing_every: int = 0) -> set[str]:
+    """Writes a paired-end samplesheet and returns the objects that exist."""
+    objects = set()
+    lines = ["sample,fastq_1,fastq_2,strandedness"]
+    for i in range(rows):
+        fastqs = [f"{SCHEME}://bucket/run/S{i}_R{read}.fastq.gz" for read in (1, 2)]
+        lines.append(f"S{i},{fastqs[0]},{fastqs[1]},auto")
+        if not (missing_every and i % missing_every == 0):
+            objects.update(fastqs)
+    path.write_text("\n".join(lines) + "\n")
+    return objects
+
+
+def run(samplesheet: Path, concurrency: int, cache: ExistenceCache | None) -> tuple[float, dict]:
+    started = time.perf_counter()
+    result = asyncio.run(validate_samplesheet(str(samplesheet), get_input_schema("nf-core/rnaseq"),
+                                              concurrency=concurrency, cache=cache))
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ag_preflight_bench_") as tmp:
+        full, sample = Path(tmp) / "samplesheet.csv", Path(tmp) / "sample.csv"
+        objects = write_samplesheet(full, args.rows, missing_every=997)
+        write_samplesheet(sample, SEQUENTIAL_SAMPLE_ROWS)
+        register_backend(SCHEME, SlowStorage(objects, args.latency_ms / 1000))
+
+        sequential_s, _ = run(sample, concurrency=1, cache=None)
+        cache = ExistenceCache()
+        concurrent_s, result = run(full, concurrency=DEFAULT_CONCURRENCY, cache=cache)
+        cached_s, cached = run(full, concurrency=DEFAULT_CONCURRENCY, cache=cache)
+
+    print(f"{args.rows:,} rows, {result['objects_checked']:,} objects, {args.latency_ms:g} ms per check; "
+          f"{result['missing_count']} missing")
+    report({
+        "preflight.sequential.est_s": sequential_s * args.rows / SEQUENTIAL_SAMPLE_ROWS,
+        f"preflight.concurrent_{DEFAULT_CONCURRENCY}.s": concurrent_s,
+        "preflight.cached.s": cached_s,
+        "preflight.cached.cache_hits": cached["cache_hits"],
+        "preflight.objects_per_s": result["objects_checked"] / concurrent_s,
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Stores benchmark results per commit and compares two runs.
+
+Results are flat {metric: value} dicts saved as
+`benchmarks/results/<commit>.json`. Metrics ending in `_per_s` are better
+when higher; all others (latency, bytes, tokens, memory) when lower.
+"""
+import json
+import platform
+import subprocess
+import time
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).with_name("results")
+DEFAULT_REGRESSION_THRESHOLD = 0.10
+
+
+def _git(*args: str) -> str | None:
+    try:
+        return subprocess.run(["git", *args], cwd=RESULTS_DIR.parent, check=True, capture_output=True,
+                              text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def current_commit() -> str:
+    """The short HEAD commit, suffixed with `-dirty` if the package has uncommitted changes."""
+    commit = _git("rev-parse", "--short", "HEAD") or "unknown"
+    if _git("status", "--porcelain", "--untracked-files=no", "--", str(RESULTS_DIR.parent.parent)):
+        commit += "-dirty"
+    return commit
+
+
+def save(metrics: dict, name: str | None = None) -> Path:
+    name = name or current_commit()
+    RESULTS_DIR.mkdir(exist_ok=True)
+    path = RESULTS_DIR / f"{name}.json"
+    path.write_text(json.dumps({
+        "commit": name,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "metrics": dict(sorted(metrics.items())),
+    }, indent=2) + "\n")
+    return path
+
+
+def load(ref: str) -> dict:
+    """Loads results by file path, result name or any git ref that has stored results."""
+    path = Path(ref)
+    if not path.is_file():
+        path = RESULTS_DIR / f"{ref}.json"
+    if not path.is_file():
+        commit = _git("rev-parse", "--short", ref)
+        path = RESULTS_DIR / f"{commit}.json"
+    if not path.is_file():
+        raise FileNotFoundError(f"No stored benchmark results for '{ref}' in {RESULTS_DIR}")
+    return json.loads(path.read_text())["metrics"]
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> list[dict]:
+    """One row per metric present in both runs; `regression` marks a change worse than the threshold."""
+    rows = []
+    for metric in sorted(baseline.keys() & current.keys()):
+        before, after = baseline[metric], current[metric]
+        change = (after - before) / before if before else 0.0
+        worse = -change if metric.endswith("_per_s") else change
+        rows.append({"metric": metric, "baseline": before, "current": after, "change": change,
+                     "regression": worse > threshold})
+    return rows
+
+
+def print_comparison(rows: list[dict]):
+    print(f"{'metric':<58} {'baseline':>12} {'current':>12} {'change':>8}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['metric']:<58} {row['baseline']:>12.4g} {row['current']:>12.4g} {row['change']:>+8.1%}{flag}")
@@ -0,0 +1,74 @@
+"""
+Shows what resuming a workflow run saves after a late failure: the
+deployment workflow runs with the stub model until the fake terraform apply
+fails (as on a quota error), then the same run is resumed with
+`resume=<run_id>` and, for comparison, started over as a new run.
+
+Reports wall time, model calls and user prompts (`get_user_choice` calls)
+for each.
+
+Run from the `agentic_genomics/` directory:
+
+    python -m benchmarks.resume_bench [--model-latency 0.5]
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.e2e_bench import REQUEST, _workflow_summaries
+from benchmarks.harness import isolate, report
+
+
+def _counts(summary: dict) -> dict:
+    by_operation = summary["by_operation"]
+    return {
+        "model_calls": sum(totals["count"] for operation, totals in by_operation.items()
+                           if operation.startswith("model:")),
+        "user_prompts": by_operation.get("tool:get_user_choice", {}).get("count", 0),
+    }
+
+
+def run_resume(model_latency_s: float = 0.0) -> dict:
+    from benchmarks import stub_llm
+    from agent import deployment_workflow_tool
+
+    stub_llm.install(deployment_workflow_tool.workflow_agent.sub_agents, latency_s=model_latency_s)
+    trace_dir = Path(os.environ["AGENTIC_GENOMICS_TRACE_DIR"])
+    _, seen = _workflow_summaries(trace_dir, 0)
+
+    metrics = {}
+
+    def timed(name: str, **kwargs) -> dict:
+        nonlocal seen
+        start = time.perf_counter()
+        result = deployment_workflow_tool._run(**kwargs)
+        metrics[f"resume.{name}.wall_s"] = round(time.perf_counter() - start, 4)
+        summaries, seen = _workflow_summaries(trace_dir, seen)
+        metrics.update({f"resume.{name}.{key}": value for key, value in _counts(summaries[-1]).items()})
+        return result
+
+    os.environ["FAKE_TERRAFORM_FAIL"] = "apply"
+    failed = timed("failed_run", request=REQUEST)
+    assert failed["status"] == "incomplete" and failed["next_stage"] == "deployment_engineer_agent", failed
+    del os.environ["FAKE_TERRAFORM_FAIL"]
+
+    resumed = timed("resumed", resume=failed["run_id"])
+    assert resumed["status"] == "completed", resumed
+    restarted = timed("restarted", request=REQUEST)
+    assert restarted["status"] == "completed", restarted
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--model-latency", type=float, default=0.0, help="Simulated seconds per model call.")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate(Path(tmp))
+        report(run_resume(args.model_latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Exercises the Nextflow run registry: the time to find the previous run among
+`--runs` recorded ones, which processes an exact and a near-match rerun would
+take from the cache, and a garbage collection with every lineage expired.
+
+Run from the `agentic_genomics/` directory:
+
+    python -m benchmarks.run_registry_bench [--runs 500] [--iterations 50]
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+from benchmarks.harness import isolate, report, time_calls
+
+PIPELINE_REF = "nf-core/rnaseq@3.14.0"
+PARAMS = {
+    "input": "gs://bench-bucket/samplesheet.csv", "outdir": "gs://bench-bucket/results", "genome": "GRCh38",
+    "aligner": "star_salmon", "pseudo_aligner": "salmon", "skip_qualimap": False, "skip_markduplicates": False,
+    "extra_salmon_quant_args": None,
+}
+
+
+def run(root: Path, runs: int, iterations: int) -> dict:
+    from tools.run_registry import RunRegistry, changed_params, predict_reuse
+    from tools.sizing_engine import load_profile
+
+    registry = RunRegistry(path=root / "registry", retention_days=30)
+    for i in range(runs):
+        # Earlier runs on other genomes, which share too little to be resumed.
+        registry.record(PIPELINE_REF, dict(PARAMS, genome=f"bench-genome-{i}", aligner="hisat2"),
+                        f"gs://bench-bucket/work/{i}", project="bench-project")
+    first = registry.record(PIPELINE_REF, PARAMS, "gs://bench-bucket/work/first", project="bench-project")
+
+    metrics = {}
+    rerun = dict(PARAMS, outdir="gs://bench-bucket/results-2")
+    tweaked = dict(PARAMS, extra_salmon_quant_args="--seqBias")
+    profile = load_profile(PIPELINE_REF)
+    for name, params in (("exact", rerun), ("near", tweaked)):
+        timing, previous = time_calls(
+            lambda i: registry.find_previous(PIPELINE_REF, params, project="bench-project"), iterations)
+        assert previous["run_id"] == first["run_id"], previous
+        reuse = predict_reuse(profile, changed_params(previous["params"], params))
+        metrics[f"run_registry.find_{name}.median_ms"] = timing["median_ms"]
+        metrics[f"run_registry.find_{name}.similarity"] = previous["similarity"]
+        metrics[f"run_registry.find_{name}.reused_processes"] = len(reuse["reused"])
+        metrics[f"run_registry.find_{name}.rerun_processes"] = len(reuse["rerun"])
+
+    # Expire everything (a retention of 0 disables collection instead).
+    deleted = []
+    expired = RunRegistry(path=root / "registry", retention_days=1e-9)
+    result = expired.collect_garbage(delete=deleted.append)
+    metrics["run_registry.gc.expired_lineages"] = result["expired_lineages"]
+    metrics["run_registry.gc.deleted_work_dirs"] = len(deleted)
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=500)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ag_run_registry_bench_") as tmp:
+        isolate(Path(tmp))
+        report(run(Path(tmp), args.runs, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Load test for the serving layer (main.py): concurrent sessions, spread over
+several tenants, each post a deployment request that runs the whole
+workflow with the stub model and the fake terraform binary. Reports
+completed turns per second and turn latency at each concurrency level, and
+how long `/healthz` takes to answer while the turns run (it stays fast only
+if no tool blocks the event loop).
+
+Requests go through the ASGI app in-process, as they would behind uvicorn.
+
+Run from the `agentic_genomics/` directory:
+
+    python -m benchmarks.serving_bench [--sessions 1 2 4 8 16] [--model-latency 0.2] [--apply-s 1]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.e2e_bench import REQUEST
+from benchmarks.harness import isolate, report
+
+TENANTS = 4
+
+
+async def _turn(client, tenant: str) -> float:
+    headers = {"X-Tenant-ID": tenant}
+    session = (await client.post("/sessions", headers=headers)).json()["session_id"]
+    started = time.perf_counter()
+    response = await client.post(f"/sessions/{session}/messages", headers=headers, json={"text": REQUEST},
+                                 timeout=None)
+    response.raise_for_status()
+    return time.perf_counter() - started
+
+
+async def _probe_health(client, stop: asyncio.Event) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        (await client.get("/healthz")).raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.05)
+    return latencies
+
+
+async def run(levels: list[int]) -> dict:
+    import httpx
+
+    import main
+
+    metrics = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench") as client:
+        await _turn(client, "warmup")  # Builds the runner and warms the caches.
+        for sessions in levels:
+            stop = asyncio.Event()
+            probe = asyncio.create_task(_probe_health(client, stop))
+            started = time.perf_counter()
+            latencies = await asyncio.gather(*(_turn(client, f"tenant-{i % TENANTS}") for i in range(sessions)))
+            elapsed = time.perf_counter() - started
+            stop.set()
+            health_ms = await probe
+            prefix = f"serving.sessions_{sessions}"
+            metrics[f"{prefix}.turns_per_s"] = round(sessions / elapsed, 4)
+            metrics[f"{prefix}.turn_p50_s"] = round(statistics.median(latencies), 4)
+            metrics[f"{prefix}.turn_max_s"] = round(max(latencies), 4)
+            metrics[f"{prefix}.healthz_max_ms"] = round(max(health_ms, default=0.0), 3)
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--model-latency", type=float, default=0.2, help="Simulated seconds per model call.")
+    parser.add_argument("--apply-s", type=float, default=1.0, help="Seconds per fake terraform apply.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="ag_serving_bench_") as tmp:
+        isolate(Path(tmp))
+        os.environ["FAKE_TERRAFORM_APPLY_DELAY"] = str(args.apply_s)
+        # Admit the largest level in full; it's spread over TENANTS tenants.
+        os.environ.setdefault("AGENTIC_GENOMICS_MAX_ACTIVE_TURNS", str(max(args.sessions)))
+        os.environ.setdefault("AGENTIC_GENOMICS_MAX_TURNS_PER_TENANT", str(-(-max(args.sessions) // TENANTS)))
+
+        from agent import deployment_workflow_tool, root_agent
+        from benchmarks import stub_llm
+
+        stub_llm.install([root_agent, *deployment_workflow_tool.workflow_agent.sub_agents], latency_s=args.model_latency)
+        report(asyncio.run(run(args.sessions)))
+
+
+if __name__ == "__main__":
+    main()
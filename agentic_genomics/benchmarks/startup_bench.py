@@ -0,0 +1,107 @@
+"""
+Measures cold-start cost: the wall time and peak RSS of a fresh interpreter
+importing each entry point, best of a few runs, checked against the
+cold-start budget. `--profile` breaks one import down per module, like
+`python -X importtime`, heaviest first.
+
+Run from the `agentic_genomics/` directory:
+
+    python -m benchmarks.startup_bench
+    python -m benchmarks.startup_bench --profile agent --top 25
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.harness import report
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent
+
+MODULES = ["main", "agent", "tools.deployment_workflow", "tools.nf_core_tools", "tools.cost_engine", "tools.terraform_tools"]
+
+# What a scale-to-zero container may spend importing the orchestrator before
+# it can serve its first request. The specialist agents and their tools load
+# on first use (see tools/registry.py) and don't count against it.
+COLD_START_BUDGET_S = {"main": 1.0, "agent": 1.5}
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \| (?P<name>.+)$")
+
+_PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+__import__(sys.argv[1])
+print(json.dumps({"import_s": time.perf_counter() - start,
+                  "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+"""
+
+
+def measure_import(module: str, repeat: int = 3) -> dict:
+    samples = []
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, "-c", _PROBE, module], cwd=PACKAGE_DIR, env=os.environ,
+                                   check=True, capture_output=True, text=True)
+        samples.append(json.loads(completed.stdout.splitlines()[-1]))
+    return {"import_s": round(min(s["import_s"] for s in samples), 4),
+            "peak_rss_kb": min(s["peak_rss_kb"] for s in samples)}
+
+
+def run_startup(modules: list[str] = MODULES, repeat: int = 3) -> dict:
+    metrics = {}
+    for module in modules:
+        try:
+            result = measure_import(module, repeat)
+        except subprocess.CalledProcessError as e:
+            print(f"skipping {module}: {e.stderr.strip().splitlines()[-1] if e.stderr.strip() else e}")
+            continue
+        metrics[f"startup.{module}.import_s"] = result["import_s"]
+        metrics[f"startup.{module}.peak_rss_kb"] = result["peak_rss_kb"]
+    return metrics
+
+
+def import_profile(module: str) -> list[dict]:
+    """Per-module self and cumulative import time (ms) for one cold import, heaviest cumulative first."""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=PACKAGE_DIR,
+                               env=os.environ, check=True, capture_output=True, text=True)
+    rows = []
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            name = match["name"]
+            rows.append({"module": name.strip(), "depth": (len(name) - len(name.lstrip())) // 2,
+                         "self_ms": int(match["self"]) / 1000, "cumulative_ms": int(match["cumulative"]) / 1000})
+    return sorted(rows, key=lambda row: -row["cumulative_ms"])
+
+
+def over_budget(metrics: dict) -> list[str]:
+    return [f"{module}: {metrics[f'startup.{module}.import_s']:.3f}s > {budget}s budget"
+            for module, budget in COLD_START_BUDGET_S.items()
+            if metrics.get(f"startup.{module}.import_s", 0) > budget]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--profile", metavar="MODULE", help="Break down the import of one module.")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.profile:
+        print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for row in import_profile(args.profile)[:args.top]:
+            print(f"{row['cumulative_ms']:>14.1f} {row['self_ms']:>9.1f}  {'  ' * row['depth']}{row['module']}")
+        return
+
+    metrics = run_startup()
+    report(metrics)
+    failures = over_budget(metrics)
+    for failure in failures:
+        print(f"OVER BUDGET {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
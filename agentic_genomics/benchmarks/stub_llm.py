@@ -0,0 +1,169 @@
+"""
+A deterministic stand-in for Gemini and a scripted `get_user_choice`, so the
+real agent tree can run end to end without network access or a human.
+
+Each agent gets a `StubLlm` with a fixed script: a list of steps, each either
+a tool call or the agent's final text. The step to play is the number of
+tool responses already in the request, so the script advances exactly as the
+real tool loop does. Token counts are estimated at four characters per token.
+"""
+import asyncio
+import json
+import re
+from pathlib import Path
+from typing import Any, AsyncGenerator, Callable
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.tools import FunctionTool
+from google.genai import types
+
+from tools.workflow_context import split_request
+
+CHARS_PER_TOKEN = 4
+
+PIPELINE = "nf-core/rnaseq"
+PARAMS = {"input": "gs://bench-bucket/samplesheet.csv", "outdir": "gs://bench-bucket/results", "genome": "GRCh38"}
+REGION = "us-central1"
+SAMPLES = 24
+
+
+def get_user_choice(options: list[str]) -> str:
+    """Asks the user to pick one of the options. (Scripted: always picks the first.)"""
+    return options[0]
+
+
+scripted_user_choice = FunctionTool(get_user_choice)
+
+
+def _call(name: str, args: Callable[[dict], dict] | dict) -> Callable[[dict], types.Part]:
+    return lambda ctx: types.Part.from_function_call(name=name, args=args(ctx) if callable(args) else args)
+
+
+def _text(text: Callable[[dict], str] | str) -> Callable[[dict], types.Part]:
+    return lambda ctx: types.Part(text=text(ctx) if callable(text) else text)
+
+
+def _project(ctx: dict) -> str:
+    # One project per run, so repeated applies don't queue on the per-project start interval.
+    return "bench-" + re.sub(r"[^a-z0-9]", "", Path(ctx["work_dir"]).name.lower())[-12:]
+
+
+def _blueprint(ctx: dict) -> str:
+    return str(Path(ctx["work_dir"]) / "blueprint")
+
+
+SCRIPTS: dict[str, list[Callable[[dict], types.Part]]] = {
+    "orchestrator_agent": [
+        _call("get_user_choice", {"options": ["Proceed with the deployment", "Cancel"]}),
+        _call("run_deployment_workflow", lambda ctx: {"request": ctx["request"]}),
+        _text("The deployment workflow finished."),
+    ],
+    "pipeline_scout_agent": [
+        _call("search_nf_core_pipelines", {"query": "rna-seq gene expression"}),
+        _call("get_pipeline_schema", {"pipeline_name": PIPELINE}),
+        _text(f"Selected pipeline: {PIPELINE}"),
+    ],
+    "configurator_agent": [
+        _call("get_pipeline_params", {"pipeline_name": PIPELINE, "names": ["genome"]}),
+        _call("get_user_choice", {"options": ["Approve configuration", "Edit"]}),
+        _call("create_params_json", lambda ctx: {"file_path": f"{ctx['work_dir']}/params.json", "content": PARAMS}),
+        _call("create_nextflow_config", lambda ctx: {
+            "file_path": f"{ctx['work_dir']}/nextflow.config", "project": _project(ctx), "region": REGION,
+            "work_dir": "gs://bench-bucket/work",
+        }),
+        _call("register_nextflow_run", lambda ctx: {
+            "pipeline_name": PIPELINE, "params_json_path": f"{ctx['work_dir']}/params.json",
+            "nextflow_config_path": f"{ctx['work_dir']}/nextflow.config",
+        }),
+        _text(lambda ctx: json.dumps({"nextflow_config_path": f"{ctx['work_dir']}/nextflow.config",
+                                      "params_json_path": f"{ctx['work_dir']}/params.json",
+                                      "project": _project(ctx), "region": REGION,
+                                      "work_dir": "gs://bench-bucket/work", "samples": SAMPLES})),
+    ],
+    "blueprint_architect_agent": [
+        _call("recommend_cluster_size", {"pipeline_name": PIPELINE, "samples": SAMPLES, "location": REGION}),
+        _call("get_user_choice", {"options": ["Approve infrastructure plan", "Change"]}),
+        _call("create_cluster_toolkit_blueprint", lambda ctx: {
+            "blueprint_path": _blueprint(ctx),
+            "toolkit_variables": {"project_id": _project(ctx), "location": REGION, "cluster_name": "bench-cluster",
+                                  "blueprint_path": _blueprint(ctx)},
+        }),
+        _text(lambda ctx: json.dumps({"blueprint_path": _blueprint(ctx)})),
+    ],
+    "deployment_engineer_agent": [
+        _call("estimate_blueprint_cost", lambda ctx: {"blueprint_path": _blueprint(ctx), "run_hours": 24}),
+        _call("get_user_choice", {"options": ["Deploy", "Cancel"]}),
+        _call("execute_terraform_apply", lambda ctx: {"blueprint_path": _blueprint(ctx)}),
+        _text(lambda ctx: json.dumps(ctx["last_result"])),
+    ],
+}
+
+
+# How a request handoff reads once ADK has injected it into an instruction.
+_HANDOFF_REQUEST = re.compile(r"'request': '(?P<request>[^']*)', 'work_dir': '(?P<work_dir>[^']*)'")
+
+
+def _texts(llm_request: LlmRequest):
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.text:
+                yield part.text
+
+
+def _system_instruction(llm_request: LlmRequest) -> str:
+    return str(getattr(llm_request.config, "system_instruction", None) or "")
+
+
+def _context(llm_request: LlmRequest) -> dict:
+    """The work dir and user request the current run was started with."""
+    request = ""
+    for text in _texts(llm_request):
+        try:
+            # Agent tools receive their arguments as JSON.
+            text = json.loads(text).get("request", text)
+        except (ValueError, AttributeError):
+            pass
+        found_dir, found_request = split_request(str(text))
+        if found_dir is not None:
+            return {"work_dir": found_dir, "request": found_request}
+        request = request or found_request
+    # Agents that don't see the conversation get the request as a handoff.
+    match = _HANDOFF_REQUEST.search(_system_instruction(llm_request))
+    if match:
+        return {"work_dir": match["work_dir"], "request": match["request"]}
+    return {"work_dir": None, "request": request}
+
+
+class StubLlm(BaseLlm):
+    """Plays an agent's script; `latency_s` simulates model response time."""
+
+    script: list[Any]
+    latency_s: float = 0.0
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False
+                                     ) -> AsyncGenerator[LlmResponse, None]:
+        responses = [part.function_response for content in llm_request.contents for part in content.parts or []
+                     if part.function_response]
+        context = dict(_context(llm_request), last_result=responses[-1].response if responses else None)
+        part = self.script[min(len(responses), len(self.script) - 1)](context)
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        prompt_chars = len(_system_instruction(llm_request)) + sum(
+            len(json.dumps(content.model_dump(exclude_none=True), default=str)) for content in llm_request.contents)
+        output_chars = len(json.dumps(part.model_dump(exclude_none=True), default=str))
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[part]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_chars // CHARS_PER_TOKEN,
+                candidates_token_count=output_chars // CHARS_PER_TOKEN,
+                total_token_count=(prompt_chars + output_chars) // CHARS_PER_TOKEN,
+            ),
+        )
+
+
+def install(agents: list, latency_s: float = 0.0):
+    """Swaps each agent's model for its scripted stub and `get_user_choice` for the scripted one."""
+    for agent in agents:
+        agent.model = StubLlm(model=f"stub/{agent.name}", script=SCRIPTS[agent.name], latency_s=latency_s)
+        agent.tools = [scripted_user_choice if getattr(tool, "name", None) == "get_user_choice" else tool
+                       for tool in agent.tools]
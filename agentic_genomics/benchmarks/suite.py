@@ -0,0 +1,84 @@
+"""
+The benchmark suite: cold start, the end-to-end workflow and per-tool
+micro-benchmarks, in an isolated offline environment (stub model, scripted
+user choices, fake terraform). Results can be stored per commit and compared
+against an earlier run to catch regressions.
+
+Run from the `agentic_genomics/` directory:
+
+    python -m benchmarks.suite                       # everything, print only
+    python -m benchmarks.suite --save                # store as benchmarks/results/<commit>.json
+    python -m benchmarks.suite --compare HEAD~1      # diff against stored results for a commit
+    python -m benchmarks.suite tools --iterations 200
+
+The e2e and tools modes need google-adk (the agent tree and the ADK tools);
+without it they are skipped with the import error, and the other modes run.
+"""
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks import results
+from benchmarks.harness import isolate, report
+
+MODES = ("startup", "e2e", "tools")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("modes", nargs="*", metavar="MODE", help=f"What to run: {', '.join(MODES)} (default: all).")
+    parser.add_argument("--runs", type=int, default=3, help="End-to-end workflow runs.")
+    parser.add_argument("--model-latency", type=float, default=0.0, help="Simulated seconds per model call.")
+    parser.add_argument("--iterations", type=int, default=50, help="Calls per tool micro-benchmark.")
+    parser.add_argument("--save", nargs="?", const="", metavar="NAME",
+                        help="Store the results (default name: the current commit).")
+    parser.add_argument("--compare", metavar="REF", help="Stored results (commit, name or path) to compare against.")
+    parser.add_argument("--threshold", type=float, default=results.DEFAULT_REGRESSION_THRESHOLD,
+                        help="Relative change that counts as a regression (default %(default)s).")
+    args = parser.parse_args()
+    modes = args.modes or MODES
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(sorted(unknown))}")
+
+    metrics, skipped = {}, []
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate(Path(tmp))
+        if "startup" in modes:
+            from benchmarks.startup_bench import over_budget, run_startup
+            metrics.update(run_startup())
+            for failure in over_budget(metrics):
+                print(f"OVER BUDGET {failure}")
+        # Both drive the ADK agents and tools, so neither can run without it.
+        if "e2e" in modes:
+            try:
+                from benchmarks.e2e_bench import run_e2e
+                metrics.update(run_e2e(args.runs, args.model_latency))
+            except ImportError as e:
+                skipped.append(("e2e", e))
+        if "tools" in modes:
+            try:
+                from benchmarks.tool_bench import run_tools
+                metrics.update(run_tools(args.iterations))
+            except ImportError as e:
+                skipped.append(("tools", e))
+
+    for mode, error in skipped:
+        print(f"skipping {mode}: {type(error).__name__}: {error}")
+    report(metrics)
+    if args.save is not None:
+        print(f"\nSaved to {results.save(metrics, args.save or None)}")
+    if args.compare:
+        baseline = results.load(args.compare)
+        rows = results.compare(baseline, metrics, args.threshold)
+        print()
+        results.print_comparison(rows)
+        if baseline.keys() - metrics.keys():
+            print(f"{len(baseline.keys() - metrics.keys())} baseline metrics were not measured in this run.")
+        if any(row["regression"] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Measures `terraform init` time for freshly generated blueprints with and
+without the shared plugin cache / warm init pool.
+
+Run from the `agentic_genomics/` directory:
+
+    python -m benchmarks.terraform_init_bench          # fake terraform
+    python -m benchmarks.terraform_init_bench --real   # terraform on PATH (needs network)
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+FAKE_TERRAFORM = Path(__file__).with_name("fake_terraform.py")
+
+MAIN_TF = """
+module "gke_cluster" {
+  source  = "GoogleCloudPlatform/cluster-toolkit/google//modules/gke"
+  version = "2.0.0"
+
+  project_id = "bench-project"
+  location   = "us-central1"
+  name       = "bench"
+}
+""".strip()
+
+
+def _new_blueprint(root: Path, i: int) -> str:
+    blueprint = root / f"blueprint_{i}"
+    blueprint.mkdir()
+    (blueprint / "main.tf").write_text(MAIN_TF)
+    return str(blueprint)
+
+
+def uncached_init(root: Path, terraform: str, runs: int) -> list[float]:
+    # What ExecuteTerraformApplyTool used to do: a cold init in a fresh dir.
+    env = {k: v for k, v in os.environ.items() if not k.startswith("TF_")}
+    timings = []
+    for i in range(runs):
+        blueprint = _new_blueprint(root, i)
+        start = time.perf_counter()
+        subprocess.run([terraform, "init", "-input=false", "-no-color"], cwd=blueprint, env=env,
+                       check=True, capture_output=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def cached_init(root: Path, runs: int) -> list[float]:
+    from tools.terraform_runner import init_blueprint
+
+    timings = []
+    for i in range(runs):
+        blueprint = _new_blueprint(root, i)
+        start = time.perf_counter()
+        result, _ = asyncio.run(init_blueprint(blueprint, root / "init.log"))
+        if result["status"] != "succeeded":
+            raise RuntimeError(f"init failed: {result['tail']}")
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _report(label: str, timings: list[float]):
+    rest = timings[1:] or timings
+    print(f"{label:<22} first {timings[0]:6.2f}s   subsequent mean {sum(rest) / len(rest):6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--real", action="store_true", help="Use the real terraform binary on PATH.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        os.environ["AGENTIC_GENOMICS_CACHE_DIR"] = str(tmp / "cache")
+        if args.real:
+            terraform = "terraform"
+        else:
+            terraform = str(FAKE_TERRAFORM)
+            os.environ["AGENTIC_GENOMICS_TERRAFORM_BIN"] = terraform
+            os.environ["AGENTIC_GENOMICS_TERRAFORM_OFFLINE"] = "1"  # Skip the network probe.
+        (tmp / "uncached").mkdir()
+        (tmp / "cached").mkdir()
+        _report("without cache", uncached_init(tmp / "uncached", terraform, args.runs))
+        _report("with cache/warm pool", cached_init(tmp / "cached", args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Micro-benchmarks for each tool in `tools/`: the latency of one `_run` call
+and the size of what it returns to the model. For the tools that write files
+(blueprint, params.json, nextflow.config) it also reports write throughput.
+
+Run from the `agentic_genomics/` directory:
+
+    python -m benchmarks.tool_bench [--iterations 50] [--only search_nf_core_pipelines]
+"""
+import argparse
+import json
+import tempfile
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from benchmarks.harness import isolate, report, time_calls
+from benchmarks.stub_llm import PARAMS, PIPELINE, REGION
+
+# Every apply runs the fake terraform binary, so time fewer of them.
+SUBPROCESS_ITERATIONS = 5
+
+TOOLKIT_VARIABLES = {"project_id": "bench-project", "location": REGION, "cluster_name": "bench-cluster",
+                     "machine_type": "n2-standard-8", "node_count": 4}
+
+
+class Case(NamedTuple):
+    name: str
+    tool: object
+    # Builds the keyword arguments for iteration i (negative during warm-up).
+    args: Callable[[int], dict]
+    # The file whose size counts towards write throughput, if any.
+    written: Callable[[dict], Path] | None = None
+    subprocess: bool = False
+
+
+def _blueprint(root: Path, name: str, project_id: str = "bench-project") -> str:
+    from tools.terraform_tools import CreateClusterToolkitBlueprintTool
+
+    path = root / name
+    CreateClusterToolkitBlueprintTool()._run(str(path), dict(TOOLKIT_VARIABLES, project_id=project_id))
+    return str(path)
+
+
+def _samplesheet(root: Path, rows: int = 200) -> str:
+    lines = ["sample,fastq_1,fastq_2,strandedness"]
+    for i in range(rows):
+        fastqs = [root / "fastq" / f"S{i}_R{read}.fastq.gz" for read in (1, 2)]
+        for fastq in fastqs:
+            fastq.parent.mkdir(exist_ok=True)
+            fastq.touch()
+        lines.append(f"S{i},{fastqs[0]},{fastqs[1]},auto")
+    path = root / "samplesheet.csv"
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def _configured_run(root: Path) -> tuple[str, str]:
+    from tools.nextflow_config import render_nextflow_config
+
+    params, config = root / "run_params.json", root / "run_nextflow.config"
+    params.write_text(json.dumps(PARAMS))
+    config.write_text(render_nextflow_config("bench-project", REGION, "gs://bench-bucket/work"))
+    return str(params), str(config)
+
+
+def cases(root: Path) -> list[Case]:
+    from tools.billing_tools import EstimateBlueprintCostTool
+    from tools.nextflow_tools import CreateNextflowConfigTool, CreateParamsJsonTool, RegisterNextflowRunTool
+    from tools.nf_core_tools import (GetPipelineParamsTool, GetPipelineSchemaTool, ListNfCorePipelinesTool,
+                                     SearchNfCorePipelinesTool)
+    from tools.preflight_tools import ValidateSamplesheetTool
+    from tools.sizing_tools import RecommendClusterSizeTool
+    from tools.terraform_tools import CreateClusterToolkitBlueprintTool, ExecuteTerraformApplyTool
+
+    priced = _blueprint(root, "priced")
+    samplesheet = _samplesheet(root)
+    params_json, nextflow_config = _configured_run(root)
+    return [
+        Case("list_nf_core_pipelines", ListNfCorePipelinesTool(), lambda i: {}),
+        Case("search_nf_core_pipelines", SearchNfCorePipelinesTool(), lambda i: {"query": "rna-seq gene expression"}),
+        Case("get_pipeline_schema", GetPipelineSchemaTool(), lambda i: {"pipeline_name": PIPELINE}),
+        Case("get_pipeline_params", GetPipelineParamsTool(), lambda i: {"pipeline_name": PIPELINE, "names": ["genome"]}),
+        Case("validate_samplesheet", ValidateSamplesheetTool(),
+             lambda i: {"samplesheet": samplesheet, "pipeline_name": PIPELINE}),
+        Case("create_params_json", CreateParamsJsonTool(),
+             lambda i: {"file_path": str(root / f"params_{i}.json"), "content": PARAMS},
+             written=lambda args: Path(args["file_path"])),
+        Case("create_nextflow_config", CreateNextflowConfigTool(),
+             lambda i: {"file_path": str(root / f"nextflow_{i}.config"), "project": "bench-project",
+                        "region": REGION, "work_dir": "gs://bench-bucket/work"},
+             written=lambda args: Path(args["file_path"])),
+        # Every call after the first resumes the first run's work dir.
+        Case("register_nextflow_run", RegisterNextflowRunTool(),
+             lambda i: {"pipeline_name": f"{PIPELINE}@3.14.0", "params_json_path": params_json,
+                        "nextflow_config_path": nextflow_config}),
+        Case("recommend_cluster_size", RecommendClusterSizeTool(),
+             lambda i: {"pipeline_name": PIPELINE, "samples": 48, "location": REGION, "deadline_hours": 12}),
+        Case("create_cluster_toolkit_blueprint", CreateClusterToolkitBlueprintTool(),
+             lambda i: {"blueprint_path": str(root / f"blueprint_{i}"), "toolkit_variables": TOOLKIT_VARIABLES},
+             written=lambda args: Path(args["blueprint_path"])),
+        Case("estimate_blueprint_cost", EstimateBlueprintCostTool(), lambda i: {"blueprint_path": priced}),
+        Case("estimate_blueprint_cost.compare", EstimateBlueprintCostTool(),
+             lambda i: {"blueprint_path": priced, "compare": {
+                 "machine_types": ["n2-standard-8", "e2-standard-8", "n2d-standard-8"],
+                 "node_counts": [2, 4, 8], "regions": ["us-central1", "europe-west1"]}}),
+        # A distinct project per apply, so the per-project start interval doesn't dominate.
+        Case("execute_terraform_apply", ExecuteTerraformApplyTool(),
+             lambda i: {"blueprint_path": _blueprint(root, f"apply_{i}", project_id=f"bench-apply-{i + 10}")},
+             subprocess=True),
+    ]
+
+
+def _size(path: Path) -> int:
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+    return path.stat().st_size
+
+
+def run_tools(iterations: int = 50, only: list[str] | None = None) -> dict:
+    metrics = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for case in cases(Path(tmp)):
+            if only and case.name not in only:
+                continue
+            n = SUBPROCESS_ITERATIONS if case.subprocess else iterations
+            # Argument set-up (e.g. writing a blueprint to apply) stays out of the timing.
+            prepared = {i: case.args(i) for i in [-1, *range(n)]}
+            timing, result = time_calls(lambda i, case=case, prepared=prepared: case.tool._run(**prepared[i]), n)
+            if isinstance(result, dict) and result.get("error"):
+                raise RuntimeError(f"{case.name} failed: {result['error']}")
+            metrics[f"tools.{case.name}.median_ms"] = timing["median_ms"]
+            metrics[f"tools.{case.name}.p95_ms"] = timing["p95_ms"]
+            metrics[f"tools.{case.name}.result_bytes"] = len(result if isinstance(result, str)
+                                                             else json.dumps(result, default=str))
+            if case.written:
+                size = _size(case.written(prepared[n - 1]))
+                seconds = max(timing["median_ms"], 1e-3) / 1000
+                metrics[f"writes.{case.name}.files_per_s"] = round(1 / seconds, 1)
+                metrics[f"writes.{case.name}.mb_per_s"] = round(size / seconds / 1e6, 3)
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--only", action="append", help="Benchmark only this tool (repeatable).")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate(Path(tmp))
+        report(run_tools(args.iterations, args.only))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+The HTTP serving entry point, on port 8080 in the container:
+
+    uvicorn main:app --app-dir agentic_genomics --host 0.0.0.0 --port 8080
+
+Each tenant (the `X-Tenant-ID` header) owns its sessions: ADK keys sessions
+by user, and the tenant is the user, so one tenant can never read or post to
+another's session. A turn runs on behalf of its tenant (tools/tenancy.py),
+so the stage result cache, the Nextflow run registry, the cluster pool and
+workflow runs and batches are all scoped to it: one tenant never gets
+another's cached configuration, `-resume` lineage or cluster, and can't
+resume or release another's run. A session runs one turn at a time.
+
+The server does not authenticate anyone; it trusts `X-Tenant-ID` as given.
+Deploy it only behind an authenticating proxy (e.g. an API gateway or IAP)
+that sets the header from the caller's verified identity and overwrites any
+value the client sent, and never expose port 8080 directly. Turns go through
+admission control (tools/admission.py), and blocking tool work runs in
+bounded pools (tools/offload.py), so a long Terraform apply in one session
+doesn't stall the event loop for the others.
+
+The orchestrator and its runner are built on the first turn, so a
+scale-to-zero container starts serving (e.g. `/healthz`) without importing
+the agent tree.
+"""
+import asyncio
+import re
+
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from tools.admission import AdmissionControl, AdmissionRejected
+from tools.offload import run_blocking
+from tools.tenancy import tenant_scope
+
+APP_NAME = "agentic_genomics"
+_TENANT = re.compile(r"[A-Za-z0-9_.-]{1,64}")
+
+app = FastAPI(title="agentic_genomics")
+admission = AdmissionControl()
+
+_runner = None
+_runner_lock = asyncio.Lock()
+# (tenant, session_id) of the sessions with a turn in progress.
+_busy: set[tuple[str, str]] = set()
+
+
+class Message(BaseModel):
+    text: str
+
+
+def _build_runner():
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+
+    from agent import root_agent
+
+    return Runner(agent=root_agent, app_name=APP_NAME, session_service=InMemorySessionService())
+
+
+async def get_runner():
+    global _runner
+    if _runner is None:
+        async with _runner_lock:
+            if _runner is None:
+                # Importing the agent tree takes a while; keep it off the event loop.
+                _runner = await run_blocking("tools", _build_runner)
+    return _runner
+
+
+def _tenant(tenant_id: str | None) -> str:
+    # Set by the authenticating proxy in front of the server; see the module docstring.
+    if tenant_id is None or not _TENANT.fullmatch(tenant_id):
+        raise HTTPException(status_code=400, detail="An X-Tenant-ID header of letters, digits, '_', '.' or '-' is required.")
+    return tenant_id
+
+
+@app.exception_handler(AdmissionRejected)
+async def _admission_rejected(request: Request, e: AdmissionRejected):
+    return JSONResponse(status_code=e.status_code, content={"error": str(e)},
+                        headers={"Retry-After": str(e.retry_after_seconds)})
+
+
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok", "agents_loaded": _runner is not None, **admission.stats()}
+
+
+@app.post("/sessions")
+async def create_session(x_tenant_id: str = Header(None)):
+    tenant = _tenant(x_tenant_id)
+    runner = await get_runner()
+    session = await runner.session_service.create_session(app_name=APP_NAME, user_id=tenant)
+    return {"session_id": session.id}
+
+
+@app.delete("/sessions/{session_id}")
+async def delete_session(session_id: str, x_tenant_id: str = Header(None)):
+    tenant = _tenant(x_tenant_id)
+    runner = await get_runner()
+    if await runner.session_service.get_session(app_name=APP_NAME, user_id=tenant, session_id=session_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown session '{session_id}'.")
+    if (tenant, session_id) in _busy:
+        raise HTTPException(status_code=409, detail=f"Session '{session_id}' has a turn in progress.")
+    await runner.session_service.delete_session(app_name=APP_NAME, user_id=tenant, session_id=session_id)
+    return {"deleted": session_id}
+
+
+@app.post("/sessions/{session_id}/messages")
+async def post_message(session_id: str, message: Message, x_tenant_id: str = Header(None)):
+    from google.genai import types
+
+    tenant = _tenant(x_tenant_id)
+    runner = await get_runner()
+    if await runner.session_service.get_session(app_name=APP_NAME, user_id=tenant, session_id=session_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown session '{session_id}'.")
+    key = (tenant, session_id)
+    if key in _busy:
+        raise HTTPException(status_code=409, detail=f"Session '{session_id}' already has a turn in progress.")
+    _busy.add(key)
+    try:
+        # The tenant scope carries over to the tools and workflow threads the turn runs.
+        async with admission.slot(tenant):
+            with tenant_scope(tenant):
+                response, events = "", 0
+                async for event in runner.run_async(
+                        user_id=tenant, session_id=session_id,
+                        new_message=types.Content(role="user", parts=[types.Part(text=message.text)])):
+                    events += 1
+                    if event.content and event.content.parts and event.is_final_response():
+                        response = "".join(part.text or "" for part in event.content.parts)
+    finally:
+        _busy.discard(key)
+    return {"session_id": session_id, "response": response, "events": events}
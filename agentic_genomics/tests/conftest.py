@@ -0,0 +1,22 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The modules import each other from the `agentic_genomics/` directory (`from tools.x import ...`).
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.harness import FAKE_TERRAFORM  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    """Every cache and store under tmp_path, offline, with the fake terraform binary."""
+    monkeypatch.setenv("AGENTIC_GENOMICS_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("AGENTIC_GENOMICS_TRACE_DIR", str(tmp_path / "traces"))
+    monkeypatch.setenv("AGENTIC_GENOMICS_CATALOG_OFFLINE", "1")
+    monkeypatch.setenv("AGENTIC_GENOMICS_TERRAFORM_OFFLINE", "1")
+    monkeypatch.setenv("AGENTIC_GENOMICS_TERRAFORM_BIN", str(FAKE_TERRAFORM))
+    for name in ("MODULE", "PROVIDER", "APPLY", "PLAN", "DESTROY"):
+        monkeypatch.setenv(f"FAKE_TERRAFORM_{name}_DELAY", "0")
+    return tmp_path
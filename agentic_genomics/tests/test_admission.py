@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from tools.admission import AdmissionControl, AdmissionRejected
+
+IDLE = {"active": 0, "queued": 0, "tenants": 0}
+
+
+def _counters(admission: AdmissionControl) -> dict:
+    return {key: admission.stats()[key] for key in IDLE}
+
+
+async def _hold(admission: AdmissionControl, tenant: str, entered: asyncio.Event, leave: asyncio.Event):
+    async with admission.slot(tenant):
+        entered.set()
+        await leave.wait()
+
+
+def test_tenant_over_its_limit_is_rejected_with_429():
+    admission = AdmissionControl(max_active=4, max_queued=4, max_per_tenant=1)
+
+    async def scenario():
+        async with admission.slot("lab-a"):
+            with pytest.raises(AdmissionRejected) as rejected:
+                async with admission.slot("lab-a"):
+                    pass
+            assert rejected.value.status_code == 429 and rejected.value.retry_after_seconds == 1
+            # Other tenants are unaffected.
+            async with admission.slot("lab-b"):
+                assert _counters(admission) == {"active": 2, "queued": 0, "tenants": 2}
+
+    asyncio.run(scenario())
+    assert _counters(admission) == IDLE and admission.stats()["rejected_429"] == 1
+
+
+def test_turn_beyond_a_full_queue_is_rejected_with_503():
+    admission = AdmissionControl(max_active=1, max_queued=1, max_per_tenant=8)
+
+    async def scenario():
+        entered, queued_entered, leave = asyncio.Event(), asyncio.Event(), asyncio.Event()
+        active = asyncio.create_task(_hold(admission, "lab-a", entered, leave))
+        await entered.wait()
+        queued = asyncio.create_task(_hold(admission, "lab-b", queued_entered, leave))
+        await asyncio.sleep(0)
+        assert _counters(admission) == {"active": 1, "queued": 1, "tenants": 2}
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with admission.slot("lab-c"):
+                pass
+        assert rejected.value.status_code == 503
+        assert _counters(admission) == {"active": 1, "queued": 1, "tenants": 2}
+        leave.set()
+        await asyncio.gather(active, queued)
+        assert queued_entered.is_set()
+
+    asyncio.run(scenario())
+    assert _counters(admission) == IDLE and admission.stats()["rejected_503"] == 1
+
+
+def test_queue_timeout_is_rejected_with_503():
+    admission = AdmissionControl(max_active=1, max_queued=1, max_per_tenant=8, queue_timeout_seconds=0.01)
+
+    async def scenario():
+        entered, leave = asyncio.Event(), asyncio.Event()
+        active = asyncio.create_task(_hold(admission, "lab-a", entered, leave))
+        await entered.wait()
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with admission.slot("lab-b"):
+                pass
+        assert rejected.value.status_code == 503
+        assert _counters(admission) == {"active": 1, "queued": 0, "tenants": 1}
+        leave.set()
+        await active
+
+    asyncio.run(scenario())
+    assert _counters(admission) == IDLE
+
+
+def test_cancelled_turn_gives_back_its_place():
+    admission = AdmissionControl(max_active=1, max_queued=1, max_per_tenant=1)
+
+    async def scenario():
+        entered, queued_entered, leave = asyncio.Event(), asyncio.Event(), asyncio.Event()
+        active = asyncio.create_task(_hold(admission, "lab-a", entered, leave))
+        await entered.wait()
+        queued = asyncio.create_task(_hold(admission, "lab-b", queued_entered, leave))
+        await asyncio.sleep(0)
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert _counters(admission) == {"active": 1, "queued": 0, "tenants": 1}
+        # The client went away mid-turn: the slot is freed for the next turn.
+        active.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await active
+        assert _counters(admission) == IDLE
+        async with admission.slot("lab-b"):
+            pass
+
+    asyncio.run(scenario())
+    assert _counters(admission) == IDLE
+    assert admission.stats()["rejected_429"] == admission.stats()["rejected_503"] == 0
@@ -0,0 +1,14 @@
+import sys
+
+from benchmarks import e2e_bench, suite
+
+
+def _missing_adk(*args, **kwargs):
+    raise ModuleNotFoundError("No module named 'google'")
+
+
+def test_e2e_without_adk_is_skipped_with_the_import_error(monkeypatch, capsys):
+    monkeypatch.setattr(e2e_bench, "run_e2e", _missing_adk)
+    monkeypatch.setattr(sys, "argv", ["suite", "e2e"])
+    suite.main()
+    assert capsys.readouterr().out.splitlines() == ["skipping e2e: ModuleNotFoundError: No module named 'google'"]
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+from benchmarks.cluster_pool_bench import _blueprint
+from tools import cluster_pool
+from tools.cluster_pool import PROVISIONING, ClusterPool
+from tools.terraform_runner import apply_blueprint
+from tools.tracing import Tracer
+
+
+def _pool(tmp_path, **kwargs) -> ClusterPool:
+    return ClusterPool(path=tmp_path / "pool", **{"idle_ttl_seconds": 0, **kwargs})
+
+
+def test_identical_blueprint_reuses_the_leased_cluster(tmp_path):
+    pool = _pool(tmp_path)
+    first = asyncio.run(pool.lease(_blueprint(tmp_path, "a"), apply_blueprint))
+    second = asyncio.run(pool.lease(_blueprint(tmp_path, "b"), apply_blueprint))
+    assert first["status"] == "succeeded" and not first["reused"]
+    assert second["reused"] and second["cluster_id"] == first["cluster_id"]
+    assert pool.clusters()[0]["leases"] == 2
+
+
+def test_clusters_are_not_shared_across_tenants(tmp_path):
+    pool = _pool(tmp_path)
+    first = asyncio.run(pool.lease(_blueprint(tmp_path, "a"), apply_blueprint, tenant="lab-a"))
+    second = asyncio.run(pool.lease(_blueprint(tmp_path, "b"), apply_blueprint, tenant="lab-b"))
+    assert not second["reused"] and second["cluster_id"] != first["cluster_id"]
+    assert asyncio.run(pool.lease(_blueprint(tmp_path, "c"), apply_blueprint, tenant="lab-a"))["reused"]
+
+
+def test_leased_cluster_is_not_reaped_until_every_lease_is_released(tmp_path):
+    pool = _pool(tmp_path)
+    first = asyncio.run(pool.lease(_blueprint(tmp_path, "a"), apply_blueprint))
+    second = asyncio.run(pool.lease(_blueprint(tmp_path, "b"), apply_blueprint))
+    assert pool.release(first["lease_id"])
+    assert not pool.release(first["lease_id"])
+    assert asyncio.run(pool.reap_idle()) == []
+    pool.release(second["lease_id"])
+    reaped = asyncio.run(pool.reap_idle())
+    assert [r["status"] for r in reaped] == ["succeeded"]
+    assert pool.clusters() == [] and not Path(first["cluster_path"]).exists()
+
+
+def test_unreleased_lease_expires(tmp_path):
+    pool = _pool(tmp_path, lease_seconds=0.05)
+    asyncio.run(pool.lease(_blueprint(tmp_path, "a"), apply_blueprint))
+    assert asyncio.run(pool.reap_idle()) == []
+    time.sleep(0.1)
+    assert len(asyncio.run(pool.reap_idle())) == 1
+
+
+def test_renew_extends_a_live_lease_only(tmp_path):
+    pool = _pool(tmp_path, lease_seconds=1)
+    lease = asyncio.run(pool.lease(_blueprint(tmp_path, "a"), apply_blueprint))
+    for _ in range(3):
+        time.sleep(0.5)
+        assert pool.renew(lease["lease_id"])
+    assert asyncio.run(pool.reap_idle()) == []
+    time.sleep(1.1)
+    assert not pool.renew(lease["lease_id"])
+    assert len(asyncio.run(pool.reap_idle())) == 1
+
+
+def test_held_lease_outlives_its_lease_period_until_the_holder_is_gone(tmp_path):
+    alive = {"run-1"}
+    pool = _pool(tmp_path, lease_seconds=1, holder_alive=lambda holder: holder in alive)
+    asyncio.run(pool.lease(_blueprint(tmp_path, "a"), apply_blueprint, holder="run-1"))
+    for _ in range(3):
+        time.sleep(0.5)
+        assert pool.renew_held() == 1
+        assert asyncio.run(pool.reap_idle()) == []
+    alive.clear()
+    assert pool.renew_held() == 0
+    assert pool.clusters()[0]["leases"] == 0
+    assert len(asyncio.run(pool.reap_idle())) == 1
+
+
+def test_held_lease_stops_renewing_after_the_max_hold(tmp_path):
+    pool = _pool(tmp_path, lease_seconds=0.05, max_hold_seconds=0.1)
+    asyncio.run(pool.lease(_blueprint(tmp_path, "a"), apply_blueprint, holder="run-1"))
+    assert pool.renew_held() == 1
+    time.sleep(0.15)
+    assert pool.renew_held() == 0
+    assert len(asyncio.run(pool.reap_idle())) == 1
+
+
+def test_release_holder_ends_all_its_leases(tmp_path):
+    pool = _pool(tmp_path)
+    leases = [asyncio.run(pool.lease(_blueprint(tmp_path, name), apply_blueprint, holder="run-1"))
+              for name in ("a", "b")]
+    other = asyncio.run(pool.lease(_blueprint(tmp_path, "c"), apply_blueprint, holder="run-2"))
+    assert sorted(pool.release_holder("run-1")) == sorted(lease["lease_id"] for lease in leases)
+    assert pool.clusters()[0]["leases"] == 1
+    pool.release_holder("run-2")
+    assert [r["cluster_id"] for r in asyncio.run(pool.reap_idle())] == [other["cluster_id"]]
+
+
+def test_store_without_holders_is_migrated(tmp_path):
+    (tmp_path / "pool").mkdir()
+    db = sqlite3.connect(tmp_path / "pool" / "clusters.sqlite3")
+    db.execute("CREATE TABLE leases (id TEXT PRIMARY KEY, cluster_id TEXT NOT NULL,"
+               " acquired_at REAL NOT NULL, expires_at REAL NOT NULL)")
+    db.close()
+    pool = _pool(tmp_path)
+    asyncio.run(pool.lease(_blueprint(tmp_path, "a"), apply_blueprint, holder="run-1"))
+    assert pool.release_holder("run-1")
+
+
+def test_abandoned_provisioning_is_reclaimed_after_its_own_threshold(tmp_path):
+    lease = asyncio.run(_pool(tmp_path).lease(_blueprint(tmp_path, "a"), apply_blueprint))
+    pool = _pool(tmp_path)
+    pool.release(lease["lease_id"])
+    pool._set_state(lease["cluster_id"], PROVISIONING)  # The run applying it died.
+    assert asyncio.run(pool.reap_idle()) == []
+    reaped = asyncio.run(_pool(tmp_path, abandoned_after_seconds=0).reap_idle())
+    assert [r["cluster_id"] for r in reaped] == [lease["cluster_id"]]
+
+
+def test_reaper_failures_are_traced(tmp_path, monkeypatch):
+    monkeypatch.setattr(cluster_pool, "tracer", Tracer(trace_dir=tmp_path, enabled=True))
+    pool = _pool(tmp_path)
+
+    def renew_held():
+        raise sqlite3.OperationalError("database is locked")
+
+    pool.renew_held = renew_held
+    pool.start_reaper(interval_seconds=0.01)
+    time.sleep(0.1)
+    pool.stop_reaper()
+    cluster_pool.tracer.flush()
+    spans = [json.loads(line) for line in (tmp_path / "spans.jsonl").read_text().splitlines()]
+    assert spans and {span["name"] for span in spans} == {"cluster_reaper"}
+    assert spans[0]["status"] == {"code": "ERROR", "message": "database is locked"}
@@ -0,0 +1,73 @@
+import itertools
+import json
+
+import numpy as np
+import pytest
+
+from tools.cost_engine import BILLING_SNAPSHOT_PATH, SkuIndex, cost_grid, estimate_blueprint_cost
+from tools.tfvars import render_tfvars
+
+MACHINE_TYPES = ["n2-standard-8", "e2-highmem-4", "c2-standard-16", "n2d-custom-6-24576"]
+NODE_COUNTS = [1, 3, 8]
+REGIONS = ["us-central1", "europe-west1", "asia-southeast1"]
+HOURS = [24, 730]
+
+
+def _blueprint(tmp_path, **variables) -> str:
+    path = tmp_path / "blueprint"
+    path.mkdir(exist_ok=True)
+    (path / "terraform.tfvars").write_text(render_tfvars(variables))
+    return str(path)
+
+
+@pytest.mark.parametrize("spot,disk_type", [(False, "pd-standard"), (True, "pd-ssd")])
+def test_grid_matches_the_blueprint_estimate(tmp_path, spot, disk_type):
+    index = SkuIndex()
+    grid = cost_grid(MACHINE_TYPES, NODE_COUNTS, REGIONS, HOURS, spot=spot, disk_size_gb=200, disk_type=disk_type,
+                     index=index)
+    assert grid.usd.shape == (4, 3, 3, 2) and grid.unpriced == 0
+    for (m, machine_type), (n, nodes), (r, region), (h, hours) in itertools.product(
+            enumerate(MACHINE_TYPES), enumerate(NODE_COUNTS), enumerate(REGIONS), enumerate(HOURS)):
+        blueprint = _blueprint(tmp_path, location=f"{region}-b", machine_type=machine_type, max_node_count=nodes,
+                               spot=spot, disk_size_gb=200, disk_type=disk_type)
+        estimate = estimate_blueprint_cost(blueprint, run_hours=hours, index=index)
+        assert estimate["max"]["total_usd"] == round(float(grid.usd[m, n, r, h]), 2)
+
+
+def test_cheapest_is_sorted_and_starts_at_the_grid_minimum():
+    grid = cost_grid(MACHINE_TYPES, NODE_COUNTS, REGIONS, HOURS)
+    cheapest = grid.cheapest(5)
+    assert [c["total_usd"] for c in cheapest] == sorted(c["total_usd"] for c in cheapest)
+    assert cheapest[0]["total_usd"] == round(float(grid.usd.min()), 2)
+    assert len(grid.cheapest(1000)) == grid.usd.size
+
+
+@pytest.fixture
+def index_without_spot_n2_in_europe(tmp_path) -> SkuIndex:
+    snapshot = json.loads(BILLING_SNAPSHOT_PATH.read_text())
+    snapshot["skus"] = [sku for sku in snapshot["skus"] if not (
+        sku["description"].startswith("Spot Preemptible N2 ") and "europe-west1" in sku["serviceRegions"])]
+    path = tmp_path / "billing.json"
+    path.write_text(json.dumps(snapshot))
+    return SkuIndex(path)
+
+
+def test_configurations_without_prices_are_left_out(index_without_spot_n2_in_europe):
+    grid = cost_grid(["n2-standard-8", "e2-standard-8"], [2], ["europe-west1", "us-central1"], [24], spot=True,
+                     index=index_without_spot_n2_in_europe)
+    assert grid.unpriced == 1
+    cheapest = grid.cheapest(5)
+    assert len(cheapest) == 3 and all(np.isfinite(c["total_usd"]) for c in cheapest)
+    assert ("n2-standard-8", "europe-west1") not in {(c["machine_type"], c["region"]) for c in cheapest}
+
+
+def test_estimate_without_prices_is_an_error(tmp_path, index_without_spot_n2_in_europe):
+    blueprint = _blueprint(tmp_path, location="europe-west1-b", machine_type="n2-standard-8", spot=True)
+    with pytest.raises(ValueError, match="No prices for Spot n2-standard-8 in europe-west1"):
+        estimate_blueprint_cost(blueprint, index=index_without_spot_n2_in_europe)
+
+
+def test_unknown_disk_type_is_an_error(tmp_path):
+    blueprint = _blueprint(tmp_path, location="us-central1", disk_type="hyperdisk-extreme")
+    with pytest.raises(ValueError, match="Unsupported disk type"):
+        estimate_blueprint_cost(blueprint)
@@ -0,0 +1,39 @@
+import pytest
+
+pytest.importorskip("google.adk")
+
+from tools.deployment_workflow import BatchDeploymentWorkflowTool, batch_concurrency  # noqa: E402
+
+
+class _Workflows:
+    """Stands in for DeploymentWorkflowTool: each request's result, or an error after `fail_after` results."""
+
+    def __init__(self, fail_after: int | None = None):
+        self.fail_after = fail_after
+
+    def run_batch(self, requests, max_concurrency=None):
+        for index, request in enumerate(requests):
+            if index == self.fail_after:
+                raise RuntimeError("worker pool shut down")
+            yield {"index": index, "status": "succeeded", "result": request}
+
+
+def test_invalid_concurrency_is_rejected_before_the_batch_starts(monkeypatch):
+    tool = BatchDeploymentWorkflowTool(_Workflows())
+    assert "at least 1" in tool._run(["rnaseq"], max_concurrency=0)["error"]
+    monkeypatch.setenv("AGENTIC_GENOMICS_BATCH_CONCURRENCY", "four")
+    assert "positive integer" in tool._run(["rnaseq"])["error"]
+    assert tool._batches == {}
+    monkeypatch.setenv("AGENTIC_GENOMICS_BATCH_CONCURRENCY", "2")
+    assert batch_concurrency() == 2 and batch_concurrency(8) == 8
+
+
+def test_batch_that_stops_early_is_done_with_an_error():
+    tool = BatchDeploymentWorkflowTool(_Workflows(fail_after=1))
+    batch_id = tool.start([{"request": "rnaseq"}, {"request": "sarek"}, {"request": "atacseq"}])
+    results = tool.results(batch_id, wait_seconds=5)
+    while not results["done"]:
+        results = tool.results(batch_id, since=results["finished"], wait_seconds=5)
+    results = tool.results(batch_id)
+    assert results["finished"] == 1 and results["total"] == 3
+    assert "worker pool shut down" in results["error"]
@@ -0,0 +1,121 @@
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("fastapi")
+httpx = pytest.importorskip("httpx")
+
+import main  # noqa: E402
+from tools.admission import AdmissionControl  # noqa: E402
+from tools.tenancy import current_tenant  # noqa: E402
+
+
+class _Sessions:
+    def __init__(self):
+        self._sessions: set[tuple[str, str]] = set()
+        self._ids = itertools.count(1)
+
+    async def create_session(self, app_name: str, user_id: str):
+        session = SimpleNamespace(id=f"session-{next(self._ids)}")
+        self._sessions.add((user_id, session.id))
+        return session
+
+    async def get_session(self, app_name: str, user_id: str, session_id: str):
+        return SimpleNamespace(id=session_id) if (user_id, session_id) in self._sessions else None
+
+    async def delete_session(self, app_name: str, user_id: str, session_id: str):
+        self._sessions.discard((user_id, session_id))
+
+
+class _Runner:
+    """Answers each turn with the tenant it ran as, once `finish` is set."""
+
+    def __init__(self):
+        self.session_service = _Sessions()
+        self.started = asyncio.Event()
+        self.finish = asyncio.Event()
+
+    async def run_async(self, user_id: str, session_id: str, new_message):
+        self.started.set()
+        await self.finish.wait()
+        yield SimpleNamespace(content=SimpleNamespace(parts=[SimpleNamespace(text=current_tenant())]),
+                              is_final_response=lambda: True)
+
+
+@pytest.fixture
+def runner(monkeypatch) -> _Runner:
+    runner = _Runner()
+    monkeypatch.setattr(main, "_runner", runner)
+    monkeypatch.setattr(main, "_busy", set())
+    monkeypatch.setattr(main, "admission", AdmissionControl(max_active=4, max_queued=4, max_per_tenant=1))
+    return runner
+
+
+def _client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test")
+
+
+def test_tenant_header_is_required_and_validated(runner):
+    async def scenario():
+        async with _client() as client:
+            assert (await client.post("/sessions")).status_code == 400
+            for tenant in ("lab a", "../lab-a", "x" * 65, ""):
+                assert (await client.post("/sessions", headers={"X-Tenant-ID": tenant})).status_code == 400
+            response = await client.post("/sessions", headers={"X-Tenant-ID": "lab-a.rna_1"})
+            assert response.status_code == 200
+            session_id = response.json()["session_id"]
+            # Another tenant can't see the session.
+            response = await client.delete(f"/sessions/{session_id}", headers={"X-Tenant-ID": "lab-b"})
+            assert response.status_code == 404
+            response = await client.delete(f"/sessions/{session_id}", headers={"X-Tenant-ID": "lab-a.rna_1"})
+            assert response.json() == {"deleted": session_id}
+
+    asyncio.run(scenario())
+
+
+def test_busy_session_rejects_a_second_turn_and_its_deletion(runner):
+    pytest.importorskip("google.genai")
+    headers = {"X-Tenant-ID": "lab-a"}
+
+    async def scenario():
+        async with _client() as client:
+            session_id = (await client.post("/sessions", headers=headers)).json()["session_id"]
+            url = f"/sessions/{session_id}/messages"
+            first = asyncio.create_task(client.post(url, json={"text": "rnaseq"}, headers=headers))
+            await runner.started.wait()
+            assert (await client.post(url, json={"text": "again"}, headers=headers)).status_code == 409
+            assert (await client.delete(f"/sessions/{session_id}", headers=headers)).status_code == 409
+            runner.finish.set()
+            response = await first
+            assert response.status_code == 200
+            assert response.json() == {"session_id": session_id, "response": "lab-a", "events": 1}
+            # The session is free again.
+            assert (await client.post(url, json={"text": "again"}, headers=headers)).status_code == 200
+            assert (await client.delete(f"/sessions/{session_id}", headers=headers)).status_code == 200
+
+    asyncio.run(scenario())
+    assert main._busy == set()
+
+
+def test_turn_over_the_tenant_limit_is_rejected_with_retry_after(runner):
+    pytest.importorskip("google.genai")
+    headers = {"X-Tenant-ID": "lab-a"}
+
+    async def scenario():
+        async with _client() as client:
+            first, second = [(await client.post("/sessions", headers=headers)).json()["session_id"] for _ in range(2)]
+            turn = asyncio.create_task(client.post(f"/sessions/{first}/messages", json={"text": "a"}, headers=headers))
+            await runner.started.wait()
+            response = await client.post(f"/sessions/{second}/messages", json={"text": "b"}, headers=headers)
+            assert response.status_code == 429 and response.headers["Retry-After"] == "1"
+            runner.finish.set()
+            assert (await turn).status_code == 200
+            # The rejected session isn't left marked busy.
+            response = await client.post(f"/sessions/{second}/messages", json={"text": "b"}, headers=headers)
+            assert response.status_code == 200
+            health = (await client.get("/healthz")).json()
+            assert health["rejected_429"] == 1 and health["active"] == 0 and health["agents_loaded"]
+
+    asyncio.run(scenario())
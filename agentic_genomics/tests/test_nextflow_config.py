@@ -0,0 +1,35 @@
+import pytest
+
+from tools.nextflow_config import _check_syntax, config_settings, render_nextflow_config
+
+SETTINGS = {"project": "core-facility-prod", "region": "us-central1", "work_dir": "gs://core-facility-work/rnaseq"}
+
+
+def test_hyphenated_label_keys_are_quoted():
+    config = render_nextflow_config(**SETTINGS, labels={"cost-center": "lab-a", "pipeline": "rnaseq"})
+    assert "    resourceLabels = ['cost-center': 'lab-a', 'pipeline': 'rnaseq']\n" in config
+
+
+def test_invalid_label_key_is_rejected():
+    with pytest.raises(ValueError, match="not a valid GCP label"):
+        render_nextflow_config(**SETTINGS, labels={"Cost Center": "lab-a"})
+
+
+def test_process_overrides_render_and_check():
+    config = render_nextflow_config(**SETTINGS, process_overrides={
+        "withLabel:process_high": {"cpus": 16, "memory": "64 GB", "errorStrategy": "retry"}})
+    assert "    withLabel:'process_high' {\n        cpus = 16\n        memory = '64 GB'\n" in config
+    _check_syntax(config)
+
+
+def test_check_syntax_catches_template_mistakes():
+    with pytest.raises(ValueError, match="unterminated string"):
+        _check_syntax("workDir = 'gs://bucket\n")
+    with pytest.raises(ValueError, match="unbalanced"):
+        _check_syntax("process {\n")
+
+
+def test_work_dir_round_trips():
+    config = render_nextflow_config(**{**SETTINGS, "work_dir": "gs://other/work's"})
+    assert config_settings(config) == {"work_dir": "gs://other/work's", "project": "core-facility-prod",
+                                      "region": "us-central1"}
@@ -0,0 +1,137 @@
+import json
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import tools.nf_core_catalog as nf_core_catalog
+from tools.nf_core_catalog import NfCoreCatalog
+from tools.nf_core_schema_store import split_pipeline_ref
+
+WORKFLOWS = [
+    {"full_name": "nf-core/rnaseq", "description": "RNA sequencing analysis pipeline",
+     "topics": ["rna-seq", "gene-expression"], "releases": [{"tag_name": "3.14.0"}]},
+    {"full_name": "nf-core/scrnaseq", "description": "Single-cell RNA-Seq pipeline",
+     "topics": ["single-cell", "rna"], "releases": [{"tag_name": "2.5.1"}]},
+    {"full_name": "nf-core/differentialabundance", "description": "Differential abundance of RNA-Seq counts",
+     "topics": ["differential-expression"], "releases": [{"tag_name": "1.4.0"}]},
+    {"full_name": "nf-core/sarek", "description": "Germline and somatic variant calling",
+     "topics": ["variant-calling", "somatic"], "releases": [{"tag_name": "3.4.0"}]},
+]
+
+
+class _Server:
+    """Serves pipelines.json with an ETag and answers a matching If-None-Match with 304."""
+
+    def __init__(self):
+        self.payload = {"remote_workflows": WORKFLOWS}
+        self.etag = '"v1"'
+        self.status = None  # Set to fail every request with this status.
+        self.requests: list[str | None] = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(self.headers.get("If-None-Match"))
+                if server.status:
+                    self.send_error(server.status)
+                elif self.headers.get("If-None-Match") == server.etag:
+                    self.send_response(304)
+                    self.end_headers()
+                else:
+                    body = json.dumps(server.payload).encode()
+                    self.send_response(200)
+                    self.send_header("ETag", server.etag)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_port}/pipelines.json"
+        threading.Thread(target=self._httpd.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = _Server()
+    yield server
+    server.close()
+
+
+def _catalog(tmp_path, server, ttl_seconds: float = 0) -> NfCoreCatalog:
+    return NfCoreCatalog(cache_path=tmp_path / "catalog.json", ttl_seconds=ttl_seconds, url=server.url)
+
+
+def test_name_matches_outrank_topic_and_description_matches(tmp_path, server):
+    catalog = _catalog(tmp_path, server)
+    assert catalog.refresh()
+    results = catalog.search("RNA-Seq analysis", top_k=3)
+    assert [r["name"] for r in results] == ["nf-core/rnaseq", "nf-core/scrnaseq", "nf-core/differentialabundance"]
+    assert results[0]["latest_release"] == "3.14.0"
+    assert [r["score"] for r in results] == sorted((r["score"] for r in results), reverse=True)
+    assert catalog.search("somatic variant calling", top_k=1)[0]["name"] == "nf-core/sarek"
+    # Stopwords alone match nothing.
+    assert catalog.search("the analysis pipeline") == []
+
+
+def test_unchanged_catalog_is_revalidated_with_its_etag(tmp_path, server):
+    catalog = _catalog(tmp_path, server)
+    assert catalog.refresh()
+    assert not catalog.refresh()  # 304: nothing changed.
+    assert server.requests == [None, '"v1"']
+
+    # The ETag survives a restart.
+    restarted = _catalog(tmp_path, server)
+    assert [p["name"] for p in restarted.pipelines] == [w["full_name"] for w in WORKFLOWS]
+    assert not restarted.refresh()
+    assert server.requests[-1] == '"v1"'
+
+    server.payload = {"remote_workflows": WORKFLOWS[:1]}
+    server.etag = '"v2"'
+    assert restarted.refresh()
+    assert [p["name"] for p in restarted.pipelines] == ["nf-core/rnaseq"]
+
+
+def test_fresh_catalog_is_not_revalidated(tmp_path, server):
+    catalog = _catalog(tmp_path, server, ttl_seconds=3600)
+    assert catalog.refresh()
+    assert not catalog.refresh() and not catalog.refresh_in_background()
+    assert len(server.requests) == 1
+
+
+def test_failed_fetch_keeps_the_catalog_and_backs_off(tmp_path, server):
+    catalog = _catalog(tmp_path, server)
+    server.status = 500
+    before = catalog.pipelines
+    assert not catalog.refresh()
+    assert catalog.pipelines is before
+    assert not catalog.refresh()
+    assert len(server.requests) == 1
+
+
+def test_background_refresh_replaces_the_catalog(tmp_path, server):
+    catalog = _catalog(tmp_path, server)
+    assert catalog.refresh_in_background()
+    for thread in threading.enumerate():
+        if thread.name == "nf-core-catalog-refresh":
+            thread.join()
+    assert server.requests == [None]
+    assert [p["name"] for p in catalog.pipelines] == [w["full_name"] for w in WORKFLOWS]
+
+
+def test_resolving_a_pipeline_never_fetches_the_catalog(monkeypatch):
+    monkeypatch.delenv("AGENTIC_GENOMICS_CATALOG_OFFLINE")
+    monkeypatch.setattr(nf_core_catalog, "_catalog", None)
+    fetches = []
+    monkeypatch.setattr(urllib.request, "urlopen", lambda *args, **kwargs: fetches.append(args))
+    assert split_pipeline_ref("rnaseq") == ("nf-core/rnaseq", "3.14.0")
+    assert nf_core_catalog.get_catalog().search("rna-seq")
+    assert fetches == []
@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+
+from tools.nf_core_catalog import _normalize_entry
+from tools.nf_core_schema_store import SchemaStore, pin_release, split_pipeline_ref
+from tools.stage_memo import PIPELINE_SELECTION_KEY, pin_pipeline_selection, selected_pipeline
+
+SCHEMA = {"input": {"type": "string"}, "outdir": {"type": "string"}}
+
+
+def test_unpinned_ref_resolves_to_latest_release():
+    assert split_pipeline_ref("rnaseq") == ("nf-core/rnaseq", "3.14.0")
+    assert split_pipeline_ref("nf-core/rnaseq@latest") == ("nf-core/rnaseq", "3.14.0")
+
+
+def test_explicit_revision_wins():
+    assert split_pipeline_ref("nf-core/rnaseq@3.12.0") == ("nf-core/rnaseq", "3.12.0")
+    assert split_pipeline_ref("nf-core/rnaseq@3.12.0", "dev") == ("nf-core/rnaseq", "dev")
+
+
+def test_unknown_pipeline_falls_back_to_default_branch():
+    assert split_pipeline_ref("nf-core/not-a-pipeline") == ("nf-core/not-a-pipeline", "master")
+
+
+def test_latest_release_skips_dev_and_prefers_publish_date():
+    entry = _normalize_entry({"full_name": "nf-core/x", "releases": [
+        {"tag_name": "dev"}, {"tag_name": "1.0.0", "published_at": "2023-01-01"},
+        {"tag_name": "1.1.0", "published_at": "2024-01-01"}]})
+    assert entry["latest_release"] == "1.1.0"
+
+
+def test_store_keys_on_resolved_revision(tmp_path):
+    loaded = []
+    store = SchemaStore(loader=lambda name, revision: loaded.append(revision) or SCHEMA, store_dir=tmp_path)
+    assert store.get("nf-core/rnaseq")["revision"] == "3.14.0"
+    assert store.get("nf-core/rnaseq@3.14.0")["revision"] == "3.14.0"
+    assert store.get("nf-core/rnaseq@3.13.0")["revision"] == "3.13.0"
+    assert loaded == ["3.14.0", "3.13.0"]
+
+
+def test_pin_release_pins_only_a_missing_revision():
+    assert pin_release("nf-core/rnaseq") == "nf-core/rnaseq@3.14.0"
+    assert pin_release("nf-core/rnaseq@latest") == "nf-core/rnaseq@3.14.0"
+    assert pin_release("nf-core/rnaseq@3.12.0") == "nf-core/rnaseq@3.12.0"
+    assert pin_release("nf-core/sarek@dev") == "nf-core/sarek@dev"
+    assert pin_release("nf-core/rnaseq@feature/star-index") == "nf-core/rnaseq@feature/star-index"
+    assert pin_release("nf-core/not-a-pipeline") == "nf-core/not-a-pipeline@master"
+
+
+def test_scout_selection_is_pinned_to_a_release():
+    context = SimpleNamespace(state={PIPELINE_SELECTION_KEY: "Selected pipeline: nf-core/rnaseq."})
+    pin_pipeline_selection(context)
+    assert context.state[PIPELINE_SELECTION_KEY] == "Selected pipeline: nf-core/rnaseq@3.14.0."
+    assert selected_pipeline({PIPELINE_SELECTION_KEY: "Selected pipeline: nf-core/sarek"}) == "nf-core/sarek@3.4.2"
+
+
+def test_scout_selection_keeps_a_requested_branch():
+    context = SimpleNamespace(state={PIPELINE_SELECTION_KEY: "Selected pipeline: nf-core/sarek@feature/gpu."})
+    pin_pipeline_selection(context)
+    assert context.state[PIPELINE_SELECTION_KEY] == "Selected pipeline: nf-core/sarek@feature/gpu."
+    assert selected_pipeline(context.state) == "nf-core/sarek@feature/gpu"
+
+
+def test_branches_with_slashes_are_stored_and_expire(tmp_path):
+    loaded = []
+    store = SchemaStore(loader=lambda name, revision: loaded.append(revision) or SCHEMA, store_dir=tmp_path,
+                        unpinned_ttl_seconds=0)
+    assert store.get("nf-core/rnaseq@feature/star-index")["revision"] == "feature/star-index"
+    assert [p.name for p in tmp_path.iterdir()] == ["nf-core__rnaseq@feature%2Fstar-index.json"]
+    store.get("nf-core/rnaseq@feature/star-index")
+    store.get("nf-core/rnaseq@3.14.0")
+    store.get("nf-core/rnaseq@3.14.0")
+    assert loaded == ["feature/star-index", "feature/star-index", "3.14.0"]
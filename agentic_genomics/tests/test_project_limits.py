@@ -0,0 +1,101 @@
+import asyncio
+import threading
+
+from tools.project_limits import ProjectRateLimiter
+
+
+def test_async_waiters_queue_without_worker_threads():
+    limiter = ProjectRateLimiter(max_concurrent=2, min_interval_seconds=0)
+    running, peak = 0, 0
+
+    async def apply():
+        nonlocal running, peak
+        async with limiter.slot_async("proj"):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+
+    async def main():
+        threads = threading.active_count()
+        tasks = [asyncio.create_task(apply()) for _ in range(20)]
+        await asyncio.sleep(0.005)
+        assert limiter.stats("proj") == {"active": 2, "waiting": 18}
+        assert threading.active_count() == threads
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert peak == 2
+    assert limiter.stats("proj") == {"active": 0, "waiting": 0}
+
+
+def test_projects_are_limited_independently():
+    limiter = ProjectRateLimiter(max_concurrent=1, min_interval_seconds=0)
+
+    async def main():
+        async with limiter.slot_async("a"):
+            async with limiter.slot_async("b"):
+                return limiter.stats("a"), limiter.stats("b")
+
+    assert asyncio.run(main()) == ({"active": 1, "waiting": 0}, {"active": 1, "waiting": 0})
+
+
+def test_cancelled_waiter_gives_its_place_back():
+    limiter = ProjectRateLimiter(max_concurrent=1, min_interval_seconds=0)
+
+    async def main():
+        holder = asyncio.Event()
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.slot_async("proj"):
+                holder.set()
+                await release.wait()
+
+        task = asyncio.create_task(hold())
+        await holder.wait()
+        waiter = asyncio.create_task(limiter.slot_async("proj").__aenter__())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert limiter.stats("proj") == {"active": 1, "waiting": 0}
+        release.set()
+        await task
+        async with limiter.slot_async("proj"):
+            pass
+
+    asyncio.run(main())
+    assert limiter.stats("proj") == {"active": 0, "waiting": 0}
+
+
+def test_slots_are_shared_between_threads_and_event_loops():
+    limiter = ProjectRateLimiter(max_concurrent=1, min_interval_seconds=0)
+    lock = threading.Lock()
+    running, peak = 0, 0
+
+    def track(delta: int):
+        nonlocal running, peak
+        with lock:
+            running += delta
+            peak = max(peak, running)
+
+    async def apply_async():
+        async with limiter.slot_async("proj"):
+            track(1)
+            await asyncio.sleep(0.01)
+            track(-1)
+
+    def apply_sync():
+        with limiter.slot("proj"):
+            track(1)
+            threading.Event().wait(0.01)
+            track(-1)
+
+    threads = [threading.Thread(target=lambda: asyncio.run(apply_async())) for _ in range(4)]
+    threads += [threading.Thread(target=apply_sync) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert peak == 1
+    assert limiter.stats("proj") == {"active": 0, "waiting": 0}
@@ -0,0 +1,42 @@
+import copy
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("google.adk")
+
+from tools.registry import LazyTool  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _modules_after(code: str) -> set[str]:
+    """The modules a fresh interpreter has imported after running code."""
+    script = f"import sys\n{code}\nprint('\\n'.join(sys.modules))"
+    return set(subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.split())
+
+
+def test_specialist_tools_are_imported_on_first_use():
+    loaded = _modules_after("import agents.pipeline_scout, agents.deployment_engineer")
+    assert not loaded & {"tools.nf_core_tools", "tools.terraform_tools", "tools.billing_tools"}
+    loaded = _modules_after("from tools.registry import LazyTool\n"
+                            "LazyTool('search_nf_core_pipelines')._get_declaration()")
+    assert "tools.nf_core_tools" in loaded and "tools.terraform_tools" not in loaded
+
+
+def test_probes_do_not_import_the_tool():
+    loaded = _modules_after("import copy\nfrom tools.registry import LazyTool\n"
+                            "tool = LazyTool('estimate_blueprint_cost')\n"
+                            "assert not hasattr(tool, '_private') and not hasattr(tool, '__wrapped__')\n"
+                            "copy.copy(tool)")
+    assert "tools.billing_tools" not in loaded
+
+
+def test_uninitialized_tool_raises_attribute_error():
+    tool = LazyTool.__new__(LazyTool)
+    with pytest.raises(AttributeError):
+        tool.description
+    assert copy.copy(LazyTool("get_pipeline_schema")).name == "get_pipeline_schema"
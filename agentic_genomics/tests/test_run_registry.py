@@ -0,0 +1,132 @@
+import json
+import sqlite3
+import time
+
+import pytest
+
+import tools.run_registry as run_registry
+from tools.nextflow_config import render_nextflow_config
+from tools.run_registry import RunRegistry, register_nextflow_run
+from tools.tenancy import tenant_scope
+
+PIPELINE = "nf-core/rnaseq@3.14.0"
+PARAMS = {"input": "gs://core-bucket/samplesheet.csv", "outdir": "gs://core-bucket/results", "genome": "GRCh38",
+          "aligner": "star_salmon", "trimmer": "trimgalore", "skip_qc": False}
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch) -> RunRegistry:
+    registry = RunRegistry(path=tmp_path / "registry", retention_days=1)
+    monkeypatch.setattr(run_registry, "_run_registry", registry)
+    monkeypatch.setattr(registry, "maybe_collect_garbage", lambda: None)
+    return registry
+
+
+def _register(tmp_path, name: str, params: dict, work_dir: str = "gs://core-bucket/work") -> dict:
+    run_dir = tmp_path / name
+    run_dir.mkdir()
+    (run_dir / "params.json").write_text(json.dumps(params))
+    config = render_nextflow_config("core-facility-prod", "us-central1", work_dir)
+    (run_dir / "nextflow.config").write_text(config)
+    run = register_nextflow_run(PIPELINE, str(run_dir / "params.json"), str(run_dir / "nextflow.config"))
+    assert (run_dir / "nextflow.config").read_text() == config  # The user's workDir stays in the config.
+    return run
+
+
+def test_new_run_gets_its_own_work_dir_under_the_configured_one(tmp_path, registry):
+    run = _register(tmp_path, "run1", PARAMS)
+    assert run["work_dir"] == f"gs://core-bucket/work/{run['run_id']}"
+    assert run["configured_work_dir"] == "gs://core-bucket/work"
+    assert run["work_dir"] in run["work_dir_note"]
+    assert f"-w {run['work_dir']}" in run["launch_command"] and "-resume" not in run["launch_command"]
+
+
+def test_identical_params_resume_the_earlier_run(tmp_path, registry):
+    first = _register(tmp_path, "run1", PARAMS)
+    second = _register(tmp_path, "run2", {**PARAMS, "outdir": "gs://core-bucket/results2"})
+    assert second["resume"] and second["resumed_from"]["run_id"] == first["run_id"]
+    assert second["work_dir"] == first["work_dir"]
+    assert second["launch_command"].endswith("-resume")
+
+
+def test_one_changed_param_resumes_and_reruns_the_affected_processes(tmp_path, registry):
+    first = _register(tmp_path, "run1", PARAMS)
+    second = _register(tmp_path, "run2", {**PARAMS, "aligner": "hisat2"})
+    assert second["resume"] and second["launch_command"].endswith("-resume")
+    assert second["resumed_from"] == {"run_id": first["run_id"], "match": "near", "similarity": 0.8}
+    # The earlier lineage's own dirs, not the configured workDir.
+    assert second["work_dir"] == first["work_dir"]
+    assert first["launch_command"].split(" && ")[0] == second["launch_command"].split(" && ")[0]
+    reuse = second["reuse"]
+    assert reuse["changed_params"] == ["aligner"]
+    assert {"STAR_GENOMEGENERATE", "STAR_ALIGN", "SALMON_QUANT", "MULTIQC"} <= set(reuse["rerun"])
+    assert {"FASTQC", "TRIMGALORE"} <= set(reuse["reused"])
+
+
+def test_dissimilar_params_start_a_new_lineage(tmp_path, registry):
+    first = _register(tmp_path, "run1", PARAMS)
+    second = _register(tmp_path, "run2", {**PARAMS, "aligner": "hisat2", "genome": "GRCm39", "skip_qc": True})
+    assert not second["resume"] and second["work_dir"] != first["work_dir"]
+
+
+def test_other_configured_work_dir_is_not_resumed(tmp_path, registry):
+    _register(tmp_path, "run1", PARAMS)
+    second = _register(tmp_path, "run2", PARAMS, work_dir="gs://other-bucket/work")
+    assert not second["resume"] and second["work_dir"].startswith("gs://other-bucket/work/")
+
+
+def test_another_tenants_run_is_never_resumed(tmp_path, registry):
+    with tenant_scope("lab-a"):
+        first = _register(tmp_path, "run1", PARAMS)
+    with tenant_scope("lab-b"):
+        second = _register(tmp_path, "run2", PARAMS)
+    assert not second["resume"]
+    assert second["work_dir"] != first["work_dir"]
+    with tenant_scope("lab-a"):
+        assert _register(tmp_path, "run3", PARAMS)["resumed_from"]["run_id"] == first["run_id"]
+
+
+def test_gc_deletes_only_the_work_dirs_it_allocated(tmp_path, registry):
+    run = _register(tmp_path, "run1", PARAMS)
+    # A run recorded before the registry allocated work dirs ran in the user's workDir itself.
+    with registry._lock:
+        registry._db.execute(
+            "INSERT INTO runs (run_id, lineage, pipeline, revision, project, params_hash, params, work_dir,"
+            " launch_dir, created_at) VALUES ('legacy', 'legacy', 'nf-core/rnaseq', '3.14.0', NULL, '', '{}',"
+            " 'gs://core-bucket/work', ?, 0)", (str(tmp_path / "launch"),))
+        registry._db.execute("UPDATE runs SET created_at = 0")
+    deleted = []
+    result = registry.collect_garbage(delete=deleted.append)
+    assert deleted == [run["work_dir"]] == result["deleted_work_dirs"]
+    assert result["expired_lineages"] == 2
+
+
+def test_gc_keeps_work_dirs_of_live_lineages(tmp_path, registry):
+    _register(tmp_path, "run1", PARAMS)
+    with registry._lock:
+        registry._db.execute("UPDATE runs SET created_at = 0")
+    assert _register(tmp_path, "run2", PARAMS)["resume"]
+    deleted = []
+    assert registry.collect_garbage(delete=deleted.append)["expired_lineages"] == 0
+    assert deleted == []
+
+
+def test_store_from_before_owned_work_dirs_is_migrated(tmp_path):
+    path = tmp_path / "registry"
+    path.mkdir()
+    db = sqlite3.connect(path / "runs.sqlite3")
+    db.execute("CREATE TABLE runs (run_id TEXT PRIMARY KEY, lineage TEXT NOT NULL, pipeline TEXT NOT NULL,"
+               " revision TEXT NOT NULL, project TEXT, params_hash TEXT NOT NULL, params TEXT NOT NULL,"
+               " config_digest TEXT, work_dir TEXT NOT NULL, launch_dir TEXT NOT NULL, resumed_from TEXT,"
+               " created_at REAL NOT NULL)")
+    db.execute("INSERT INTO runs VALUES ('old', 'old', 'nf-core/rnaseq', '3.14.0', NULL, '', '{}', NULL,"
+               " 'gs://core-bucket/work', ?, NULL, 0)", (str(tmp_path / "launch"),))
+    db.commit()
+    db.close()
+    registry = RunRegistry(path=path, retention_days=1)
+    deleted = []
+    assert registry.collect_garbage(delete=deleted.append)["expired_lineages"] == 1
+    assert deleted == []
+    run = registry.record(PIPELINE, PARAMS, "gs://core-bucket/work")
+    assert run["work_dir"] == f"gs://core-bucket/work/{run['run_id']}"
+    assert time.time() - 5 < registry._db.execute("SELECT MAX(created_at) FROM runs").fetchone()[0]
@@ -0,0 +1,153 @@
+import asyncio
+import io
+import threading
+import time
+
+import pytest
+
+from tools import samplesheet_preflight
+from tools.samplesheet_preflight import (ExistenceCache, get_input_schema, get_input_schema_store,
+                                         preflight_samplesheet, register_backend, validate_samplesheet)
+
+HEADER = "sample,fastq_1,fastq_2,strandedness\n"
+
+
+def _sheet(tmp_path, samples: int = 3, missing: int = 0) -> str:
+    reads = tmp_path / "reads"
+    reads.mkdir()
+    lines = [HEADER]
+    for i in range(samples):
+        for mate in (1, 2):
+            if i >= missing:
+                (reads / f"S{i}_{mate}.fastq.gz").write_bytes(b"")
+        lines.append(f"S{i},reads/S{i}_1.fastq.gz,reads/S{i}_2.fastq.gz,auto\n")
+    path = tmp_path / "samplesheet.csv"
+    path.write_text("".join(lines))
+    return str(path)
+
+
+def test_valid_samplesheet(tmp_path):
+    result = asyncio.run(preflight_samplesheet(_sheet(tmp_path), "nf-core/rnaseq"))
+    assert result["valid"] and result["rows"] == 3 and result["objects_checked"] == 6
+
+
+def test_missing_files_and_bad_rows_are_reported(tmp_path):
+    path = _sheet(tmp_path, missing=1)
+    with open(path, "a") as f:
+        f.write("S9,reads/S9_1.fastq,,sideways\n")
+    result = asyncio.run(validate_samplesheet(path, get_input_schema("nf-core/rnaseq"), cache=ExistenceCache()))
+    assert not result["valid"]
+    assert result["missing_count"] == 2
+    assert result["row_error_count"] == 2
+
+
+def test_missing_samplesheet_and_columns(tmp_path):
+    result = asyncio.run(preflight_samplesheet(str(tmp_path / "nope.csv"), "nf-core/rnaseq"))
+    assert result == {"valid": False, "error": f"Samplesheet not found: {tmp_path / 'nope.csv'}"}
+    (tmp_path / "short.csv").write_text("sample\nS1\n")
+    result = asyncio.run(preflight_samplesheet(str(tmp_path / "short.csv"), "nf-core/rnaseq"))
+    assert "missing required columns: fastq_1, strandedness" in result["error"]
+
+
+class _Storage:
+    """A fake backend whose reads block the calling thread and whose existence checks never finish."""
+
+    def __init__(self, text: str, fail_after_lines: int | None = None, read_delay: float = 0.0):
+        self.text = text
+        self.fail_after_lines = fail_after_lines
+        self.read_delay = read_delay
+        self.read_threads = set()
+        self.checks_started = 0
+
+    def open_text(self, uri):
+        storage = self
+
+        class Stream(io.StringIO):
+            lines = 0
+
+            def readline(self, *args):
+                storage.read_threads.add(threading.get_ident())
+                time.sleep(storage.read_delay)
+                self.lines += 1
+                if storage.fail_after_lines is not None and self.lines > storage.fail_after_lines:
+                    raise ConnectionError("connection reset")
+                return super().readline(*args)
+
+            def __next__(self):
+                line = self.readline()
+                if not line:
+                    raise StopIteration
+                return line
+
+        return Stream(self.text)
+
+    async def exists(self, uri):
+        self.checks_started += 1
+        await asyncio.Event().wait()
+
+
+def _remote_sheet(rows: int) -> str:
+    return HEADER + "".join(f"S{i},fake://b/S{i}_1.fastq.gz,,auto\n" for i in range(rows))
+
+
+def test_reading_does_not_block_the_event_loop():
+    storage = _Storage(HEADER + "S1,reads/S1_1.fastq.gz,,auto\n", read_delay=0.05)
+    storage.exists = lambda uri: asyncio.sleep(0, result=True)
+    register_backend("slowfs", storage)
+
+    async def main():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        result = await validate_samplesheet("slowfs://b/sheet.csv", get_input_schema("nf-core/rnaseq"), cache=None)
+        ticker.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(main())
+    assert result["valid"]
+    assert threading.get_ident() not in storage.read_threads
+    assert ticks >= 5
+
+
+def test_storage_error_cancels_checks_in_flight(monkeypatch):
+    monkeypatch.setattr(samplesheet_preflight, "ROWS_PER_READ", 2)
+    storage = _Storage(_remote_sheet(20), fail_after_lines=10)
+    register_backend("fake", storage)
+
+    async def main():
+        with pytest.raises(ConnectionError):
+            await validate_samplesheet("fake://b/sheet.csv", get_input_schema("nf-core/rnaseq"), cache=None)
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    assert asyncio.run(main()) == []
+    assert storage.checks_started > 0
+
+
+def test_cancelled_validation_cancels_its_checks():
+    register_backend("fake", _Storage(_remote_sheet(5)))
+
+    async def main():
+        task = asyncio.create_task(
+            validate_samplesheet("fake://b/sheet.csv", get_input_schema("nf-core/rnaseq"), cache=None))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    assert asyncio.run(main()) == []
+
+
+def test_input_schemas_come_from_the_schema_store():
+    store = get_input_schema_store()
+    schema = get_input_schema("nf-core/rnaseq")
+    assert schema["revision"] == "3.14.0"
+    assert schema["required"] == ["sample", "fastq_1", "strandedness"]
+    assert get_input_schema("nf-core/rnaseq@3.14.0") is schema
+    assert store.stats["memory_hits"] >= 1
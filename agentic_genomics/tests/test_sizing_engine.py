@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+from tools.cost_engine import SkuIndex
+from tools.sizing_engine import profile_from_trace, recommend_cluster
+
+MACHINE_TYPES = ["e2-standard-4", "n2-standard-8", "n2-highmem-2"]
+PROFILE = {"source": "test", "tasks": [
+    {"process": "INDEX", "cpus": 3, "memory_gb": 10, "hours": 1.0, "per_run": 1},
+    {"process": "ALIGN", "cpus": 2, "memory_gb": 6, "hours": 0.5, "per_sample": 1},
+]}
+
+
+def _sku(description: str, group: str, usage: str, usd: float) -> dict:
+    return {"description": description, "category": {"resourceGroup": group, "usageType": usage},
+            "serviceRegions": ["us-central1"],
+            "pricingInfo": [{"pricingExpression": {"tieredRates": [
+                {"unitPrice": {"units": str(int(usd)), "nanos": round(usd % 1 * 1e9)}}]}}]}
+
+
+@pytest.fixture
+def index(tmp_path) -> SkuIndex:
+    skus = [_sku("Storage PD Capacity", "PDStandard", "OnDemand", 0.04),
+            _sku("Regional Kubernetes Clusters", "Kubernetes", "OnDemand", 0.10)]
+    for family, core, ram, spot_core, spot_ram in (("E2", 0.022, 0.003, 0.007, 0.001),
+                                                   ("N2", 0.032, 0.004, 0.008, 0.001)):
+        skus += [_sku(f"{family} Instance Core running in Americas", "CPU", "OnDemand", core),
+                 _sku(f"{family} Instance Ram running in Americas", "RAM", "OnDemand", ram),
+                 _sku(f"Spot Preemptible {family} Instance Core running in Americas", "CPU", "Preemptible", spot_core),
+                 _sku(f"Spot Preemptible {family} Instance Ram running in Americas", "RAM", "Preemptible", spot_ram)]
+    path = tmp_path / "billing.json"
+    path.write_text(json.dumps({"snapshot_date": "2025-06-01", "skus": skus}))
+    return SkuIndex(path)
+
+
+def _recommend(index, **kwargs) -> dict:
+    return recommend_cluster(PROFILE, 20, "us-central1-a", machine_types=MACHINE_TYPES, max_nodes=8, index=index,
+                             **kwargs)
+
+
+def test_most_samples_per_dollar(index):
+    result = _recommend(index)
+    # Three Spot n2-standard-8 nodes get the run down to its critical path, so the cluster fee stops growing.
+    assert result["toolkit_variables"] == {"machine_type": "n2-standard-8", "min_node_count": 0, "max_node_count": 3,
+                                           "spot": True, "disk_size_gb": 100}
+    assert result["estimate"] == {"makespan_hours": 1.53, "total_usd": 0.62, "samples_per_usd": 32.295}
+    assert result["constraints"]["met"]
+    assert result["tasks"] == 21 and result["region"] == "us-central1"
+    # n2-highmem-2 can't hold the 3-vCPU index task.
+    assert result["configurations_compared"] == 2 * 2 * 8
+    assert [(a["machine_type"], a["max_node_count"]) for a in result["alternatives"]] == [("e2-standard-4", 8)]
+
+
+def test_deadline_shorter_than_the_spot_run_picks_on_demand(index):
+    # Work lost to preemptions makes every Spot run longer than the 1.5 h critical path.
+    result = _recommend(index, deadline_hours=1.52)
+    assert result["constraints"]["met"]
+    assert not result["toolkit_variables"]["spot"]
+    assert result["estimate"]["makespan_hours"] <= 1.52
+
+
+def test_unmeetable_deadline_falls_back_to_the_fastest(index):
+    result = _recommend(index, deadline_hours=0.1)
+    assert not result["constraints"]["met"]
+    # Nothing beats the critical path: the index, then one sample's alignment.
+    assert result["estimate"]["makespan_hours"] == pytest.approx(1.5, abs=0.01)
+    assert not result["toolkit_variables"]["spot"]
+
+
+def test_unmeetable_budget_falls_back_to_the_cheapest(index):
+    cheapest = _recommend(index)["estimate"]["total_usd"]
+    result = _recommend(index, budget_usd=cheapest / 10)
+    assert not result["constraints"]["met"]
+    assert result["estimate"]["total_usd"] == cheapest
+
+
+def test_nothing_fits_the_largest_task(index):
+    profile = {"source": "test", "tasks": [{"process": "HUGE", "cpus": 64, "memory_gb": 512, "hours": 1, "per_run": 1}]}
+    with pytest.raises(ValueError, match="largest task"):
+        recommend_cluster(profile, 1, "us-central1", machine_types=MACHINE_TYPES, index=index)
+
+
+def test_profile_from_trace(tmp_path):
+    trace = tmp_path / "trace.txt"
+    rows = [
+        ("NFCORE_RNASEQ:RNASEQ:STAR_ALIGN (S1)", "COMPLETED", "4", "-", "8 GB", "-", "1h 30m"),
+        ("NFCORE_RNASEQ:RNASEQ:STAR_ALIGN (S2)", "CACHED", "4", "-", "8 GB", "-", "5400000"),
+        ("NFCORE_RNASEQ:RNASEQ:STAR_ALIGN (S3)", "FAILED", "4", "-", "8 GB", "-", "10m"),
+        ("NFCORE_RNASEQ:RNASEQ:FASTQC (S1)", "COMPLETED", "-", "180%", "-", "1024 MB", "850ms"),
+        ("NFCORE_RNASEQ:RNASEQ:FASTQC (S2)", "COMPLETED", "-", "150%", "-", "1 GB", "1s"),
+        ("NFCORE_RNASEQ:RNASEQ:MULTIQC", "COMPLETED", "1", "-", "2147483648", "-", "2m 30s"),
+    ]
+    trace.write_text("\n".join("\t".join(row) for row in
+                               [("name", "status", "cpus", "%cpu", "memory", "peak_rss", "realtime"), *rows]) + "\n")
+    tasks = {task["process"]: task for task in profile_from_trace(str(trace), samples=2)["tasks"]}
+    assert tasks["STAR_ALIGN"] == {"process": "STAR_ALIGN", "cpus": 4, "memory_gb": 8.0, "hours": 1.5,
+                                   "per_sample": 1.0}
+    # No requests recorded: %cpu rounded up to whole cpus, peak RSS plus headroom.
+    assert tasks["FASTQC"]["cpus"] == 2 and tasks["FASTQC"]["memory_gb"] == 1.2
+    assert tasks["FASTQC"]["hours"] == pytest.approx((0.85 + 1) / 2 / 3600)
+    assert tasks["MULTIQC"] == {"process": "MULTIQC", "cpus": 1, "memory_gb": 2.0, "hours": 2.5 / 60, "per_run": 1}
+
+
+def test_trace_without_completed_tasks(tmp_path):
+    trace = tmp_path / "trace.txt"
+    trace.write_text("name\tstatus\trealtime\nSTAR_ALIGN (S1)\tFAILED\t1m\n")
+    with pytest.raises(ValueError, match="No completed tasks"):
+        profile_from_trace(str(trace), samples=1)
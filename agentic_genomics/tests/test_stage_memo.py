@@ -0,0 +1,142 @@
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from tools.nextflow_config import render_nextflow_config
+from tools.run_registry import register_nextflow_run
+from tools.stage_memo import CONFIGURATION_KEY, PIPELINE_SELECTION_KEY, ConfigurationMemo, _stated
+from tools.tenancy import tenant_scope
+from tools.workflow_context import build_request
+
+SELECTION = "Selected pipeline: nf-core/rnaseq@3.14.0"
+
+
+def _context(work_dir: Path, request: str, state: dict | None = None):
+    text = build_request(str(work_dir), request)
+    return SimpleNamespace(user_content=SimpleNamespace(parts=[SimpleNamespace(text=text)]),
+                           state={PIPELINE_SELECTION_KEY: SELECTION, **(state or {})},
+                           invocation_id="invocation", agent_name="configurator_agent")
+
+
+@pytest.fixture
+def samplesheet(tmp_path) -> Path:
+    reads = tmp_path / "reads"
+    reads.mkdir()
+    lines = ["sample,fastq_1,fastq_2,strandedness"]
+    for sample in ("S1", "S2"):
+        for mate in (1, 2):
+            (reads / f"{sample}_{mate}.fastq.gz").write_bytes(b"")
+        lines.append(f"{sample},{reads}/{sample}_1.fastq.gz,{reads}/{sample}_2.fastq.gz,auto")
+    path = tmp_path / "samplesheet.csv"
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def _request(samplesheet: Path, project: str = "core-facility-prod") -> str:
+    return (f"RNA-Seq on GRCh38 for project {project} in us-central1, workDir gs://core-bucket/work, "
+            f"samplesheet {samplesheet}, results to gs://core-bucket/results")
+
+
+def _configure(work_dir: Path, samplesheet: Path, project: str = "core-facility-prod") -> str:
+    """What the configurator's tools write and return for one run."""
+    work_dir.mkdir()
+    params_path, config_path = work_dir / "params.json", work_dir / "nextflow.config"
+    params_path.write_text(json.dumps({"input": str(samplesheet), "outdir": "gs://core-bucket/results",
+                                       "genome": "GRCh38"}))
+    config_path.write_text(render_nextflow_config(project, "us-central1", "gs://core-bucket/work"))
+    run = register_nextflow_run("nf-core/rnaseq@3.14.0", str(params_path), str(config_path))
+    return json.dumps({"params_json_path": str(params_path), "nextflow_config_path": str(config_path),
+                       "project": project, "region": "us-central1", "work_dir": run["work_dir"], "samples": 2,
+                       "run_id": run["run_id"], "launch_command": run["launch_command"]})
+
+
+def _memo(near_duplicates: bool = False) -> ConfigurationMemo:
+    memo = ConfigurationMemo("configurator", output_key=CONFIGURATION_KEY)
+    memo.near_duplicates = near_duplicates
+    return memo
+
+
+def _store(memo, tmp_path, samplesheet, request) -> dict:
+    output = _configure(tmp_path / "run1", samplesheet)
+    asyncio.run(memo.after_agent(_context(tmp_path / "run1", request, {CONFIGURATION_KEY: output})))
+    return json.loads(output)
+
+
+def test_hit_regenerates_the_run_for_the_current_work_dir(tmp_path, samplesheet):
+    memo = _memo()
+    first = _store(memo, tmp_path, samplesheet, _request(samplesheet))
+    run2 = tmp_path / "run2"
+    run2.mkdir()
+
+    replayed = json.loads(asyncio.run(memo.lookup(_context(run2, _request(samplesheet)))))
+    assert replayed["params_json_path"] == str(run2 / "params.json")
+    assert replayed["nextflow_config_path"] == str(run2 / "nextflow.config")
+    assert (run2 / "params.json").read_text() == (tmp_path / "run1" / "params.json").read_text()
+    assert replayed["run_id"] != first["run_id"]
+    assert str(run2 / "params.json") in replayed["launch_command"]
+    assert str(tmp_path / "run1") not in replayed["launch_command"]
+    assert replayed["samples"] == 2
+
+
+def test_hit_is_refused_when_the_samplesheet_no_longer_validates(tmp_path, samplesheet):
+    memo = _memo()
+    _store(memo, tmp_path, samplesheet, _request(samplesheet))
+    with samplesheet.open("a") as f:
+        f.write(f"S3,{tmp_path}/reads/S3_1.fastq.gz,,auto\n")
+    run2 = tmp_path / "run2"
+    run2.mkdir()
+    assert asyncio.run(memo.lookup(_context(run2, _request(samplesheet)))) is None
+
+
+def test_near_duplicate_with_the_same_answers_hits(tmp_path, samplesheet):
+    memo = _memo(near_duplicates=True)
+    _store(memo, tmp_path, samplesheet, _request(samplesheet))
+    run2 = tmp_path / "run2"
+    run2.mkdir()
+    assert asyncio.run(memo.lookup(_context(run2, _request(samplesheet) + " please"))) is not None
+
+
+def test_near_duplicate_for_another_project_misses(tmp_path, samplesheet):
+    memo = _memo(near_duplicates=True)
+    _store(memo, tmp_path, samplesheet, _request(samplesheet))
+    run2 = tmp_path / "run2"
+    run2.mkdir()
+    assert asyncio.run(memo.lookup(_context(run2, _request(samplesheet, project="lab-b-project")))) is None
+    assert not (run2 / "params.json").exists()
+
+
+def test_answers_collected_interactively_are_served_only_to_a_request_stating_them(tmp_path, samplesheet):
+    memo = _memo()
+    _store(memo, tmp_path, samplesheet, "RNA-Seq on GRCh38")
+    run2 = tmp_path / "run2"
+    run2.mkdir()
+    assert asyncio.run(memo.lookup(_context(run2, "RNA-Seq on GRCh38"))) is None
+    # Worded nothing like the first request, but it states every answer.
+    request = (f"Project core-facility-prod, us-central1. Samplesheet: {samplesheet}. Output: gs://core-bucket/results/."
+               " Use gs://core-bucket/work as workDir and the GRCh38 genome")
+    assert asyncio.run(memo.lookup(_context(run2, request))) is not None
+
+
+def test_answers_must_be_stated_as_whole_values():
+    answers = {"project": "core-facility-prod", "work_dir": "gs://core-bucket/work", "params.skip_qc": False,
+               "params.max_cpus": 1}
+    assert _stated(answers, "project core-facility-prod, work in gs://core-bucket/work/. skip_qc false, max_cpus=1")
+    # The values occur, but only inside longer ones or away from their param.
+    assert not _stated(answers, "project core-facility-prod-2, work in gs://core-bucket/work2, skip_qc false, "
+                                "max_cpus=1")
+    assert not _stated(answers, "project core-facility-prod, gs://core-bucket/work, 1 sample, no QC: False")
+
+
+def test_another_tenant_never_gets_the_configuration(tmp_path, samplesheet):
+    memo = _memo(near_duplicates=True)
+    with tenant_scope("lab-a"):
+        _store(memo, tmp_path, samplesheet, _request(samplesheet))
+    run2 = tmp_path / "run2"
+    run2.mkdir()
+    with tenant_scope("lab-b"):
+        assert asyncio.run(memo.lookup(_context(run2, _request(samplesheet)))) is None
+    with tenant_scope("lab-a"):
+        assert asyncio.run(memo.lookup(_context(run2, _request(samplesheet)))) is not None
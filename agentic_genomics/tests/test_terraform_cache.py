@@ -0,0 +1,79 @@
+import asyncio
+import socket
+import time
+
+from tools import terraform_cache
+from tools.terraform_cache import provider_mirror_dir, restore_warm_init
+from tools.terraform_runner import init_blueprint
+
+MAIN_TF = 'module "gke_cluster" {\n  source  = "GoogleCloudPlatform/cluster-toolkit/google//modules/gke"\n  version = "2.0.0"\n}\n'
+
+
+def _blueprint(tmp_path, name: str) -> str:
+    path = tmp_path / name
+    path.mkdir()
+    (path / "main.tf").write_text(MAIN_TF)
+    return str(path)
+
+
+def test_cold_init_fills_the_pool_and_the_next_init_restores_it(tmp_path):
+    cold = _blueprint(tmp_path, "cold")
+    assert not restore_warm_init(cold)
+    init, warm = asyncio.run(init_blueprint(cold, tmp_path / "cold.log"))
+    assert init["status"] == "succeeded" and not warm
+
+    init, warm = asyncio.run(init_blueprint(_blueprint(tmp_path, "warm"), tmp_path / "warm.log"))
+    assert init["status"] == "succeeded" and warm
+
+
+def test_existing_terraform_dir_is_not_reported_as_restored(tmp_path):
+    asyncio.run(init_blueprint(_blueprint(tmp_path, "cold"), tmp_path / "cold.log"))
+    partial = _blueprint(tmp_path, "partial")
+    (tmp_path / "partial" / ".terraform").mkdir()
+    assert not restore_warm_init(partial)
+    init, warm = asyncio.run(init_blueprint(partial, tmp_path / "partial.log"))
+    assert init["status"] == "succeeded" and not warm
+
+
+def test_failed_restore_removes_the_partial_copy(tmp_path, monkeypatch):
+    asyncio.run(init_blueprint(_blueprint(tmp_path, "cold"), tmp_path / "cold.log"))
+    target = _blueprint(tmp_path, "target")
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(terraform_cache, "_link_or_copy", fail)
+    assert not restore_warm_init(target)
+    assert not (tmp_path / "target" / ".terraform").exists()
+
+
+def test_network_probe_is_cached(monkeypatch):
+    monkeypatch.delenv("AGENTIC_GENOMICS_TERRAFORM_OFFLINE")
+    monkeypatch.setattr(terraform_cache, "_probe", None)
+    probes = []
+
+    def unreachable(address, timeout):
+        probes.append(address)
+        raise OSError("unreachable")
+
+    monkeypatch.setattr(socket, "create_connection", unreachable)
+    assert terraform_cache.is_offline() and terraform_cache.is_offline()
+    assert len(probes) == 1
+
+
+def test_online_init_fills_the_provider_mirror_once(tmp_path, monkeypatch):
+    monkeypatch.delenv("AGENTIC_GENOMICS_TERRAFORM_OFFLINE")
+    monkeypatch.setattr(terraform_cache, "_probe", (time.monotonic(), False))
+    init, _ = asyncio.run(init_blueprint(_blueprint(tmp_path, "cold"), tmp_path / "cold.log"))
+    assert init["status"] == "succeeded"
+    assert list(provider_mirror_dir().rglob("terraform-provider-google_*.zip"))
+    assert "Mirroring" in (tmp_path / "cold.log").read_text()
+
+    asyncio.run(init_blueprint(_blueprint(tmp_path, "warm"), tmp_path / "warm.log"))
+    assert "Mirroring" not in (tmp_path / "warm.log").read_text()
+
+
+def test_offline_init_does_not_try_to_fill_the_mirror(tmp_path):
+    init, _ = asyncio.run(init_blueprint(_blueprint(tmp_path, "cold"), tmp_path / "cold.log"))
+    assert init["status"] == "succeeded"
+    assert not list(provider_mirror_dir().iterdir())
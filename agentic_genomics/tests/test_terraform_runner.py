@@ -0,0 +1,70 @@
+import asyncio
+import sys
+import time
+
+from tools.terraform_runner import MAX_LINE_BYTES, TerraformRun, apply_blueprint
+
+MAIN_TF = 'module "gke_cluster" {\n  source  = "GoogleCloudPlatform/cluster-toolkit/google//modules/gke"\n  version = "2.0.0"\n}\n'
+
+
+def _blueprint(tmp_path):
+    path = tmp_path / "blueprint"
+    path.mkdir()
+    (path / "main.tf").write_text(MAIN_TF)
+    return str(path)
+
+
+def test_apply_streams_progress(tmp_path):
+    events = []
+    summary = asyncio.run(apply_blueprint(_blueprint(tmp_path), on_event=events.append))
+    assert summary["status"] == "succeeded"
+    assert len(summary["resources_created"]) == 3
+    assert summary["resources"] == {"added": 3, "changed": 0, "destroyed": 0}
+    assert events[-1]["type"] == "apply_complete"
+
+
+def test_apply_survives_lines_longer_than_the_stream_limit(tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_TERRAFORM_LONG_LINE_BYTES", str(1024 * 1024))
+    summary = asyncio.run(apply_blueprint(_blueprint(tmp_path), timeout_seconds=30))
+    assert summary["status"] == "succeeded"
+    log = (tmp_path / "cache" / "terraform_logs").glob("*.log")
+    longest = max(len(line) for path in log for line in path.read_text().splitlines())
+    assert MAX_LINE_BYTES <= longest < MAX_LINE_BYTES + 100
+
+
+def _sleeper(tmp_path, seconds: float, timeout: float) -> TerraformRun:
+    script = f"import time\nprint('started', flush=True)\ntime.sleep({seconds})\n"
+    return TerraformRun([sys.executable, "-c", script], str(tmp_path), tmp_path / "run.log", timeout_seconds=timeout)
+
+
+def test_timeout_stops_the_process(tmp_path):
+    started = time.monotonic()
+    summary = asyncio.run(_sleeper(tmp_path, 60, timeout=0.5).run())
+    assert summary["status"] == "timed_out"
+    assert summary["exit_code"] is not None
+    assert time.monotonic() - started < 10
+
+
+def test_cancel_stops_the_process(tmp_path):
+    async def run():
+        terraform_run = _sleeper(tmp_path, 60, timeout=60)
+        task = asyncio.ensure_future(terraform_run.run())
+        await asyncio.sleep(0.5)
+        terraform_run.cancel()
+        return await task
+
+    assert asyncio.run(run())["status"] == "cancelled"
+
+
+def test_cancelled_caller_leaves_nothing_running(tmp_path):
+    async def run():
+        task = asyncio.ensure_future(_sleeper(tmp_path, 60, timeout=60).run())
+        await asyncio.sleep(0.5)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    assert asyncio.run(run()) == []
@@ -0,0 +1,76 @@
+import json
+import subprocess
+import sys
+from types import SimpleNamespace
+
+from tools import tracing
+from tools.tracing import TraceWriter, Tracer
+
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()] if path.exists() else []
+
+
+def _context(invocation_id: str, agent_name: str):
+    return SimpleNamespace(invocation_id=invocation_id, agent_name=agent_name)
+
+
+def test_any_root_span_writes_a_summary_and_is_forgotten(tmp_path):
+    tracer = Tracer(trace_dir=tmp_path, enabled=True)
+    with tracer.span("batch", kind="internal"):
+        with tracer.span("step"):
+            pass
+    tracer.flush()
+    [summary] = _lines(tmp_path / "summaries.jsonl")
+    assert summary["root"] == "batch" and summary["spans"] == 2
+    assert len(_lines(tmp_path / "spans.jsonl")) == 2
+    assert not tracer._finished and not tracer._open_counts
+
+
+def test_agent_invocations_outside_a_workflow_are_pruned(tmp_path):
+    tracer = Tracer(trace_dir=tmp_path, enabled=True)
+    for i in range(5):
+        root, stage = _context(f"inv-{i}", "orchestrator_agent"), _context(f"inv-{i}", "pipeline_scout_agent")
+        tracer.before_agent(root)
+        tracer.before_agent(stage)
+        tracer.after_agent(stage)
+        assert tracer._finished  # The stage ended but the invocation hasn't.
+        tracer.after_agent(root)
+    tracer.flush()
+    assert len(_lines(tmp_path / "summaries.jsonl")) == 5
+    assert not tracer._invocation_parents and not tracer._finished and not tracer._open
+
+
+def test_incomplete_traces_are_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "MAX_TRACKED_TRACES", 3)
+    tracer = Tracer(trace_dir=tmp_path, enabled=True)
+    for i in range(10):
+        root = tracer._start(f"run-{i}", "workflow", None)
+        tracer._finish(tracer._start("stage", "agent", root))  # The root never finishes.
+    tracer.flush()
+    assert len(tracer._finished) == 3
+    evicted = _lines(tmp_path / "summaries.jsonl")
+    assert len(evicted) == 7 and all(summary["evicted"] for summary in evicted)
+
+
+def test_writer_rotates_and_keeps_a_bounded_number_of_files(tmp_path):
+    writer = TraceWriter(max_bytes=100, backups=2)
+    path = tmp_path / "spans.jsonl"
+    for i in range(20):
+        writer.write(path, json.dumps({"i": i, "pad": "x" * 20}) + "\n")
+    writer.flush()
+    assert {p.name for p in tmp_path.iterdir()} - {"spans.jsonl"} == {"spans.jsonl.1", "spans.jsonl.2"}
+    newest = [record["i"] for name in ("spans.jsonl.2", "spans.jsonl.1", "spans.jsonl")
+              for record in _lines(tmp_path / name)]
+    assert newest == list(range(20 - len(newest), 20))
+
+
+def test_subprocess_span_records_cpu_time_but_no_per_span_rss(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "tracer", Tracer(trace_dir=tmp_path, enabled=True))
+    with tracing.subprocess_span("terraform init"):
+        subprocess.run([sys.executable, "-c", "sum(range(10**6))"], check=True)
+    tracing.tracer.flush()
+    [span] = _lines(tmp_path / "spans.jsonl")
+    assert span["attributes"]["cpu_user_s"] >= 0 and "peak_rss_kb" not in span["attributes"]
+    [summary] = _lines(tmp_path / "summaries.jsonl")
+    assert summary["process_peak_rss_kb"] > 0
@@ -0,0 +1,123 @@
+import json
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from tools.stage_memo import BLUEPRINT_KEY, CONFIGURATION_KEY, DEPLOYMENT_KEY, PIPELINE_SELECTION_KEY
+from tools.tenancy import tenant_scope
+from tools.workflow_context import build_request
+from tools.workflow_runs import COMPLETED, FAILED, INCOMPLETE, WorkflowRuns
+
+
+@pytest.fixture
+def runs(tmp_path) -> WorkflowRuns:
+    return WorkflowRuns(path=tmp_path / "runs", retention_days=1)
+
+
+def _context(run: dict, stage: str, state: dict | None = None):
+    text = build_request(run["work_dir"], run["request"])
+    return SimpleNamespace(user_content=SimpleNamespace(parts=[SimpleNamespace(text=text)]),
+                           state={} if state is None else state, invocation_id="invocation", agent_name=stage)
+
+
+def _configuration(run: dict) -> str:
+    config_path = Path(run["work_dir"]) / "nextflow.config"
+    config_path.write_text("workDir = 'gs://core-bucket/work'\n")
+    return json.dumps({"nextflow_config_path": str(config_path), "project": "core-facility-prod"})
+
+
+def test_completed_stage_is_restored_on_resume(runs):
+    run = runs.create("rnaseq")
+    output = _configuration(run)
+    runs.after_agent(_context(run, "configurator_agent", {CONFIGURATION_KEY: output}))
+    summary = runs.finish(run["run_id"], error="model quota exceeded")
+    assert summary["status"] == FAILED and summary["completed_stages"] == ["configurator_agent"]
+
+    run = runs.resume(run["run_id"])
+    state = {}
+    assert runs.restore(_context(run, "configurator_agent", state)) == output
+    assert state[CONFIGURATION_KEY] == output
+    assert runs.restore(_context(run, "blueprint_architect_agent", {})) is None
+
+
+def test_stage_whose_files_are_gone_runs_again(runs):
+    run = runs.create("rnaseq")
+    output = _configuration(run)
+    runs.after_agent(_context(run, "configurator_agent", {CONFIGURATION_KEY: output}))
+    (Path(run["work_dir"]) / "nextflow.config").unlink()
+    assert runs.restore(_context(run, "configurator_agent", {})) is None
+
+
+def test_earlier_stages_finished_without_callbacks_are_checkpointed(runs):
+    run = runs.create("rnaseq")
+    state = {PIPELINE_SELECTION_KEY: "Selected pipeline: nf-core/rnaseq@3.14.0"}
+    assert runs.restore(_context(run, "configurator_agent", state)) is None
+    assert list(runs.get(run["run_id"])["stages"]) == ["pipeline_scout_agent"]
+
+
+def test_failed_apply_is_not_checkpointed(runs):
+    run = runs.create("rnaseq")
+    for stage, key in (("pipeline_scout_agent", PIPELINE_SELECTION_KEY), ("configurator_agent", CONFIGURATION_KEY),
+                       ("blueprint_architect_agent", BLUEPRINT_KEY)):
+        runs.after_agent(_context(run, stage, {key: json.dumps({"stage": stage})}))
+    runs.after_agent(_context(run, "deployment_engineer_agent",
+                              {DEPLOYMENT_KEY: json.dumps({"status": "failed", "error": "quota"})}))
+    summary = runs.finish(run["run_id"], output="apply failed")
+    assert summary["status"] == INCOMPLETE and summary["next_stage"] == "deployment_engineer_agent"
+
+    runs.resume(run["run_id"])
+    runs.after_agent(_context(run, "deployment_engineer_agent", {DEPLOYMENT_KEY: json.dumps({"status": "succeeded"})}))
+    summary = runs.finish(run["run_id"], output="applied")
+    assert summary["status"] == COMPLETED and "next_stage" not in summary
+    with pytest.raises(ValueError, match="already completed"):
+        runs.resume(run["run_id"])
+
+
+def test_stage_outside_a_durable_run_is_left_alone(runs, tmp_path):
+    context = _context({"work_dir": str(tmp_path / "scratch"), "request": "rnaseq"}, "configurator_agent",
+                       {CONFIGURATION_KEY: "{}"})
+    assert runs.restore(context) is None
+    assert runs.after_agent(context) is None
+
+
+def _expire(runs: WorkflowRuns, run: dict):
+    runs.finish(run["run_id"])
+    manifest_path = Path(run["work_dir"]) / "run.json"
+    manifest = json.loads(manifest_path.read_text())
+    manifest["updated_at"] = 0
+    manifest_path.write_text(json.dumps(manifest))
+
+
+def test_prune_keeps_runs_holding_live_terraform_state(runs):
+    expired, applied, destroyed = runs.create("a"), runs.create("b"), runs.create("c")
+    for run, resources in ((applied, ["module.gke_cluster"]), (destroyed, [])):
+        blueprint = Path(run["work_dir"]) / "blueprint"
+        blueprint.mkdir()
+        (blueprint / "terraform.tfstate").write_text(json.dumps({"resources": resources}))
+    for run in (expired, applied, destroyed):
+        _expire(runs, run)
+    assert sorted(runs.prune()) == sorted([expired["run_id"], destroyed["run_id"]])
+    assert os.path.isdir(applied["work_dir"])
+
+
+def test_run_containing_finds_the_run_of_a_blueprint(tmp_path):
+    runs = WorkflowRuns(path=tmp_path / "runs")
+    run = runs.create("rnaseq")
+    assert runs.run_containing(str(Path(run["work_dir"]) / "blueprint")) == run["run_id"]
+    assert runs.run_containing(run["work_dir"]) == run["run_id"]
+    assert runs.run_containing(str(tmp_path / "elsewhere")) is None
+
+
+def test_only_the_creating_tenant_can_resume_a_run(tmp_path):
+    runs = WorkflowRuns(path=tmp_path / "runs")
+    with tenant_scope("lab-a"):
+        run = runs.create("rnaseq")
+    runs.finish(run["run_id"], error="quota exceeded")
+    with tenant_scope("lab-b"):
+        assert runs.owned(run["run_id"]) is None
+        with pytest.raises(KeyError, match="Unknown workflow run"):
+            runs.resume(run["run_id"])
+    with tenant_scope("lab-a"):
+        assert runs.resume(run["run_id"])["status"] == "running"
@@ -0,0 +1,83 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+MAX_ACTIVE_ENV_VAR = "AGENTIC_GENOMICS_MAX_ACTIVE_TURNS"
+DEFAULT_MAX_ACTIVE = 16
+MAX_QUEUED_ENV_VAR = "AGENTIC_GENOMICS_MAX_QUEUED_TURNS"
+DEFAULT_MAX_QUEUED = 64
+MAX_PER_TENANT_ENV_VAR = "AGENTIC_GENOMICS_MAX_TURNS_PER_TENANT"
+DEFAULT_MAX_PER_TENANT = 4
+QUEUE_TIMEOUT_SECONDS = 30.0
+
+
+class AdmissionRejected(Exception):
+    """A turn that was not admitted; `status_code` is 429 (tenant limit) or 503 (overloaded)."""
+
+    def __init__(self, message: str, status_code: int, retry_after_seconds: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after_seconds = retry_after_seconds
+
+
+class AdmissionControl:
+    """
+    Backpressure for the serving layer. At most `max_active` agent turns run
+    at once across all tenants; up to `max_queued` more wait for a slot, for
+    at most the queue timeout. Beyond that a turn is rejected straight away
+    (503) instead of piling up. A tenant may have at most `max_per_tenant`
+    turns running or queued (429), so one busy tenant can't take every slot.
+
+    Used from a single event loop; not thread-safe.
+    """
+
+    def __init__(self, max_active: int | None = None, max_queued: int | None = None,
+                 max_per_tenant: int | None = None, queue_timeout_seconds: float = QUEUE_TIMEOUT_SECONDS):
+        self.max_active = max_active or int(os.environ.get(MAX_ACTIVE_ENV_VAR, DEFAULT_MAX_ACTIVE))
+        self.max_queued = max_queued if max_queued is not None else int(
+            os.environ.get(MAX_QUEUED_ENV_VAR, DEFAULT_MAX_QUEUED))
+        self.max_per_tenant = max_per_tenant or int(os.environ.get(MAX_PER_TENANT_ENV_VAR, DEFAULT_MAX_PER_TENANT))
+        self._queue_timeout_seconds = queue_timeout_seconds
+        self._slots: asyncio.Semaphore | None = None
+        self._active = 0
+        self._queued = 0
+        self._tenants: dict[str, int] = {}
+        self._rejected = {429: 0, 503: 0}
+
+    def _reject(self, message: str, status_code: int, retry_after_seconds: int):
+        self._rejected[status_code] += 1
+        raise AdmissionRejected(message, status_code, retry_after_seconds)
+
+    @asynccontextmanager
+    async def slot(self, tenant: str):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_active)
+        if self._tenants.get(tenant, 0) >= self.max_per_tenant:
+            self._reject(f"Tenant '{tenant}' already has {self.max_per_tenant} turns in flight.", 429, 1)
+        if self._active + self._queued >= self.max_active + self.max_queued:
+            self._reject("The server is at capacity; retry later.", 503, 5)
+        self._tenants[tenant] = self._tenants.get(tenant, 0) + 1
+        try:
+            self._queued += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self._queue_timeout_seconds)
+            except TimeoutError:
+                self._reject("Timed out waiting for a free slot; retry later.", 503, 5)
+            finally:
+                self._queued -= 1
+            self._active += 1
+            try:
+                yield
+            finally:
+                self._active -= 1
+                self._slots.release()
+        finally:
+            self._tenants[tenant] -= 1
+            if not self._tenants[tenant]:
+                del self._tenants[tenant]
+
+    def stats(self) -> dict:
+        return {"active": self._active, "queued": self._queued, "max_active": self.max_active,
+                "max_queued": self.max_queued, "max_per_tenant": self.max_per_tenant,
+                "tenants": len(self._tenants), "rejected_429": self._rejected[429],
+                "rejected_503": self._rejected[503]}
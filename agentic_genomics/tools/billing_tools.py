@@ -1,46 +1,66 @@
 from google.adk.tools import BaseTool, tool_code
 
-# In a real implementation, this would use the google-api-python-client
-# to call the Cloud Billing Catalog API.
+from tools.cost_engine import (DEFAULT_DISK_SIZE_GB, DEFAULT_DISK_TYPE, HOURS_IN_MONTH_APPROX, cost_grid,
+                               estimate_blueprint_cost, region_of)
+from tools.tfvars import read_tfvars
+
+# Prices come from a local snapshot of the Cloud Billing Catalog
+# (tools/data/billing_catalog.json). To refresh it, dump the SKUs with the
+# google-api-python-client:
 # from googleapiclient.discovery import build
 # billing_service = build('cloudbilling', 'v1', credentials=credentials)
 # request = billing_service.services().skus().list(parent=f"services/{service_id}")
 
-HOURS_IN_MONTH_APPROX = 730.0 # Average hours in a month (365.25 days * 24 hours / 12 months)
+MAX_ALTERNATIVES = 5
 
-MOCK_SKU_PRICES_USD_PER_HOUR = {
-    "n2_standard_cpu": 0.033174,
-    "n2_standard_ram_gb": 0.004446,
-    "pd_standard_gb_per_month": 0.04,
-}
 
-class GetSkuPriceTool(BaseTool):
+class EstimateBlueprintCostTool(BaseTool):
     """
-    A tool to get the price of a specific Google Cloud SKU.
+    A tool to estimate the cost of a generated Terraform blueprint in one call,
+    optionally comparing it against alternative configurations.
     """
 
     def _get_declaration(self):
         return tool_code(
-            name="get_sku_price",
-            description="Retrieves the price for a given Google Cloud billable SKU.",
+            name="estimate_blueprint_cost",
+            description="Estimates the cost of every billable component in a generated blueprint (node compute, disks, GKE fee). Optionally compares alternative machine types, node counts and regions and returns the cheapest; configurations the billing snapshot has no price for (e.g. Spot in a region without Spot SKUs) are left out and counted in `unpriced_configurations`.",
             parameters={
-                "sku_description": {
+                "blueprint_path": {
                     "type": "string",
-                    "description": "A simplified description of the SKU, e.g., 'n2_standard_cpu', 'n2_standard_ram_gb', 'pd_standard_gb_per_month'.",
-                }
+                    "description": "The path to the directory containing the generated terraform.tfvars.",
+                },
+                "run_hours": {
+                    "type": "number",
+                    "description": f"How long the cluster will run, in hours (default {HOURS_IN_MONTH_APPROX:.0f}, about a month).",
+                },
+                "compare": {
+                    "type": "object",
+                    "description": "Optional alternatives to compare, e.g. {'machine_types': ['n2-standard-8', 'e2-standard-8'], 'node_counts': [2, 4, 8], 'regions': ['us-central1', 'europe-west1'], 'run_hours': [24, 48]}. Omitted keys default to the blueprint's value.",
+                },
             },
         )
 
-    def _run(self, sku_description: str) -> dict:
+    def _run(self, blueprint_path: str, run_hours: float = HOURS_IN_MONTH_APPROX, compare: dict = None) -> dict:
         """
-        Returns the price for a SKU. In a real implementation, this would query
-        the Cloud Billing Catalog API.
+        Returns the blueprint's estimate and, if requested, the cheapest alternatives.
         """
-        price = MOCK_SKU_PRICES_USD_PER_HOUR.get(sku_description)
-        if price is not None:
-            # Monthly prices need to be converted to hourly for consistent calculation
-            if "per_month" in sku_description:
-                price = price / HOURS_IN_MONTH_APPROX
-            return {"sku": sku_description, "price_usd_per_hour": price}
-        else:
-            return {"error": f"Price for SKU '{sku_description}' not found."}
\ No newline at end of file
+        try:
+            result = estimate_blueprint_cost(blueprint_path, run_hours=run_hours)
+            if compare:
+                variables = read_tfvars(blueprint_path)
+                grid = cost_grid(
+                    machine_types=compare.get("machine_types") or [result["machine_type"]],
+                    node_counts=compare.get("node_counts") or [result["max"]["nodes"]],
+                    regions=compare.get("regions") or [region_of(variables["location"])],
+                    hours=compare.get("run_hours") or [run_hours],
+                    spot=result["spot"],
+                    disk_size_gb=variables.get("disk_size_gb", DEFAULT_DISK_SIZE_GB),
+                    disk_type=variables.get("disk_type", DEFAULT_DISK_TYPE),
+                )
+                result["configurations_compared"] = int(grid.usd.size) - grid.unpriced
+                if grid.unpriced:
+                    result["unpriced_configurations"] = grid.unpriced
+                result["cheapest_alternatives"] = grid.cheapest(MAX_ALTERNATIVES)
+            return result
+        except Exception as e:
+            return {"error": f"Could not estimate blueprint cost: {e}"}
@@ -0,0 +1,16 @@
+import os
+from pathlib import Path
+
+# All on-disk caches and stores live under a single root so they can be
+# mounted as a volume (or wiped) in one place. Override with the env var.
+CACHE_ROOT_ENV_VAR = "AGENTIC_GENOMICS_CACHE_DIR"
+
+
+def cache_dir(name: str) -> Path:
+    """
+    Returns (and creates) the directory used for the named on-disk cache.
+    """
+    root = os.environ.get(CACHE_ROOT_ENV_VAR) or Path.home() / ".cache" / "agentic_genomics"
+    path = Path(root) / name
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -0,0 +1,399 @@
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from tools.cache_dir import cache_dir
+from tools.terraform_runner import DEFAULT_TIMEOUT_SECONDS, check_blueprint, destroy_blueprint
+from tools.tfvars import read_tfvars
+from tools.tracing import tracer
+
+# Set to "0" to apply every blueprint from scratch, as before the pool existed.
+CLUSTER_POOL_ENV_VAR = "AGENTIC_GENOMICS_CLUSTER_POOL"
+IDLE_TTL_ENV_VAR = "AGENTIC_GENOMICS_CLUSTER_IDLE_TTL"
+MAX_HOLD_ENV_VAR = "AGENTIC_GENOMICS_CLUSTER_MAX_HOLD_HOURS"
+
+DEFAULT_IDLE_TTL_SECONDS = 60 * 60
+# A lease that is neither renewed nor released (e.g. the caller died) expires after this.
+DEFAULT_LEASE_SECONDS = 15 * 60
+# Held leases stop being renewed this long after they were granted, so a
+# forgotten release can't keep a cluster up for as long as its run dir exists.
+DEFAULT_MAX_HOLD_HOURS = 72
+# A cluster checked this recently is leased without another `terraform plan`.
+HEALTH_CHECK_MAX_AGE_SECONDS = 5 * 60
+REAP_INTERVAL_SECONDS = 60
+# A cluster provisioning or tearing down without an update for this long was
+# abandoned by a run that died; the next lease re-applies it, the reaper
+# destroys it again. Must exceed how long an apply or destroy may run.
+ABANDONED_AFTER_SECONDS = DEFAULT_TIMEOUT_SECONDS + 15 * 60
+POLL_INTERVAL_SECONDS = 2.0
+
+# Variables that name the blueprint's own location rather than the cluster.
+IGNORED_TFVARS = {"blueprint_path"}
+# Files copied into the pool's directory for the cluster; its state lives there too.
+BLUEPRINT_FILES = ("*.tf", "*.tfvars")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS clusters (
+    id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    project_id TEXT,
+    state TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    idle_since REAL,
+    checked_at REAL,
+    last_error TEXT
+);
+CREATE TABLE IF NOT EXISTS leases (
+    id TEXT PRIMARY KEY,
+    cluster_id TEXT NOT NULL,
+    acquired_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    holder TEXT
+);
+CREATE INDEX IF NOT EXISTS leases_by_cluster ON leases (cluster_id);
+"""
+
+# Cluster states.
+PROVISIONING, READY, FAILED, TEARING_DOWN = "provisioning", "ready", "failed", "tearing_down"
+
+
+def blueprint_fingerprint(blueprint_path: str) -> str:
+    """
+    Fingerprints what a blueprint would create: its .tf files and its
+    variables. The variables are compared parsed, so the timestamp comment
+    render_tfvars writes (and formatting) doesn't matter.
+    """
+    digest = hashlib.sha256()
+    for tf_file in sorted(Path(blueprint_path).glob("*.tf")):
+        digest.update(tf_file.name.encode())
+        digest.update(tf_file.read_text().strip().encode())
+    variables = {k: v for k, v in read_tfvars(blueprint_path).items() if k not in IGNORED_TFVARS}
+    digest.update(json.dumps(variables, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def pool_enabled() -> bool:
+    return os.environ.get(CLUSTER_POOL_ENV_VAR, "1") != "0"
+
+
+class ClusterPool:
+    """
+    A persistent (SQLite) registry of the clusters this machine has applied,
+    keyed by blueprint fingerprint, so an identical request leases the
+    running cluster instead of running `terraform apply` again.
+
+    Each cluster's blueprint and terraform state live in a directory owned by
+    the pool, so it can still be checked and destroyed after the workflow
+    run that created it is gone. Leases are shared: any number of runs may
+    use one cluster. A cluster with no live leases for `idle_ttl_seconds` is
+    destroyed by `reap_idle`, which the background reaper calls periodically.
+
+    Leases are short and end with `release`. A lease taken for a `holder`
+    (a workflow run ID) is renewed by the reaper for as long as
+    `holder_alive(holder)` says the holder is still around, up to
+    `max_hold_seconds`; once the holder is gone its leases are released.
+    A cluster left provisioning or tearing down for `abandoned_after_seconds`
+    belonged to a run that died: the next lease applies it again, and the
+    reaper destroys it if nobody does.
+    """
+
+    def __init__(self, path: Path | None = None, idle_ttl_seconds: float | None = None,
+                 lease_seconds: float = DEFAULT_LEASE_SECONDS, max_hold_seconds: float | None = None,
+                 health_check: Callable[[str], Awaitable[dict]] = check_blueprint,
+                 destroy: Callable[[str], Awaitable[dict]] = destroy_blueprint,
+                 holder_alive: Callable[[str], bool] = lambda holder: True,
+                 abandoned_after_seconds: float = ABANDONED_AFTER_SECONDS):
+        self._dir = path or cache_dir("clusters")
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._idle_ttl_seconds = idle_ttl_seconds if idle_ttl_seconds is not None else float(
+            os.environ.get(IDLE_TTL_ENV_VAR, DEFAULT_IDLE_TTL_SECONDS))
+        self._lease_seconds = lease_seconds
+        self._max_hold_seconds = max_hold_seconds if max_hold_seconds is not None else float(
+            os.environ.get(MAX_HOLD_ENV_VAR, DEFAULT_MAX_HOLD_HOURS)) * 60 * 60
+        self._health_check = health_check
+        self._destroy = destroy
+        self._holder_alive = holder_alive
+        self._abandoned_after_seconds = abandoned_after_seconds
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self._dir / "clusters.sqlite3", check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA busy_timeout=30000")
+        self._db.executescript(_SCHEMA)
+        # Stores created before leases had holders.
+        if "holder" not in {row[1] for row in self._db.execute("PRAGMA table_info(leases)")}:
+            self._db.execute("ALTER TABLE leases ADD COLUMN holder TEXT")
+        self._reaper: threading.Thread | None = None
+        self._stop_reaper = threading.Event()
+
+    def _transaction(self, fn: Callable[[sqlite3.Connection, float], object]):
+        # BEGIN IMMEDIATE also serializes other processes sharing the store.
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._db, time.time())
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return result
+
+    def _grant(self, db: sqlite3.Connection, now: float, cluster_id: str, holder: str | None) -> str:
+        lease_id = uuid.uuid4().hex[:12]
+        db.execute("INSERT INTO leases VALUES (?, ?, ?, ?, ?)",
+                   (lease_id, cluster_id, now, now + self._lease_seconds, holder))
+        db.execute("UPDATE clusters SET idle_since = NULL WHERE id = ?", (cluster_id,))
+        return lease_id
+
+    def _claim(self, cluster_id: str, path: Path, project_id: str | None,
+               holder: str | None) -> tuple[str, str | None, float | None]:
+        """
+        Atomically decides what the caller does next: ("lease", lease_id,
+        checked_at), ("provision", None, None) or ("wait", None, None).
+        """
+        def claim(db, now):
+            row = db.execute("SELECT state, updated_at, checked_at FROM clusters WHERE id = ?", (cluster_id,)).fetchone()
+            if row is None:
+                db.execute("INSERT INTO clusters VALUES (?, ?, ?, ?, ?, ?, NULL, NULL, NULL)",
+                           (cluster_id, str(path), project_id, PROVISIONING, now, now))
+                return "provision", None, None
+            state, updated_at, checked_at = row
+            if state == READY:
+                return "lease", self._grant(db, now, cluster_id, holder), checked_at
+            # Another run is applying it (unless that run died), or the reaper is destroying it.
+            abandoned = now - updated_at >= self._abandoned_after_seconds
+            if state == PROVISIONING and not abandoned or state == TEARING_DOWN:
+                return "wait", None, None
+            # A failed or abandoned apply; applying again converges it.
+            db.execute("UPDATE clusters SET state = ?, updated_at = ?, last_error = NULL WHERE id = ?",
+                       (PROVISIONING, now, cluster_id))
+            return "provision", None, None
+
+        return self._transaction(claim)
+
+    def _set_state(self, cluster_id: str, state: str, **columns):
+        def update(db, now):
+            assignments = ", ".join(["state = ?", "updated_at = ?", *(f"{name} = ?" for name in columns)])
+            db.execute(f"UPDATE clusters SET {assignments} WHERE id = ?", (state, now, *columns.values(), cluster_id))
+
+        self._transaction(update)
+
+    async def lease(self, blueprint_path: str, provision: Callable[[str], Awaitable[dict]],
+                    timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS, holder: str | None = None,
+                    tenant: str | None = None) -> dict:
+        """
+        Leases the cluster the blueprint describes. A healthy matching cluster
+        is reused as is; otherwise the blueprint is copied into the pool and
+        `provision(path)` (e.g. `apply_blueprint`) creates it there. Returns
+        the provision summary, or a short one for a reused cluster, plus the
+        `cluster_id` and `lease_id` to `release` when done. A lease with a
+        `holder` is renewed while the holder is alive; one without expires
+        after `lease_seconds` unless `renew`ed. Clusters are only shared
+        within a `tenant`.
+        """
+        started = time.monotonic()
+        deadline = started + timeout_seconds
+        fingerprint = blueprint_fingerprint(blueprint_path)
+        if tenant is not None:
+            fingerprint = hashlib.sha256(f"{tenant}\n{fingerprint}".encode()).hexdigest()
+        cluster_id = fingerprint[:16]
+        path = self._dir / cluster_id
+        project_id = read_tfvars(blueprint_path).get("project_id")
+        while True:
+            action, lease_id, checked_at = self._claim(cluster_id, path, project_id, holder)
+            if action == "lease":
+                if checked_at is not None and time.time() - checked_at < HEALTH_CHECK_MAX_AGE_SECONDS:
+                    health = {"healthy": True}
+                else:
+                    health = await self._health_check(str(path))
+                if health["healthy"]:
+                    self._transaction(lambda db, now: db.execute(
+                        "UPDATE clusters SET checked_at = ? WHERE id = ?", (now, cluster_id)))
+                    return {"status": "succeeded", "reused": True, "cluster_id": cluster_id, "lease_id": lease_id,
+                            "cluster_path": str(path), "elapsed_s": round(time.monotonic() - started, 1)}
+                # Drifted or deleted outside terraform: apply again to repair it.
+                self.release(lease_id)
+                self._set_state(cluster_id, FAILED, last_error=f"health check failed: {health.get('log_path')}")
+                continue
+            if action == "provision":
+                return await self._provision(blueprint_path, cluster_id, path, provision, started, holder)
+            if time.monotonic() > deadline:
+                return {"status": "timed_out", "cluster_id": cluster_id,
+                        "error": "Timed out waiting for another run to finish applying or destroying this cluster."}
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+    async def _provision(self, blueprint_path: str, cluster_id: str, path: Path,
+                         provision: Callable[[str], Awaitable[dict]], started: float, holder: str | None) -> dict:
+        try:
+            path.mkdir(parents=True, exist_ok=True)
+            for pattern in BLUEPRINT_FILES:
+                for source in Path(blueprint_path).glob(pattern):
+                    shutil.copy2(source, path / source.name)
+            result = await provision(str(path))
+        except BaseException as e:
+            self._set_state(cluster_id, FAILED, last_error=str(e) or type(e).__name__)
+            raise
+        if result.get("status") != "succeeded":
+            self._set_state(cluster_id, FAILED, last_error=result.get("error") or result.get("status"))
+            return {**result, "reused": False, "cluster_id": cluster_id}
+
+        def ready(db, now):
+            db.execute("UPDATE clusters SET state = ?, updated_at = ?, checked_at = ? WHERE id = ?",
+                       (READY, now, now, cluster_id))
+            return self._grant(db, now, cluster_id, holder)
+
+        lease_id = self._transaction(ready)
+        return {**result, "reused": False, "cluster_id": cluster_id, "lease_id": lease_id, "cluster_path": str(path),
+                "elapsed_s": round(time.monotonic() - started, 1)}
+
+    def release(self, lease_id: str) -> bool:
+        """Ends a lease; the cluster's idle clock starts once its last lease ends. False if there was no such lease."""
+        return bool(self._release("id", lease_id))
+
+    def release_holder(self, holder: str) -> list[str]:
+        """Ends every lease the holder has. Returns their lease IDs."""
+        return self._release("holder", holder)
+
+    def _release(self, column: str, value: str) -> list[str]:
+        def release(db, now):
+            rows = db.execute(f"SELECT id, cluster_id FROM leases WHERE {column} = ?", (value,)).fetchall()
+            db.execute(f"DELETE FROM leases WHERE {column} = ?", (value,))
+            for cluster_id in {cluster_id for _, cluster_id in rows}:
+                if db.execute("SELECT 1 FROM leases WHERE cluster_id = ?", (cluster_id,)).fetchone() is None:
+                    db.execute("UPDATE clusters SET idle_since = ? WHERE id = ?", (now, cluster_id))
+            return [lease_id for lease_id, _ in rows]
+
+        return self._transaction(release)
+
+    def renew(self, lease_id: str) -> bool:
+        """Pushes a live lease's expiry `lease_seconds` out from now. False if it already ended."""
+        return self._transaction(lambda db, now: db.execute(
+            "UPDATE leases SET expires_at = MAX(expires_at, ?) WHERE id = ? AND expires_at > ?",
+            (now + self._lease_seconds, lease_id, now)).rowcount > 0)
+
+    def renew_held(self) -> int:
+        """
+        Renews the live leases of every holder that is still alive and
+        releases those of holders that are gone. Returns how many leases
+        were renewed.
+        """
+        with self._lock:
+            holders = [holder for (holder,) in self._db.execute(
+                "SELECT DISTINCT holder FROM leases WHERE holder IS NOT NULL AND expires_at > ?", (time.time(),))]
+        # Checked outside the lock: a holder check may touch the filesystem.
+        alive = {holder for holder in holders if self._holder_alive(holder)}
+        for holder in set(holders) - alive:
+            self.release_holder(holder)
+
+        def renew(db, now):
+            return sum(db.execute(
+                "UPDATE leases SET expires_at = MAX(expires_at, ?)"
+                " WHERE holder = ? AND expires_at > ? AND acquired_at > ?",
+                (now + self._lease_seconds, holder, now, now - self._max_hold_seconds)).rowcount for holder in alive)
+
+        return self._transaction(renew) if alive else 0
+
+    def _claim_idle(self) -> list[tuple[str, str]]:
+        """Expires stale leases and marks the clusters idle past the TTL as tearing down."""
+        def claim(db, now):
+            # Expired leases end at their expiry time, not when they are noticed.
+            for cluster_id, expired_at in db.execute(
+                    "SELECT cluster_id, MAX(expires_at) FROM leases WHERE expires_at <= ? GROUP BY cluster_id",
+                    (now,)).fetchall():
+                db.execute("UPDATE clusters SET idle_since = MAX(COALESCE(idle_since, 0), ?) WHERE id = ?",
+                           (expired_at, cluster_id))
+            db.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+            cutoff, abandoned = now - self._idle_ttl_seconds, now - self._abandoned_after_seconds
+            idle = db.execute(
+                "SELECT id, path FROM clusters WHERE id NOT IN (SELECT cluster_id FROM leases) AND ("
+                " (state IN (?, ?) AND COALESCE(idle_since, updated_at) <= ?)"
+                " OR (state IN (?, ?) AND updated_at <= ?))",
+                (READY, FAILED, cutoff, PROVISIONING, TEARING_DOWN, abandoned),
+            ).fetchall()
+            for cluster_id, _ in idle:
+                db.execute("UPDATE clusters SET state = ?, updated_at = ? WHERE id = ?", (TEARING_DOWN, now, cluster_id))
+            return idle
+
+        return self._transaction(claim)
+
+    async def reap_idle(self) -> list[dict]:
+        """Destroys every cluster that has been idle past the TTL. Returns one summary per cluster."""
+        results = []
+        for cluster_id, path in self._claim_idle():
+            try:
+                result = await self._destroy(path)
+            except Exception as e:
+                result = {"status": "failed", "error": str(e)}
+            if result.get("status") == "succeeded":
+                self._transaction(lambda db, now: db.execute("DELETE FROM clusters WHERE id = ?", (cluster_id,)))
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                # Stays tearing_down; the reaper retries once the attempt counts as abandoned.
+                self._set_state(cluster_id, TEARING_DOWN,
+                                last_error=result.get("error") or f"destroy {result.get('status')}")
+            results.append({"cluster_id": cluster_id, **result})
+        return results
+
+    def clusters(self) -> list[dict]:
+        """Every cluster in the pool with its state and live lease count."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT c.id, c.project_id, c.state, c.created_at, c.idle_since, c.last_error, COUNT(l.id)"
+                " FROM clusters c LEFT JOIN leases l ON l.cluster_id = c.id AND l.expires_at > ? GROUP BY c.id",
+                (time.time(),)).fetchall()
+        keys = ("cluster_id", "project_id", "state", "created_at", "idle_since", "last_error", "leases")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def start_reaper(self, interval_seconds: float = REAP_INTERVAL_SECONDS):
+        """Starts the background thread that calls `renew_held` and `reap_idle` every interval."""
+        if self._reaper is not None:
+            return
+
+        def loop():
+            while not self._stop_reaper.wait(interval_seconds):
+                try:
+                    self.renew_held()
+                    asyncio.run(self.reap_idle())
+                except Exception as e:
+                    # Failed destroys are recorded per cluster; anything else only here. Try again next interval.
+                    tracer.record_error("cluster_reaper", e, pool=str(self._dir))
+
+        self._reaper = threading.Thread(target=loop, name="cluster_reaper", daemon=True)
+        self._reaper.start()
+
+    def stop_reaper(self):
+        self._stop_reaper.set()
+        if self._reaper is not None:
+            self._reaper.join()
+            self._reaper = None
+        self._stop_reaper.clear()
+
+
+def _workflow_run_exists(run_id: str) -> bool:
+    # Imported here: workflow_runs pulls in the stage memo and tracing.
+    from tools.workflow_runs import get_workflow_runs
+
+    return get_workflow_runs().get(run_id) is not None
+
+
+_cluster_pool: ClusterPool | None = None
+_cluster_pool_lock = threading.Lock()
+
+
+def get_cluster_pool() -> ClusterPool:
+    """Returns the process-wide cluster pool, starting its reaper on first use."""
+    global _cluster_pool
+    if _cluster_pool is None:
+        with _cluster_pool_lock:
+            if _cluster_pool is None:
+                _cluster_pool = ClusterPool(holder_alive=_workflow_run_exists)
+                _cluster_pool.start_reaper()
+    return _cluster_pool
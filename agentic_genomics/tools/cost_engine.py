@@ -0,0 +1,254 @@
+import json
+import re
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from tools.tfvars import read_tfvars
+
+# Local snapshot of the Cloud Billing Catalog (services/{id}/skus responses for
+# Compute Engine and Kubernetes Engine), so estimates never need an API call.
+BILLING_SNAPSHOT_PATH = Path(__file__).parent / "data" / "billing_catalog.json"
+
+HOURS_IN_MONTH_APPROX = 730.0 # Average hours in a month (365.25 days * 24 hours / 12 months)
+
+# Defaults of the GKE node pool when the blueprint doesn't set them.
+DEFAULT_MACHINE_TYPE = "n2-standard-4"
+DEFAULT_NODE_COUNT = 3
+DEFAULT_DISK_SIZE_GB = 100
+DEFAULT_DISK_TYPE = "pd-standard"
+
+# GiB of memory per vCPU for the predefined machine shapes.
+MEMORY_PER_VCPU_GB = {
+    ("e2", "standard"): 4, ("e2", "highmem"): 8, ("e2", "highcpu"): 1,
+    ("n2", "standard"): 4, ("n2", "highmem"): 8, ("n2", "highcpu"): 1,
+    ("n2d", "standard"): 4, ("n2d", "highmem"): 8, ("n2d", "highcpu"): 1,
+    ("c2", "standard"): 4,
+}
+DISK_GROUPS = {"pd-standard": "PDStandard", "pd-balanced": "PDBalanced", "pd-ssd": "SSD"}
+
+_INSTANCE_SKU = re.compile(r"^(?:Spot Preemptible )?(?P<family>[A-Z0-9]+)(?: AMD)? Instance (?P<kind>Core|Ram) running in")
+_MACHINE_TYPE = re.compile(r"^(?P<family>[a-z0-9]+)-(?:(?P<shape>standard|highmem|highcpu)-(?P<vcpus>\d+)|custom-(?P<custom_vcpus>\d+)-(?P<custom_mb>\d+))$")
+_ZONE_SUFFIX = re.compile(r"-[a-z]$")
+
+
+def _unit_price(sku: dict) -> float:
+    rate = sku["pricingInfo"][0]["pricingExpression"]["tieredRates"][-1]["unitPrice"]
+    return int(rate.get("units") or 0) + rate.get("nanos", 0) / 1e9
+
+
+def parse_machine_type(machine_type: str) -> tuple[str, int, float]:
+    """Returns (family, vCPUs, memory GiB) for a predefined or custom machine type."""
+    match = _MACHINE_TYPE.match(machine_type)
+    if not match:
+        raise ValueError(f"Unsupported machine type '{machine_type}'")
+    family = match["family"]
+    if match["custom_vcpus"]:
+        return family, int(match["custom_vcpus"]), int(match["custom_mb"]) / 1024
+    shape = (family, match["shape"])
+    if shape not in MEMORY_PER_VCPU_GB:
+        raise ValueError(f"Unsupported machine type '{machine_type}'")
+    vcpus = int(match["vcpus"])
+    return family, vcpus, vcpus * MEMORY_PER_VCPU_GB[shape]
+
+
+def region_of(location: str) -> str:
+    """Maps a zone ('us-central1-a') or region to its region."""
+    return _ZONE_SUFFIX.sub("", location)
+
+
+class SkuIndex:
+    """
+    An in-memory index of the billing snapshot as dense price arrays, so a
+    whole grid of configurations can be priced with array arithmetic.
+
+    cpu[usage][family, region] and ram[usage][family, region] are USD per
+    vCPU-hour / GiB-hour, with usage 'ondemand' or 'spot'. disk[type][region]
+    is USD per GB-hour and cluster_fee[region] is the GKE management fee per
+    hour. Prices missing from the snapshot are NaN.
+    """
+
+    def __init__(self, snapshot_path: Path = BILLING_SNAPSHOT_PATH):
+        snapshot = json.loads(Path(snapshot_path).read_text())
+        self.snapshot_date = snapshot.get("snapshot_date")
+        skus = snapshot["skus"]
+        self.regions = sorted({r for sku in skus for r in sku.get("serviceRegions", [])})
+        families = set()
+        for sku in skus:
+            match = _INSTANCE_SKU.match(sku["description"])
+            if match:
+                families.add(match["family"].lower())
+        self.families = sorted(families)
+        self._family_idx = {f: i for i, f in enumerate(self.families)}
+        self._region_idx = {r: i for i, r in enumerate(self.regions)}
+
+        shape = (len(self.families), len(self.regions))
+        self.cpu = {"ondemand": np.full(shape, np.nan), "spot": np.full(shape, np.nan)}
+        self.ram = {"ondemand": np.full(shape, np.nan), "spot": np.full(shape, np.nan)}
+        self.disk = {disk_type: np.full(len(self.regions), np.nan) for disk_type in DISK_GROUPS}
+        self.cluster_fee = np.zeros(len(self.regions))
+        disk_types = {group: disk_type for disk_type, group in DISK_GROUPS.items()}
+
+        for sku in skus:
+            price = _unit_price(sku)
+            category = sku.get("category", {})
+            for region in sku.get("serviceRegions", []):
+                r = self._region_idx[region]
+                match = _INSTANCE_SKU.match(sku["description"])
+                if match:
+                    usage = "spot" if category.get("usageType") == "Preemptible" else "ondemand"
+                    table = self.cpu if match["kind"] == "Core" else self.ram
+                    table[usage][self._family_idx[match["family"].lower()], r] = price
+                elif category.get("resourceGroup") in disk_types:
+                    self.disk[disk_types[category["resourceGroup"]]][r] = price / HOURS_IN_MONTH_APPROX
+                elif category.get("resourceGroup") == "Kubernetes":
+                    self.cluster_fee[r] = price
+
+    def region_index(self, region: str) -> int:
+        if region not in self._region_idx:
+            raise ValueError(f"No prices for region '{region}' in the billing snapshot (have: {', '.join(self.regions)})")
+        return self._region_idx[region]
+
+    def family_index(self, family: str) -> int:
+        if family not in self._family_idx:
+            raise ValueError(f"No prices for machine family '{family}' in the billing snapshot")
+        return self._family_idx[family]
+
+    def disk_prices(self, disk_type: str) -> np.ndarray:
+        if disk_type not in self.disk:
+            raise ValueError(f"Unsupported disk type '{disk_type}' (have: {', '.join(self.disk)})")
+        return self.disk[disk_type]
+
+
+_sku_index: SkuIndex | None = None
+_sku_index_lock = threading.Lock()
+
+
+def get_sku_index() -> SkuIndex:
+    """Returns the process-wide SKU index, loading the snapshot on first use."""
+    global _sku_index
+    if _sku_index is None:
+        with _sku_index_lock:
+            if _sku_index is None:
+                _sku_index = SkuIndex()
+    return _sku_index
+
+
+class CostGrid:
+    """
+    Costs for every combination of machine type, node count, region and run
+    duration. `usd` has shape (machine_types, node_counts, regions, hours).
+    """
+
+    def __init__(self, machine_types, node_counts, regions, hours, usd: np.ndarray):
+        self.machine_types = list(machine_types)
+        self.node_counts = list(node_counts)
+        self.regions = list(regions)
+        self.hours = list(hours)
+        self.usd = usd
+
+    @property
+    def unpriced(self) -> int:
+        """Configurations with a price missing from the snapshot (e.g. no Spot SKU in a region)."""
+        return int(np.isnan(self.usd).sum())
+
+    def cheapest(self, k: int = 5) -> list[dict]:
+        """The k cheapest priced configurations, cheapest first."""
+        flat = np.where(np.isnan(self.usd), np.inf, self.usd).ravel()
+        k = min(k, flat.size - self.unpriced)
+        if k <= 0:
+            return []
+        best = np.argpartition(flat, k - 1)[:k]
+        best = best[np.argsort(flat[best])]
+        results = []
+        for m, n, r, h in zip(*np.unravel_index(best, self.usd.shape)):
+            results.append({
+                "machine_type": self.machine_types[m],
+                "nodes": self.node_counts[n],
+                "region": self.regions[r],
+                "run_hours": self.hours[h],
+                "total_usd": round(float(self.usd[m, n, r, h]), 2),
+            })
+        return results
+
+
+def cost_grid(machine_types: list[str], node_counts: list[int], regions: list[str], hours: list[float],
+              spot: bool = False, disk_size_gb: float = DEFAULT_DISK_SIZE_GB, disk_type: str = DEFAULT_DISK_TYPE,
+              index: SkuIndex | None = None) -> CostGrid:
+    """
+    Prices every combination of the given machine types, node counts, regions
+    and run durations in one vectorized pass. Configurations the snapshot has
+    no price for are NaN.
+    """
+    index = index or get_sku_index()
+    usage = "spot" if spot else "ondemand"
+    disk = index.disk_prices(disk_type)
+    specs = [parse_machine_type(mt) for mt in machine_types]
+    family_idx = np.array([index.family_index(family) for family, _, _ in specs])
+    vcpus = np.array([v for _, v, _ in specs], dtype=float)
+    memory = np.array([mem for _, _, mem in specs], dtype=float)
+    region_idx = np.array([index.region_index(r) for r in regions])
+
+    # Per-node hourly price, shape (machine_types, regions).
+    cpu = index.cpu[usage][np.ix_(family_idx, region_idx)]
+    ram = index.ram[usage][np.ix_(family_idx, region_idx)]
+    node_hourly = vcpus[:, None] * cpu + memory[:, None] * ram + disk_size_gb * disk[region_idx][None, :]
+
+    nodes = np.asarray(node_counts, dtype=float)
+    cluster_hourly = node_hourly[:, None, :] * nodes[None, :, None] + index.cluster_fee[region_idx][None, None, :]
+    usd = cluster_hourly[..., None] * np.asarray(hours, dtype=float)[None, None, None, :]
+    return CostGrid(machine_types, node_counts, regions, hours, usd)
+
+
+def estimate_blueprint_cost(blueprint_path: str, run_hours: float = HOURS_IN_MONTH_APPROX,
+                            index: SkuIndex | None = None) -> dict:
+    """
+    Prices every billable component of a generated blueprint (node compute,
+    boot disks and the GKE management fee) from its terraform.tfvars.
+    Autoscaling node pools are priced at both their min and max size.
+    """
+    index = index or get_sku_index()
+    variables = read_tfvars(blueprint_path)
+    if "location" not in variables:
+        raise ValueError(f"{blueprint_path}/terraform.tfvars does not set 'location'")
+    region = region_of(variables["location"])
+    machine_type = variables.get("machine_type", DEFAULT_MACHINE_TYPE)
+    spot = bool(variables.get("spot", False))
+    disk_size_gb = variables.get("disk_size_gb", DEFAULT_DISK_SIZE_GB)
+    disk_type = variables.get("disk_type", DEFAULT_DISK_TYPE)
+    max_nodes = variables.get("max_node_count", variables.get("node_count", DEFAULT_NODE_COUNT))
+    min_nodes = variables.get("min_node_count", max_nodes)
+
+    family, vcpus, memory = parse_machine_type(machine_type)
+    f, r = index.family_index(family), index.region_index(region)
+    usage = "spot" if spot else "ondemand"
+    compute = vcpus * index.cpu[usage][f, r] + memory * index.ram[usage][f, r]
+    disk = disk_size_gb * index.disk_prices(disk_type)[r]
+    if np.isnan(compute) or np.isnan(disk):
+        missing = f"{'Spot ' if spot else ''}{machine_type}" if np.isnan(compute) else f"{disk_type} disks"
+        raise ValueError(f"No prices for {missing} in {region} in the billing snapshot")
+    fee = index.cluster_fee[r]
+
+    def hourly(nodes: int) -> dict:
+        total = nodes * (compute + disk) + fee
+        return {
+            "nodes": nodes,
+            "compute_usd_per_hour": round(float(nodes * compute), 4),
+            "boot_disks_usd_per_hour": round(float(nodes * disk), 4),
+            "cluster_fee_usd_per_hour": round(float(fee), 4),
+            "total_usd_per_hour": round(float(total), 4),
+            "total_usd": round(float(total * run_hours), 2),
+        }
+
+    estimate = {
+        "region": region,
+        "machine_type": machine_type,
+        "spot": spot,
+        "run_hours": run_hours,
+        "prices_as_of": index.snapshot_date,
+        "max": hourly(max_nodes),
+    }
+    if min_nodes != max_nodes:
+        estimate["min"] = hourly(min_nodes)
+    return estimate
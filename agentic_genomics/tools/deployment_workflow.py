@@ -1,12 +1,41 @@
-from google.adk.agents import LlmAgent, SequentialAgent
-import tempfile
-from google.adk.tools import BaseTool, tool_from_agent
+import contextvars
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator
+from google.adk.tools import BaseTool, tool_code
+from tools.offload import run_blocking
+from tools.registry import WORKFLOW_STAGES, agent_registry
+from tools.tenancy import current_tenant
+from tools.tracing import tracer
+from tools.workflow_context import build_request
+from tools.workflow_runs import COMPLETED, get_workflow_runs
+
+BATCH_CONCURRENCY_ENV_VAR = "AGENTIC_GENOMICS_BATCH_CONCURRENCY"
+DEFAULT_BATCH_CONCURRENCY = 4
+# Batches kept in memory for their results; the oldest finished ones go first.
+MAX_BATCHES = 64
+DEFAULT_WAIT_SECONDS = 60
+MAX_WAIT_SECONDS = 300
+
+DESCRIPTION = "Initiates and runs the full pipeline deployment workflow, from selection to cloud deployment."
+
+
+def batch_concurrency(max_concurrency: int | None = None) -> int:
+    """How many workflows a batch runs at once: the argument, else the env var, else the default."""
+    if max_concurrency is None:
+        configured = os.environ.get(BATCH_CONCURRENCY_ENV_VAR)
+        try:
+            max_concurrency = int(configured) if configured else DEFAULT_BATCH_CONCURRENCY
+        except ValueError:
+            raise ValueError(f"{BATCH_CONCURRENCY_ENV_VAR} must be a positive integer, got {configured!r}") from None
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+    return max_concurrency
 
-# Import the specialized agents that will form the steps of the workflow.
-from agents.pipeline_scout import PipelineScoutAgent
-from agents.configurator import ConfiguratorAgent
-from agents.blueprint_architect import BlueprintArchitectAgent
-from agents.deployment_engineer import DeploymentEngineerAgent
 
 class DeploymentWorkflowTool(BaseTool):
     """
@@ -14,33 +43,237 @@ class DeploymentWorkflowTool(BaseTool):
     bioinformatics pipeline, orchestrating multiple specialist agents.
     """
     def __init__(self):
+        # The specialist agents (and their tools) are only imported when the
+        # workflow first runs, so building the orchestrator stays cheap.
+        self._workflow_agent = None
+        self._tool = None
+        self._lock = threading.Lock()
+
+    def _build(self):
+        from google.adk.agents import SequentialAgent
+        from google.adk.tools import tool_from_agent
+
         # The core of this tool is a SequentialAgent that runs sub-agents in order,
         # passing the output of one as the input to the next.
-        self._workflow_agent = SequentialAgent(
-            sub_agents=[
-                PipelineScoutAgent,
-                ConfiguratorAgent,
-                BlueprintArchitectAgent,
-                DeploymentEngineerAgent,
-            ]
-        )
+        workflow_agent = SequentialAgent(sub_agents=[agent_registry.get(name) for name in WORKFLOW_STAGES])
+        self._workflow_agent = workflow_agent
         # We wrap the SequentialAgent in a tool so the OrchestratorAgent can call it.
         self._tool = tool_from_agent(
             name="run_deployment_workflow",
-            description="Initiates and runs the full pipeline deployment workflow, from selection to cloud deployment.",
-            agent=self._workflow_agent
+            description=DESCRIPTION,
+            agent=workflow_agent
+        )
+
+    def _ensure_built(self):
+        if self._tool is None:
+            with self._lock:
+                if self._tool is None:
+                    self._build()
+
+    @property
+    def workflow_agent(self):
+        self._ensure_built()
+        return self._workflow_agent
+
+    def _get_declaration(self):
+        # Same declaration as the agent tool, without building the agents.
+        return tool_code(
+            name="run_deployment_workflow",
+            description=DESCRIPTION,
+            parameters={
+                "request": {"type": "string", "description": "The user's analysis request."},
+                "resume": {"type": "string", "description": "Optional: the `run_id` of an earlier run that did not complete. It restarts from its first incomplete stage with the same request; `request` is then ignored."},
+            },
+        )
+
+    def _run(self, request: str = "", resume: str = None) -> dict:
+        # Every run gets a durable directory with a run ID. Each stage's output
+        # is checkpointed there (see `tools.workflow_runs`), so a run that
+        # fails late can be resumed without redoing the earlier stages.
+        runs = get_workflow_runs()
+        try:
+            run = runs.resume(resume) if resume else runs.create(request)
+        except (KeyError, ValueError) as e:
+            return {"error": e.args[0]}
+        # Prepend the working directory path to the user's request.
+        # This makes all sub-agents aware of the unique path they should use for file I/O.
+        request = build_request(run["work_dir"], run["request"])
+
+        # Each invocation of the agent tool runs in a fresh session, so
+        # concurrent runs never share conversation or session state.
+        try:
+            with tracer.span("deployment_workflow", kind="workflow", request_bytes=len(request),
+                             run_id=run["run_id"], resumed=bool(resume)):
+                self._ensure_built()
+                output = self._tool.run(request=request)
+        except Exception as e:
+            return runs.finish(run["run_id"], error=str(e))
+        return runs.finish(run["run_id"], output=output)
+
+    async def run_async(self, *, args: dict, tool_context=None) -> dict:
+        # A workflow runs for minutes; run it in the bounded "workflows" pool
+        # so the serving event loop keeps handling other sessions.
+        return await run_blocking("workflows", self._run, **args)
+
+    def run_batch(self, requests: list[dict], max_concurrency: int | None = None) -> Iterator[dict]:
+        """
+        Runs one workflow per request concurrently and yields each run's result
+        as soon as it finishes, in completion order.
+
+        Every run gets its own run dir and session (see `_run`); a request may
+        carry `resume` instead to continue an earlier run. Terraform
+        applies are additionally limited per GCP project by
+        `tools.project_limits.project_limiter`, so a batch for one project
+        doesn't trip its quotas.
+        """
+        max_concurrency = batch_concurrency(max_concurrency)
+
+        def run_one(index: int, request: dict) -> dict:
+            started = time.monotonic()
+            try:
+                outcome = self._run(**dict(request))
+                status = "succeeded" if outcome.get("status") == COMPLETED else "failed"
+                result = {"index": index, "status": status, "result": outcome}
+            except Exception as e:
+                result = {"index": index, "status": "failed", "error": str(e)}
+            result["elapsed_s"] = round(time.monotonic() - started, 1)
+            return result
+
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="deployment_workflow") as pool:
+            # Each run carries the caller's context (e.g. its tenant) into the worker thread.
+            futures = [pool.submit(contextvars.copy_context().run, run_one, i, request)
+                       for i, request in enumerate(requests)]
+            for future in as_completed(futures):
+                yield future.result()
+
+
+class _Batch:
+    """The results of one batch, appended as its runs finish."""
+
+    def __init__(self, batch_id: str, total: int, tenant: str | None = None):
+        self.batch_id = batch_id
+        self.total = total
+        self.tenant = tenant
+        self.error: str | None = None
+        self._results: list[dict] = []
+        self._changed = threading.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.error is not None or len(self._results) >= self.total
+
+    def add(self, result: dict):
+        with self._changed:
+            self._results.append(result)
+            self._changed.notify_all()
+
+    def fail(self, error: str):
+        """Ends the batch early; runs that didn't report a result never will."""
+        with self._changed:
+            self.error = error
+            self._changed.notify_all()
+
+    def results(self, since: int, wait_seconds: float) -> dict:
+        with self._changed:
+            self._changed.wait_for(lambda: len(self._results) > since or self.done, timeout=wait_seconds)
+            summary = {"batch_id": self.batch_id, "total": self.total, "finished": len(self._results),
+                       "results": self._results[since:], "done": self.done}
+            if self.error is not None:
+                summary["error"] = self.error
+            return summary
+
+
+class BatchDeploymentWorkflowTool(BaseTool):
+    """
+    A tool that starts the deployment workflow for many requests at once.
+
+    It returns a `batch_id` straight away; the workflows run in the
+    background and `DeploymentBatchResultsTool` reports each run's result as
+    soon as it finishes.
+    """
+    def __init__(self, workflow_tool: DeploymentWorkflowTool | None = None):
+        self._workflow_tool = workflow_tool or DeploymentWorkflowTool()
+        self._batches: OrderedDict[str, _Batch] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_declaration(self):
+        return tool_code(
+            name="run_deployment_workflow_batch",
+            description="Starts the full pipeline deployment workflow for several independent requests concurrently. Returns a `batch_id` immediately; call `get_deployment_batch_results` with it to collect each run's result as it finishes.",
+            parameters={
+                "requests": {
+                    "type": "array",
+                    "description": "The analysis requests to deploy, one string per project, e.g. ['RNA-Seq on GRCh38 for project X', 'Variant calling for project Y'].",
+                },
+                "max_concurrency": {
+                    "type": "integer",
+                    "description": f"How many workflows may run at the same time (default {DEFAULT_BATCH_CONCURRENCY}).",
+                },
+            },
         )
 
+    def start(self, requests: list[dict], max_concurrency: int | None = None) -> str:
+        """Runs the batch on a background thread and returns its ID."""
+        max_concurrency = batch_concurrency(max_concurrency)
+        batch = _Batch(uuid.uuid4().hex[:12], len(requests), current_tenant())
+        with self._lock:
+            self._batches[batch.batch_id] = batch
+            finished = [batch_id for batch_id, b in self._batches.items() if b.done]
+            for batch_id in finished[:max(0, len(self._batches) - MAX_BATCHES)]:
+                del self._batches[batch_id]
+
+        def consume():
+            try:
+                for result in self._workflow_tool.run_batch(requests, max_concurrency=max_concurrency):
+                    batch.add(result)
+            except Exception as e:
+                # Otherwise the batch never finishes and `results` callers wait for nothing.
+                batch.fail(f"Batch stopped: {e}")
+
+        threading.Thread(target=contextvars.copy_context().run, args=(consume,),
+                         name=f"deployment_batch_{batch.batch_id}", daemon=True).start()
+        return batch.batch_id
+
+    def results(self, batch_id: str, since: int = 0, wait_seconds: float = 0) -> dict:
+        with self._lock:
+            batch = self._batches.get(batch_id)
+        if batch is None or batch.tenant != current_tenant():
+            return {"error": f"Unknown batch '{batch_id}'."}
+        return batch.results(since, wait_seconds)
+
+    def _run(self, requests: list, max_concurrency: int = None) -> dict:
+        requests = [r if isinstance(r, dict) else {"request": r} for r in requests]
+        try:
+            batch_id = self.start(requests, max_concurrency=max_concurrency)
+        except ValueError as e:
+            return {"error": str(e)}
+        return self.results(batch_id)
+
+    async def run_async(self, *, args: dict, tool_context=None) -> dict:
+        return self._run(**args)
+
+
+class DeploymentBatchResultsTool(BaseTool):
+    """
+    A tool that reports the results of a batch started by
+    `BatchDeploymentWorkflowTool`, in completion order.
+    """
+    def __init__(self, batch_tool: BatchDeploymentWorkflowTool):
+        self._batch_tool = batch_tool
+
     def _get_declaration(self):
-        return self._tool.get_declaration()
-
-    def _run(self, **kwargs):
-        # Create a unique, secure temporary directory for this specific workflow run.
-        with tempfile.TemporaryDirectory(prefix="agentic_genomics_") as temp_dir:
-            # Prepend the working directory path to the user's request.
-            # This makes all sub-agents aware of the unique path they should use for file I/O.
-            original_request = kwargs.get("request", "")
-            prefix = f"You are part of a workflow operating in the following secure temporary directory: '{temp_dir}'. All file outputs must be written to this directory.\n\nUser request: "
-            kwargs["request"] = prefix + original_request
-
-            return self._tool.run(**kwargs)
\ No newline at end of file
+        return tool_code(
+            name="get_deployment_batch_results",
+            description="Returns the results of a deployment batch's finished runs, in the order they finished. Waits up to `wait_seconds` for a new result if none is available yet.",
+            parameters={
+                "batch_id": {"type": "string", "description": "The `batch_id` returned by `run_deployment_workflow_batch`."},
+                "since": {"type": "integer", "description": "How many results were already reported; only later ones are returned (default 0)."},
+                "wait_seconds": {"type": "integer", "description": f"How long to wait for a new result (default {DEFAULT_WAIT_SECONDS}, at most {MAX_WAIT_SECONDS})."},
+            },
+        )
+
+    def _run(self, batch_id: str, since: int = 0, wait_seconds: int = DEFAULT_WAIT_SECONDS) -> dict:
+        return self._batch_tool.results(batch_id, since, min(max(wait_seconds, 0), MAX_WAIT_SECONDS))
+
+    async def run_async(self, *, args: dict, tool_context=None) -> dict:
+        return await run_blocking("tools", self._run, **args)
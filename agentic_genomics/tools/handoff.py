@@ -0,0 +1,122 @@
+from dataclasses import asdict, dataclass
+from typing import Callable
+
+from tools.stage_memo import BLUEPRINT_KEY, CONFIGURATION_KEY, parse_json_object, selected_pipeline
+from tools.workflow_context import split_request
+
+# Session state keys of the handoff objects. The downstream agents' instructions
+# reference them as `{handoff_pipeline?}` etc., so each stage sees a compact
+# digest of the earlier stages instead of their whole conversation.
+REQUEST_HANDOFF_KEY = "handoff_request"
+PIPELINE_HANDOFF_KEY = "handoff_pipeline"
+CONFIGURATION_HANDOFF_KEY = "handoff_configuration"
+BLUEPRINT_HANDOFF_KEY = "handoff_blueprint"
+
+
+@dataclass(frozen=True)
+class RequestHandoff:
+    """The user's request and the run's work dir."""
+    request: str
+    work_dir: str | None
+
+
+@dataclass(frozen=True)
+class PipelineHandoff:
+    """The selected pipeline. Full parameter details are looked up on demand with `get_pipeline_params`."""
+    pipeline: str
+    revision: str
+    schema_digest: str
+    # {param: type} for the params the user must provide.
+    required: dict[str, str]
+    param_count: int
+    groups: list[str]
+
+
+@dataclass(frozen=True)
+class ConfigurationHandoff:
+    params_json_path: str
+    nextflow_config_path: str
+    project: str | None = None
+    region: str | None = None
+    work_dir: str | None = None
+    # Samplesheet rows, as reported by `validate_samplesheet`.
+    samples: int | None = None
+    # From `register_nextflow_run`.
+    run_id: str | None = None
+    launch_command: str | None = None
+
+
+@dataclass(frozen=True)
+class BlueprintHandoff:
+    blueprint_path: str
+
+
+def request_handoff(callback_context) -> RequestHandoff | None:
+    parts = callback_context.user_content.parts if callback_context.user_content else []
+    text = "".join(part.text or "" for part in parts)
+    if not text:
+        return None
+    work_dir, request = split_request(text)
+    return RequestHandoff(request=request, work_dir=work_dir)
+
+
+def pipeline_handoff(state) -> PipelineHandoff | None:
+    pipeline = selected_pipeline(state)
+    if pipeline is None:
+        return None
+    from tools.nf_core_schema_store import get_schema_store
+
+    try:
+        schema = get_schema_store().get(pipeline)
+    except Exception:
+        return None  # The next stage can still look the schema up itself.
+    return schema_handoff(schema)
+
+
+def schema_handoff(schema: dict) -> PipelineHandoff:
+    """The handoff for a schema from the schema store."""
+    return PipelineHandoff(
+        pipeline=schema["pipeline"],
+        revision=schema["revision"],
+        schema_digest=schema["schema_digest"],
+        required={name: schema["params"].get(name, {}).get("type", "string") for name in schema["required"]},
+        param_count=len(schema["params"]),
+        groups=list(schema["groups"]),
+    )
+
+
+def configuration_handoff(state) -> ConfigurationHandoff | None:
+    data = parse_json_object(state.get(CONFIGURATION_KEY) or "") or {}
+    if not {"params_json_path", "nextflow_config_path"} <= data.keys():
+        return None
+    return ConfigurationHandoff(**{key: data.get(key) for key in ConfigurationHandoff.__dataclass_fields__})
+
+
+def blueprint_handoff(state) -> BlueprintHandoff | None:
+    data = parse_json_object(state.get(BLUEPRINT_KEY) or "") or {}
+    return BlueprintHandoff(blueprint_path=data["blueprint_path"]) if data.get("blueprint_path") else None
+
+
+_BUILDERS: dict[str, Callable] = {
+    PIPELINE_HANDOFF_KEY: pipeline_handoff,
+    CONFIGURATION_HANDOFF_KEY: configuration_handoff,
+    BLUEPRINT_HANDOFF_KEY: blueprint_handoff,
+}
+
+
+def publish_handoffs(callback_context) -> None:
+    """
+    Before-agent callback that (re)builds the handoff objects from the earlier
+    stages' outputs and writes them to session state. Building from the
+    `output_key`s rather than from tool calls means a stage replayed from the
+    result cache hands off exactly like one that ran.
+    """
+    state = callback_context.state
+    request = request_handoff(callback_context)
+    if request is not None and REQUEST_HANDOFF_KEY not in state:
+        state[REQUEST_HANDOFF_KEY] = asdict(request)
+    for key, build in _BUILDERS.items():
+        handoff = build(state)
+        if handoff is not None:
+            state[key] = asdict(handoff)
+    return None
@@ -0,0 +1,194 @@
+import os
+import re
+import string
+import tempfile
+from pathlib import Path
+
+EXECUTORS = {"google-batch", "local"}
+
+# Directives a per-process override may set, and the shape of their values.
+PROCESS_DIRECTIVES = {
+    "cpus": int,
+    "memory": re.compile(r"^\d+(\.\d+)?\s*(MB|GB|TB)$"),
+    "time": re.compile(r"^\d+(\.\d+)?\s*(s|m|h|d)$"),
+    "disk": re.compile(r"^\d+(\.\d+)?\s*(GB|TB)$"),
+    "machineType": re.compile(r"^[a-z0-9][a-z0-9-]*(\*)?$"),
+    "maxRetries": int,
+    "errorStrategy": {"retry", "ignore", "terminate", "finish"},
+}
+_SELECTOR = re.compile(r"^(withLabel|withName):([A-Za-z0-9_:*|.-]+)$")
+
+_GCP_PROJECT = re.compile(r"^[a-z][a-z0-9-]{4,28}[a-z0-9]$")
+_GCP_REGION = re.compile(r"^[a-z]+-[a-z]+\d+$")
+_LABEL_KEY = re.compile(r"^[a-z][a-z0-9_-]{0,62}$")
+_LABEL_VALUE = re.compile(r"^[a-z0-9_-]{0,63}$")
+# Settings read back from a rendered config.
+_WORK_DIR_LINE = re.compile(r"^workDir = '(?P<value>(?:[^'\\]|\\.)*)'$", re.M)
+_PROJECT_LINE = re.compile(r"^    project = '(?P<value>(?:[^'\\]|\\.)*)'$", re.M)
+_LOCATION_LINE = re.compile(r"^    location = '(?P<value>(?:[^'\\]|\\.)*)'$", re.M)
+
+# Compiled once at import; rendering is plain substitution, no model output involved.
+_CONFIG_TEMPLATE = string.Template("""\
+// Auto-generated by agentic_genomics. Edit the inputs, not this file.
+workDir = ${work_dir}
+
+process {
+    executor = '${executor}'
+${process_body}}
+
+google {
+    project = '${project}'
+    location = '${region}'
+${google_body}}
+
+executor {
+    queueSize = ${queue_size}
+}
+
+docker.enabled = ${docker}
+""")
+
+
+def _quote(value) -> str:
+    """Renders a value as a single-quoted Groovy string."""
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def _validate(project, region, work_dir, executor, queue_size, labels, process_overrides) -> list[str]:
+    errors = []
+    if not _GCP_PROJECT.match(project or ""):
+        errors.append(f"'{project}' is not a valid GCP project ID")
+    if not _GCP_REGION.match(region or ""):
+        errors.append(f"'{region}' is not a valid GCP region (e.g. 'us-central1')")
+    if executor not in EXECUTORS:
+        errors.append(f"executor must be one of {sorted(EXECUTORS)}, not '{executor}'")
+    if executor == "google-batch" and not str(work_dir).startswith("gs://"):
+        errors.append(f"workDir must be a gs:// path for the google-batch executor, not '{work_dir}'")
+    if not isinstance(queue_size, int) or isinstance(queue_size, bool) or queue_size < 1:
+        errors.append(f"queueSize must be a positive integer, not {queue_size!r}")
+    for key, value in (labels or {}).items():
+        if not _LABEL_KEY.match(key) or not _LABEL_VALUE.match(str(value)):
+            errors.append(f"label {key}={value} is not a valid GCP label (lowercase letters, digits, '_' and '-')")
+    for selector, directives in (process_overrides or {}).items():
+        if not _SELECTOR.match(selector):
+            errors.append(f"process override '{selector}' must look like 'withLabel:process_high' or 'withName:FASTQC'")
+            continue
+        for name, value in directives.items():
+            rule = PROCESS_DIRECTIVES.get(name)
+            if rule is None:
+                errors.append(f"{selector}: unsupported directive '{name}' (allowed: {', '.join(PROCESS_DIRECTIVES)})")
+            elif rule is int:
+                if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+                    errors.append(f"{selector}: {name} must be a non-negative integer, not {value!r}")
+            elif isinstance(rule, set):
+                if value not in rule:
+                    errors.append(f"{selector}: {name} must be one of {sorted(rule)}, not {value!r}")
+            elif not rule.match(str(value)):
+                errors.append(f"{selector}: {value!r} is not a valid {name}")
+    return errors
+
+
+def _check_syntax(config: str):
+    """
+    A cheap structural check of the rendered Groovy: braces balance and every
+    string literal is closed on its line. Catches template mistakes before
+    Nextflow does.
+    """
+    depth = 0
+    for line_number, line in enumerate(config.splitlines(), start=1):
+        if line.lstrip().startswith("//"):
+            continue
+        in_string = False
+        escaped = False
+        for char in line:
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == "'":
+                    in_string = False
+            elif char == "'":
+                in_string = True
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth < 0:
+                    raise ValueError(f"unbalanced '}}' on line {line_number}")
+        if in_string:
+            raise ValueError(f"unterminated string on line {line_number}")
+    if depth:
+        raise ValueError("unbalanced '{' in rendered config")
+
+
+def render_nextflow_config(project: str, region: str, work_dir: str, executor: str = "google-batch",
+                           docker: bool = True, queue_size: int = 100, spot: bool = False,
+                           labels: dict | None = None, process_overrides: dict | None = None) -> str:
+    """
+    Renders a nextflow.config for the given settings.
+
+    `process_overrides` maps a selector to directives, e.g.
+    {"withLabel:process_high": {"cpus": 16, "memory": "64 GB"}}.
+    Raises ValueError listing every invalid input.
+    """
+    errors = _validate(project, region, work_dir, executor, queue_size, labels, process_overrides)
+    if errors:
+        raise ValueError("; ".join(errors))
+
+    process_lines = []
+    if labels:
+        # Keys are quoted too: a label key may contain '-', which a bare Groovy map key can't.
+        entries = ", ".join(f"{_quote(key)}: {_quote(value)}" for key, value in sorted(labels.items()))
+        process_lines.append(f"    resourceLabels = [{entries}]")
+    for selector, directives in (process_overrides or {}).items():
+        kind, _, name = selector.partition(":")
+        process_lines.append(f"    {kind}:{_quote(name)} {{")
+        for directive, value in directives.items():
+            rendered = value if PROCESS_DIRECTIVES[directive] is int else _quote(value)
+            process_lines.append(f"        {directive} = {rendered}")
+        process_lines.append("    }")
+
+    google_lines = []
+    if spot:
+        google_lines.append("    batch.spot = true")
+
+    config = _CONFIG_TEMPLATE.substitute(
+        work_dir=_quote(work_dir),
+        executor=executor,
+        project=project,
+        region=region,
+        queue_size=queue_size,
+        docker=str(bool(docker)).lower(),
+        process_body="".join(f"{line}\n" for line in process_lines),
+        google_body="".join(f"{line}\n" for line in google_lines),
+    )
+    _check_syntax(config)
+    return config
+
+
+def _unquote(value: str) -> str:
+    return re.sub(r"\\(.)", r"\1", value)
+
+
+def config_settings(config: str) -> dict:
+    """The workDir, GCP project and region of a config rendered by `render_nextflow_config`."""
+    lines = {"work_dir": _WORK_DIR_LINE, "project": _PROJECT_LINE, "region": _LOCATION_LINE}
+    return {key: _unquote(match["value"]) if (match := pattern.search(config)) else None
+            for key, pattern in lines.items()}
+
+
+def write_atomic(path: Path, content: str):
+    """
+    Writes content to a temp file in the target directory and renames it into
+    place, so readers never see a partially written file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w") as tmp_file:
+            tmp_file.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
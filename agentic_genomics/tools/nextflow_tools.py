@@ -2,30 +2,48 @@ import json
 from pathlib import Path
 from google.adk.tools import BaseTool, tool_code
 
+from tools.nextflow_config import render_nextflow_config, write_atomic
+from tools.run_registry import register_nextflow_run
+
 class CreateNextflowConfigTool(BaseTool):
     """
-    A tool to generate a nextflow.config file.
+    A tool to generate a nextflow.config file from structured settings.
     """
     def _get_declaration(self):
         return tool_code(
             name="create_nextflow_config",
-            description="Generates a nextflow.config file with specified content and returns its path.",
+            description="Renders and validates a nextflow.config for Google Cloud Batch from structured settings, writes it, and returns its path.",
             parameters={
                 "file_path": {
                     "type": "string",
                     "description": "The absolute path where the nextflow.config file should be created.",
                 },
-                "content": {
-                    "type": "string",
-                    "description": "The full content of the nextflow.config file. Example: 'process.executor = \\'local\\''",
-                }
+                "project": {"type": "string", "description": "The GCP project ID."},
+                "region": {"type": "string", "description": "The GCP region, e.g. 'us-central1'."},
+                "work_dir": {"type": "string", "description": "The GCS path for the Nextflow workDir, e.g. 'gs://my-bucket/work'."},
+                "executor": {"type": "string", "description": "The Nextflow executor (default 'google-batch')."},
+                "docker": {"type": "boolean", "description": "Whether to enable Docker (default true)."},
+                "queue_size": {"type": "integer", "description": "The maximum number of tasks submitted at once (default 100)."},
+                "spot": {"type": "boolean", "description": "Whether to run tasks on Spot VMs (default false)."},
+                "labels": {"type": "object", "description": "GCP resource labels to attach to every task, e.g. {'project': 'x'}."},
+                "process_overrides": {
+                    "type": "object",
+                    "description": "Per-process resources, keyed by selector. Example: {'withLabel:process_high': {'cpus': 16, 'memory': '64 GB', 'time': '8h'}}",
+                },
             }
         )
 
-    def _run(self, file_path: str, content: str) -> str:
-        """Writes the config content to a file."""
+    def _run(self, file_path: str, project: str, region: str, work_dir: str, executor: str = "google-batch",
+             docker: bool = True, queue_size: int = 100, spot: bool = False, labels: dict = None,
+             process_overrides: dict = None) -> str:
+        """Renders the config from the given settings and writes it atomically."""
         try:
-            config_path.write_text(config_content)
+            config_content = render_nextflow_config(
+                project=project, region=region, work_dir=work_dir, executor=executor, docker=docker,
+                queue_size=queue_size, spot=spot, labels=labels, process_overrides=process_overrides,
+            )
+            config_path = Path(file_path)
+            write_atomic(config_path, config_content)
             return f"Successfully created nextflow.config at {str(config_path)}"
         except Exception as e:
             return f"Error creating nextflow.config: {e}"
@@ -54,8 +72,31 @@ class CreateParamsJsonTool(BaseTool):
         """Writes the parameters dictionary to a JSON file."""
         try:
             params_path = Path(file_path)
-            params_path.parent.mkdir(parents=True, exist_ok=True)  # Ensure directory exists
-            params_path.write_text(json.dumps(content, indent=4))
+            write_atomic(params_path, json.dumps(content, indent=4))
             return f"Successfully created params.json at {str(params_path)}"
         except Exception as e:
             return f"Error creating params.json: {e}"
+
+
+class RegisterNextflowRunTool(BaseTool):
+    """
+    A tool to record a configured run in the run registry and, if an earlier
+    run of the same pipeline had the same or nearly the same params, resume
+    it in that run's work dir so `-resume` reuses its cached tasks.
+    """
+    def _get_declaration(self):
+        return tool_code(
+            name="register_nextflow_run",
+            description="Records the run in the run registry and returns the run ID, its work dir (a directory of its own under the config's workDir, `work_dir_note`) and the launch command. If an earlier run of the same pipeline release in the same project and workDir had the same or similar params, the launch command resumes it in that run's own work dir with -resume, plus which processes will be reused and which re-run for the changed params (`reuse`).",
+            parameters={
+                "pipeline_name": {"type": "string", "description": "The pipeline and release, e.g. 'nf-core/rnaseq@3.14.0'."},
+                "params_json_path": {"type": "string", "description": "The path of the written params.json."},
+                "nextflow_config_path": {"type": "string", "description": "The path of the written nextflow.config."},
+            }
+        )
+
+    def _run(self, pipeline_name: str, params_json_path: str, nextflow_config_path: str) -> dict:
+        try:
+            return register_nextflow_run(pipeline_name, params_json_path, nextflow_config_path)
+        except Exception as e:
+            return {"error": f"Could not register the Nextflow run: {e}"}
@@ -0,0 +1,233 @@
+import json
+import os
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+
+from tools.cache_dir import cache_dir
+
+NF_CORE_PIPELINES_URL = "https://nf-co.re/pipelines.json"
+# Set to "1" to never revalidate against nf-co.re (air-gapped hosts, benchmarks).
+OFFLINE_ENV_VAR = "AGENTIC_GENOMICS_CATALOG_OFFLINE"
+
+# Bundled snapshot used on first start and whenever the network is unavailable.
+SNAPSHOT_PATH = Path(__file__).parent / "data" / "nf_core_pipelines.json"
+
+CATALOG_TTL_SECONDS = 24 * 60 * 60  # The nf-core catalog changes a few times a week at most.
+FETCH_TIMEOUT_SECONDS = 5
+RETRY_BACKOFF_SECONDS = 5 * 60  # Don't retry a failed fetch on every tool call.
+
+# Matches in the pipeline name count more than topic matches, which count more
+# than a word that only appears somewhere in the description.
+FIELD_WEIGHTS = {"name": 3.0, "topics": 2.0, "description": 1.0}
+
+# Short words that carry no signal for picking a pipeline.
+STOPWORDS = {"a", "an", "and", "analysis", "for", "from", "i", "in", "need", "of", "on", "pipeline", "run", "the", "to", "using", "with"}
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lowercases and splits text into search terms. Hyphenated words are also
+    indexed in their joined form, so 'RNA-Seq', 'rna seq' and 'rnaseq' match.
+    """
+    text = text.lower()
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+(?:[-_][a-z0-9]+)*", text):
+        parts = re.split(r"[-_]", word)
+        tokens.extend(parts)
+        if len(parts) > 1:
+            tokens.append("".join(parts))
+    return [t for t in tokens if t not in STOPWORDS]
+
+
+def _latest_release(releases: list[dict]) -> str | None:
+    """The newest release tag, ignoring the `dev` pseudo-release."""
+    tags = [r for r in releases or [] if r.get("tag_name") and r["tag_name"] != "dev"]
+    if not tags:
+        return None
+    # pipelines.json lists releases newest first; prefer the publish date where there is one.
+    return max(tags, key=lambda r: r.get("published_at") or "")["tag_name"] if any(
+        r.get("published_at") for r in tags) else tags[0]["tag_name"]
+
+
+def _normalize_entry(entry: dict) -> dict:
+    """Maps an entry from nf-co.re/pipelines.json onto the fields we keep."""
+    name = entry.get("full_name") or entry.get("name", "")
+    if not name.startswith("nf-core/"):
+        name = f"nf-core/{name}"
+    return {
+        "name": name,
+        "description": entry.get("description") or "",
+        "topics": list(entry.get("topics") or []),
+        "latest_release": _latest_release(entry.get("releases")),
+    }
+
+
+class NfCoreCatalog:
+    """
+    A local, on-disk copy of the nf-core pipeline catalog with an inverted
+    keyword/topic index for ranked search.
+
+    The catalog is persisted together with the ETag of the last fetch. Once
+    the TTL expires it is revalidated with a conditional request, so an
+    unchanged catalog costs a single 304 round-trip. If the network is
+    unavailable the last cached copy (or the bundled snapshot) is used.
+    Lookups never wait for a fetch: the search tools revalidate with
+    `refresh_in_background` and answer from the copy they have.
+    """
+
+    def __init__(self, cache_path: Path | None = None, ttl_seconds: float = CATALOG_TTL_SECONDS,
+                 url: str = NF_CORE_PIPELINES_URL, offline: bool = False):
+        self._cache_path = cache_path or cache_dir("nf_core") / "catalog.json"
+        self._ttl_seconds = ttl_seconds
+        self._url = url
+        self._offline = offline
+        self._lock = threading.Lock()
+        # (pipelines, inverted index), swapped as a single reference on refresh.
+        self._state: tuple[list[dict], dict[str, dict[int, float]]] = ([], {})
+        self._etag: str | None = None
+        self._fetched_at = 0.0
+        self._retry_after = 0.0
+        self._load()
+
+    @property
+    def pipelines(self) -> list[dict]:
+        return self._state[0]
+
+    def _load(self):
+        """Loads the on-disk cache, falling back to the bundled snapshot."""
+        try:
+            cached = json.loads(self._cache_path.read_text())
+            self._etag = cached.get("etag")
+            self._fetched_at = cached.get("fetched_at", 0.0)
+            self._set_pipelines(cached["pipelines"])
+        except (OSError, ValueError, KeyError):
+            self.load_snapshot(SNAPSHOT_PATH)
+
+    def load_snapshot(self, snapshot_path: Path):
+        """Replaces the catalog with a local pipelines.json snapshot (e.g. for offline use)."""
+        payload = json.loads(Path(snapshot_path).read_text())
+        self._set_pipelines([_normalize_entry(e) for e in payload.get("remote_workflows", [])])
+        # A snapshot has no ETag and is always considered stale, so the next
+        # refresh() replaces it as soon as the network is reachable.
+        self._etag = None
+        self._fetched_at = 0.0
+
+    def _set_pipelines(self, pipelines: list[dict]):
+        index: dict[str, dict[int, float]] = defaultdict(dict)
+        for i, pipeline in enumerate(pipelines):
+            fields = {
+                "name": pipeline["name"].removeprefix("nf-core/"),
+                "topics": " ".join(pipeline.get("topics", [])),
+                "description": pipeline.get("description", ""),
+            }
+            for field, text in fields.items():
+                for token in set(tokenize(text)):
+                    # Keep the strongest field a token appears in, not the sum,
+                    # so a pipeline can't win just by repeating a word.
+                    index[token][i] = max(index[token].get(i, 0.0), FIELD_WEIGHTS[field])
+        self._state = (pipelines, dict(index))
+
+    def _save(self):
+        payload = {"etag": self._etag, "fetched_at": self._fetched_at, "pipelines": self.pipelines}
+        tmp_path = self._cache_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(payload))
+        tmp_path.replace(self._cache_path)
+
+    def is_stale(self) -> bool:
+        return time.time() - self._fetched_at > self._ttl_seconds
+
+    def _should_refresh(self) -> bool:
+        return self.is_stale() and time.time() >= self._retry_after
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Revalidates the catalog against nf-co.re if the TTL has expired.
+        Returns True if the catalog contents changed.
+        """
+        if self._offline or not (force or self._should_refresh()):
+            return False
+        with self._lock:
+            if not (force or self._should_refresh()):
+                return False
+            request = urllib.request.Request(self._url, headers={"Accept": "application/json"})
+            if self._etag:
+                request.add_header("If-None-Match", self._etag)
+            try:
+                with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT_SECONDS) as response:
+                    payload = json.loads(response.read())
+                    etag = response.headers.get("ETag")
+            except urllib.error.HTTPError as e:
+                if e.code == 304:
+                    self._fetched_at = time.time()
+                    self._save()
+                else:
+                    self._retry_after = time.time() + RETRY_BACKOFF_SECONDS
+                return False
+            except (urllib.error.URLError, OSError, ValueError):
+                # Offline or a bad response: keep serving what we have.
+                self._retry_after = time.time() + RETRY_BACKOFF_SECONDS
+                return False
+            self._set_pipelines([_normalize_entry(e) for e in payload.get("remote_workflows", [])])
+            self._etag = etag
+            self._fetched_at = time.time()
+            self._save()
+            return True
+
+    def refresh_in_background(self) -> bool:
+        """
+        Starts `refresh` on a daemon thread if the TTL has expired and no
+        refresh is running. Returns whether one was started.
+        """
+        if self._offline or not self._should_refresh() or self._lock.locked():
+            return False
+        threading.Thread(target=self.refresh, name="nf-core-catalog-refresh", daemon=True).start()
+        return True
+
+    def latest_release(self, pipeline_name: str) -> str | None:
+        """The pipeline's newest release tag, or None if the catalog doesn't know one."""
+        for pipeline in self.pipelines:
+            if pipeline["name"] == pipeline_name:
+                return pipeline.get("latest_release")
+        return None
+
+    def search(self, query: str, top_k: int = 3) -> list[dict]:
+        """
+        Returns the top_k pipelines that best match the query, best first.
+        """
+        pipelines, index = self._state
+        scores: dict[int, float] = defaultdict(float)
+        for token in set(tokenize(query)):
+            for i, weight in index.get(token, {}).items():
+                scores[i] += weight
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], pipelines[item[0]]["name"]))
+        return [
+            {
+                "name": pipelines[i]["name"],
+                "description": pipelines[i]["description"],
+                "latest_release": pipelines[i].get("latest_release"),
+                "score": score,
+            }
+            for i, score in ranked[:top_k]
+        ]
+
+
+_catalog: NfCoreCatalog | None = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> NfCoreCatalog:
+    """
+    Returns the process-wide catalog as it is; never touches the network
+    (see `NfCoreCatalog.refresh_in_background`).
+    """
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = NfCoreCatalog(offline=os.environ.get(OFFLINE_ENV_VAR) == "1")
+    return _catalog
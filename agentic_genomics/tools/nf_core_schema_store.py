@@ -0,0 +1,266 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+
+from tools.cache_dir import cache_dir
+
+NEXTFLOW_SCHEMA_URL = "https://raw.githubusercontent.com/{repo}/{revision}/nextflow_schema.json"
+FETCH_TIMEOUT_SECONDS = 10
+
+# Used when no revision is given (or "latest"): the newest release tag in the
+# catalog. Only a pipeline the catalog knows no release of falls back to the
+# default branch.
+LATEST_REVISION = "latest"
+DEFAULT_REVISION = "master"
+# Release tags ('3.14.0', 'v1.2') and commit SHAs are immutable and never
+# expire; anything else is a branch ('dev', 'feature/x') and moves.
+_PINNED_REVISION = re.compile(r"v?\d+(?:\.\d+)+[\w.+-]*|[0-9a-f]{7,40}")
+UNPINNED_TTL_SECONDS = 24 * 60 * 60
+
+DEFAULT_MAX_MEMORY_ENTRIES = 128
+DEFAULT_MAX_DISK_BYTES = 64 * 1024 * 1024
+
+# For demonstration, we'll use mock schemas.
+MOCK_PIPELINE_SCHEMAS = {
+    "nf-core/rnaseq": {
+        "input": {"type": "string", "description": "Path to input samplesheet.csv"},
+        "outdir": {"type": "string", "description": "The output directory where the results will be saved"},
+        "genome": {"type": "string", "description": "Reference genome ID (e.g., GRCh38)"},
+        "single_end": {"type": "boolean", "description": "Specify if input reads are single-end"},
+    },
+    "nf-core/sarek": {
+        "input": {"type": "string", "description": "Path to input samplesheet.csv"},
+        "outdir": {"type": "string", "description": "The output directory where the results will be saved"},
+        "genome": {"type": "string", "description": "Reference genome ID (e.g., GRCh38)"},
+        "tools": {"type": "array", "description": "List of variant calling tools to run (e.g., 'mutect2', 'strelka')"},
+    },
+}
+
+
+def latest_release(pipeline_name: str) -> str | None:
+    from tools.nf_core_catalog import get_catalog
+
+    return get_catalog().latest_release(pipeline_name)
+
+
+def is_pinned(revision: str) -> bool:
+    """Whether a revision is a release tag or commit, not a branch."""
+    return _PINNED_REVISION.fullmatch(revision) is not None
+
+
+def split_pipeline_ref(pipeline_name: str, revision: str | None = None) -> tuple[str, str]:
+    """
+    Normalizes 'rnaseq', 'nf-core/rnaseq' or 'nf-core/rnaseq@3.14' into
+    ('nf-core/rnaseq', '3.14'). An explicit revision argument wins over '@'.
+    Without either (or with "latest") the revision is resolved to the latest
+    release tag, so every cache keyed on it tells releases apart.
+    """
+    name, _, pinned = pipeline_name.strip().partition("@")
+    if "/" not in name:
+        name = f"nf-core/{name}"
+    revision = revision or pinned or LATEST_REVISION
+    if revision == LATEST_REVISION:
+        revision = latest_release(name) or DEFAULT_REVISION
+    return name, revision
+
+
+def pin_release(pipeline_ref: str) -> str:
+    """
+    'nf-core/name@revision' with a missing (or "latest") revision replaced by
+    the latest release tag, when the catalog knows one. An explicit release
+    tag or branch ('dev', 'feature/x') is what the user asked for and is
+    returned as is.
+    """
+    name, _, revision = pipeline_ref.strip().partition("@")
+    if revision and revision != LATEST_REVISION:
+        return pipeline_ref.strip()
+    return "@".join(split_pipeline_ref(name))
+
+
+def fetch_nextflow_schema(pipeline_name: str, revision: str) -> dict:
+    """Downloads a pipeline's nextflow_schema.json from GitHub."""
+    url = NEXTFLOW_SCHEMA_URL.format(repo=pipeline_name, revision=revision)
+    with urllib.request.urlopen(url, timeout=FETCH_TIMEOUT_SECONDS) as response:
+        return json.loads(response.read())
+
+
+def _first_sentence(text: str) -> str:
+    return text.split(". ")[0].strip()
+
+
+def parse_schema(raw_schema: dict) -> dict:
+    """
+    Reduces a nextflow_schema.json document to the parts the agents act on:
+    the required params, and each visible param's type, default and group.
+    Params marked `hidden` (boilerplate such as email or plaintext_email)
+    are only counted.
+
+    A flat {param: {"type": ..., "description": ...}} mapping is also
+    accepted and treated as a single ungrouped schema.
+    """
+    groups = raw_schema.get("$defs") or raw_schema.get("definitions")
+    if groups is None:
+        properties = raw_schema.get("properties")
+        if properties is None:
+            properties = {k: v for k, v in raw_schema.items() if isinstance(v, dict)}
+        groups = {"parameters": {"properties": properties, "required": raw_schema.get("required", [])}}
+
+    params: dict[str, dict] = {}
+    required: list[str] = []
+    group_params: dict[str, list[str]] = {}
+    hidden = 0
+    for group_key, group in groups.items():
+        title = group.get("title", group_key)
+        group_required = set(group.get("required", []))
+        for name, spec in group.get("properties", {}).items():
+            if spec.get("hidden"):
+                hidden += 1
+                continue
+            param = {"type": spec.get("type", "string")}
+            if "default" in spec:
+                param["default"] = spec["default"]
+            if "enum" in spec:
+                param["enum"] = spec["enum"]
+            if spec.get("description"):
+                param["description"] = _first_sentence(spec["description"])
+            param["group"] = title
+            params[name] = param
+            group_params.setdefault(title, []).append(name)
+            if name in group_required:
+                required.append(name)
+
+    return {
+        "required": required,
+        "params": params,
+        "groups": group_params,
+        "hidden_params": hidden,
+        "schema_digest": hashlib.sha256(json.dumps(raw_schema, sort_keys=True).encode()).hexdigest()[:16],
+    }
+
+
+class SchemaStore:
+    """
+    A process-wide store of parsed pipeline schemas keyed on (pipeline, revision).
+
+    Each schema is parsed once and the compact form is kept both in a bounded
+    in-memory LRU and on disk, so a cold worker only reads a small JSON file.
+    Pinned revisions never expire; branch revisions are re-fetched after a TTL.
+    The disk cache is trimmed oldest-first once it exceeds max_disk_bytes.
+
+    `parser` reduces a loaded schema to its stored form; other per-release
+    schemas (e.g. samplesheet schemas) use their own loader, parser and dir.
+    """
+
+    def __init__(self, loader: Callable[[str, str], dict] = fetch_nextflow_schema, store_dir: Path | None = None,
+                 max_memory_entries: int = DEFAULT_MAX_MEMORY_ENTRIES, max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+                 unpinned_ttl_seconds: float = UNPINNED_TTL_SECONDS, parser: Callable[[dict], dict] = parse_schema):
+        self._loader = loader
+        self._parser = parser
+        self._store_dir = store_dir or cache_dir("schemas")
+        self._max_memory_entries = max_memory_entries
+        self._max_disk_bytes = max_disk_bytes
+        self._unpinned_ttl_seconds = unpinned_ttl_seconds
+        self._memory: OrderedDict[tuple[str, str], dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "parses": 0}
+
+    def _disk_path(self, pipeline_name: str, revision: str) -> Path:
+        # Branch names may contain '/' (e.g. 'feature/x').
+        return self._store_dir / f"{pipeline_name.replace('/', '__')}@{urllib.parse.quote(revision, safe='')}.json"
+
+    def _is_fresh(self, entry: dict) -> bool:
+        if is_pinned(entry["revision"]):
+            return True
+        return time.time() - entry["parsed_at"] < self._unpinned_ttl_seconds
+
+    def get(self, pipeline_name: str, revision: str | None = None) -> dict:
+        """
+        Returns the parsed schema for a pipeline, loading and parsing it only
+        if neither the memory nor the disk cache has a fresh copy.
+        """
+        key = split_pipeline_ref(pipeline_name, revision)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and self._is_fresh(entry):
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry
+
+        path = self._disk_path(*key)
+        try:
+            entry = json.loads(path.read_text())
+            if not self._is_fresh(entry):
+                entry = None
+            else:
+                os.utime(path)  # Mark as recently used for disk eviction.
+                self.stats["disk_hits"] += 1
+        except (OSError, ValueError):
+            entry = None
+
+        if entry is None:
+            entry = {"pipeline": key[0], "revision": key[1], "parsed_at": time.time(), **self._parser(self._loader(*key))}
+            self.stats["parses"] += 1
+            self._write(path, entry)
+
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self._max_memory_entries:
+                self._memory.popitem(last=False)
+        return entry
+
+    def _write(self, path: Path, entry: dict):
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(entry, separators=(",", ":")))
+        tmp_path.replace(path)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        files = []
+        for p in self._store_dir.glob("*.json"):
+            try:
+                stat = p.stat()
+            except FileNotFoundError:  # Evicted by another worker meanwhile.
+                continue
+            files.append((stat.st_mtime, stat.st_size, p))
+        total = sum(size for _, size, _ in files)
+        for _, size, p in sorted(files):
+            if total <= self._max_disk_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+
+
+def load_schema(pipeline_name: str, revision: str) -> dict:
+    # The mock schemas stand in for pipelines we haven't wired up to GitHub yet.
+    if pipeline_name in MOCK_PIPELINE_SCHEMAS:
+        return MOCK_PIPELINE_SCHEMAS[pipeline_name]
+    return fetch_nextflow_schema(pipeline_name, revision)
+
+
+_schema_store: SchemaStore | None = None
+_schema_store_lock = threading.Lock()
+
+
+def get_schema_store() -> SchemaStore:
+    """
+    Returns the process-wide schema store shared by every GetPipelineSchemaTool.
+    """
+    global _schema_store
+    if _schema_store is None:
+        with _schema_store_lock:
+            if _schema_store is None:
+                _schema_store = SchemaStore(loader=load_schema)
+    return _schema_store
@@ -1,31 +1,12 @@
 from google.adk.tools import BaseTool
 from google.adk.tools import tool_code
-from functools import lru_cache
 
-# In a real scenario, you'd use 'requests' or 'nf-core' CLI wrapper here.
-# For demonstration, we'll use mock data.
-MOCK_NF_CORE_PIPELINES = [
-    {"name": "nf-core/rnaseq", "description": "RNA-Seq analysis pipeline"},
-    {"name": "nf-core/sarek", "description": "Variant calling pipeline for germline and somatic variants"},
-    {"name": "nf-core/chipseq", "description": "ChIP-Seq analysis pipeline"},
-    {"name": "nf-core/atacseq", "description": "ATAC-Seq analysis pipeline"},
-    {"name": "nf-core/mag", "description": "Metagenome-assembled genomes (MAGs) pipeline"},
-]
+from tools.nf_core_catalog import get_catalog
+from tools.nf_core_schema_store import MOCK_PIPELINE_SCHEMAS, get_schema_store, pin_release  # noqa: F401 (re-exported)
+
+DEFAULT_SEARCH_TOP_K = 3
+MAX_SEARCH_TOP_K = 10
 
-MOCK_PIPELINE_SCHEMAS = {
-    "nf-core/rnaseq": {
-        "input": {"type": "string", "description": "Path to input samplesheet.csv"},
-        "outdir": {"type": "string", "description": "The output directory where the results will be saved"},
-        "genome": {"type": "string", "description": "Reference genome ID (e.g., GRCh38)"},
-        "single_end": {"type": "boolean", "description": "Specify if input reads are single-end"},
-    },
-    "nf-core/sarek": {
-        "input": {"type": "string", "description": "Path to input samplesheet.csv"},
-        "outdir": {"type": "string", "description": "The output directory where the results will be saved"},
-        "genome": {"type": "string", "description": "Reference genome ID (e.g., GRCh38)"},
-        "tools": {"type": "array", "description": "List of variant calling tools to run (e.g., 'mutect2', 'strelka')"},
-    },
-}
 
 class ListNfCorePipelinesTool(BaseTool):
     """
@@ -39,10 +20,41 @@ class ListNfCorePipelinesTool(BaseTool):
         )
 
     def _run(self):
-        # In a real implementation, this would call the nf-core API or parse local data.
-        # Example: response = requests.get("https://nf-co.re/pipelines.json")
-        # return response.json()
-        return MOCK_NF_CORE_PIPELINES
+        # Prefer `search_nf_core_pipelines`; the full catalog is 100+ entries.
+        catalog = get_catalog()
+        catalog.refresh_in_background()
+        return [{"name": p["name"], "description": p["description"]} for p in catalog.pipelines]
+
+
+class SearchNfCorePipelinesTool(BaseTool):
+    """
+    A tool to find the nf-core pipelines that best match an analysis request.
+    """
+    def _get_declaration(self):
+        return tool_code(
+            name="search_nf_core_pipelines",
+            description="Searches the nf-core catalog and returns only the best matching pipelines for an analysis request.",
+            parameters={
+                "query": {
+                    "type": "string",
+                    "description": "Keywords describing the analysis, e.g. 'RNA-Seq differential expression' or 'somatic variant calling'.",
+                },
+                "top_k": {
+                    "type": "integer",
+                    "description": f"The maximum number of candidates to return (default {DEFAULT_SEARCH_TOP_K}).",
+                },
+            },
+        )
+
+    def _run(self, query: str, top_k: int = DEFAULT_SEARCH_TOP_K):
+        top_k = max(1, min(int(top_k), MAX_SEARCH_TOP_K))
+        catalog = get_catalog()
+        # An expired catalog is revalidated for the next search; this one answers from the local copy.
+        catalog.refresh_in_background()
+        results = catalog.search(query, top_k=top_k)
+        if not results:
+            return {"error": f"No nf-core pipelines matched '{query}'. Try broader keywords."}
+        return results
 
 
 class GetPipelineSchemaTool(BaseTool):
@@ -52,15 +64,52 @@ class GetPipelineSchemaTool(BaseTool):
     def _get_declaration(self):
         return tool_code(
             name="get_pipeline_schema",
-            description="Retrieves the detailed input schema (parameters) for a given nf-core pipeline.",
-            parameters={"pipeline_name": {"type": "string", "description": "The full name of the nf-core pipeline (e.g., 'nf-core/rnaseq')."}}
+            description="Retrieves the parsed input schema (required params, types, defaults and groups) for a given nf-core pipeline.",
+            parameters={
+                "pipeline_name": {"type": "string", "description": "The full name of the nf-core pipeline (e.g., 'nf-core/rnaseq'), optionally pinned to a release (e.g., 'nf-core/rnaseq@3.14')."},
+                "revision": {"type": "string", "description": "Optional release tag or branch (e.g. '3.14.0' or 'dev'). Defaults to the latest release."},
+            }
         )
 
-    def _run(self, pipeline_name: str):
-        # In a real implementation, this would parse nextflow_schema.json or call an API.
-        # Using lru_cache for demonstration of caching.
-        return self._get_cached_schema(pipeline_name)
+    def _run(self, pipeline_name: str, revision: str = None):
+        if revision:
+            pipeline_name = f"{pipeline_name.partition('@')[0]}@{revision}"
+        try:
+            # The returned `revision` is what the scout hands on, so a missing one is pinned to a release.
+            return get_schema_store().get(pin_release(pipeline_name))
+        except Exception as e:
+            return {"error": f"Schema not found for {pipeline_name}: {e}"}
+
+
+class GetPipelineParamsTool(BaseTool):
+    """
+    A tool to look up the details of a few parameters of a pipeline, so agents
+    that only hold the compact pipeline handoff don't need the whole schema.
+    """
+    def _get_declaration(self):
+        return tool_code(
+            name="get_pipeline_params",
+            description="Returns type, default, allowed values and description for specific parameters, or for every parameter in a group, of an nf-core pipeline.",
+            parameters={
+                "pipeline_name": {"type": "string", "description": "The full name of the nf-core pipeline, optionally pinned to a release (e.g., 'nf-core/rnaseq@3.14')."},
+                "names": {"type": "array", "description": "Parameter names to look up, e.g. ['input', 'genome']."},
+                "group": {"type": "string", "description": "Optional parameter group to list instead, e.g. 'Reference genome options'."},
+            }
+        )
 
-    @lru_cache(maxsize=128) # Cache up to 128 different pipeline schemas
-    def _get_cached_schema(self, pipeline_name: str):
-        return MOCK_PIPELINE_SCHEMAS.get(pipeline_name, {"error": f"Schema not found for {pipeline_name}"})
\ No newline at end of file
+    def _run(self, pipeline_name: str, names: list = None, group: str = None):
+        try:
+            schema = get_schema_store().get(pipeline_name)
+        except Exception as e:
+            return {"error": f"Schema not found for {pipeline_name}: {e}"}
+        if group:
+            if group not in schema["groups"]:
+                return {"error": f"Unknown group '{group}'. Groups: {', '.join(schema['groups'])}"}
+            names = schema["groups"][group]
+        if not names:
+            return {"error": "Pass the parameter `names` to look up, or a `group`."}
+        unknown = [name for name in names if name not in schema["params"]]
+        return {
+            "params": {name: schema["params"][name] for name in names if name in schema["params"]},
+            **({"unknown": unknown} if unknown else {}),
+        }
@@ -0,0 +1,40 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Bounded worker pools for blocking work called from an event loop, by name:
+# (env var, default size). Whole workflow runs block a worker for minutes
+# while their own tool calls need workers too, so they get a pool of their
+# own; sharing one bounded pool could fill it with workflows and deadlock.
+POOLS = {
+    "tools": ("AGENTIC_GENOMICS_TOOL_WORKERS", 32),
+    "workflows": ("AGENTIC_GENOMICS_WORKFLOW_WORKERS", 16),
+}
+
+_executors: dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name: str) -> ThreadPoolExecutor:
+    """Returns the process-wide pool with the given name."""
+    if name not in _executors:
+        with _executors_lock:
+            if name not in _executors:
+                env_var, default = POOLS[name]
+                _executors[name] = ThreadPoolExecutor(max_workers=int(os.environ.get(env_var, default)),
+                                                      thread_name_prefix=f"offload_{name}")
+    return _executors[name]
+
+
+async def run_blocking(pool: str, fn, /, *args, **kwargs):
+    """
+    Runs a blocking call in the named pool without blocking the event loop.
+    Context variables (e.g. the current tracing span) carry over to the
+    worker thread. Calls beyond the pool size queue for a free worker.
+    """
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        get_executor(pool), functools.partial(context.run, fn, *args, **kwargs))
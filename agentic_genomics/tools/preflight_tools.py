@@ -0,0 +1,28 @@
+import asyncio
+
+from google.adk.tools import BaseTool, tool_code
+
+from tools.samplesheet_preflight import DEFAULT_CONCURRENCY, preflight_samplesheet
+
+
+class ValidateSamplesheetTool(BaseTool):
+    """
+    A tool to check a samplesheet and every input file it references before
+    any infrastructure is provisioned.
+    """
+
+    def _get_declaration(self):
+        return tool_code(
+            name="validate_samplesheet",
+            description="Validates a samplesheet against the pipeline's samplesheet schema (required columns, allowed values, file name patterns) and checks that every referenced input file exists, locally or in GCS. Returns the first problems found and their totals.",
+            parameters={
+                "samplesheet": {"type": "string", "description": "The path or gs:// URI of the samplesheet (the pipeline's `input` parameter)."},
+                "pipeline_name": {"type": "string", "description": "The pipeline, optionally pinned to a release (e.g. 'nf-core/rnaseq@3.14.0')."},
+            },
+        )
+
+    def _run(self, samplesheet: str, pipeline_name: str) -> dict:
+        return asyncio.run(self._run_async(samplesheet, pipeline_name))
+
+    async def _run_async(self, samplesheet: str, pipeline_name: str, concurrency: int = DEFAULT_CONCURRENCY) -> dict:
+        return await preflight_samplesheet(samplesheet, pipeline_name, concurrency=concurrency)
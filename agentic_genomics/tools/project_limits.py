@@ -0,0 +1,132 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+# Concurrent applies per GCP project; GKE creation is quota-bound per project.
+MAX_APPLIES_PER_PROJECT_ENV_VAR = "AGENTIC_GENOMICS_MAX_APPLIES_PER_PROJECT"
+DEFAULT_MAX_APPLIES_PER_PROJECT = 2
+# Minimum spacing between apply starts in the same project, to stay under
+# the per-minute Compute/Container API write quotas.
+MIN_START_INTERVAL_SECONDS = 5.0
+
+
+class _Waiter:
+    """A queued acquirer; `wake` is called, under the limiter's lock, when it is handed a slot."""
+
+    def __init__(self, wake):
+        self.wake = wake
+        self.granted = False
+
+
+class _ProjectSlots:
+    def __init__(self):
+        self.active = 0
+        self.waiters: deque[_Waiter] = deque()
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class ProjectRateLimiter:
+    """
+    Limits how many Terraform/GCP operations run at once for each project,
+    and how quickly new ones may start. Shared by every thread in the process,
+    so concurrent workflow runs against one project queue up here instead of
+    failing on quota errors mid-apply.
+
+    Workflow runs execute on several threads, each with its own event loop,
+    so the slots are counted under a threading lock. Waiters queue in FIFO
+    order, and a released slot is handed straight to the next one: a thread
+    waits on an Event, a coroutine on a future of its own loop. Waiting
+    coroutines therefore don't hold a worker thread each.
+    """
+
+    def __init__(self, max_concurrent: int | None = None, min_interval_seconds: float = MIN_START_INTERVAL_SECONDS):
+        self._max_concurrent = max_concurrent or int(
+            os.environ.get(MAX_APPLIES_PER_PROJECT_ENV_VAR, DEFAULT_MAX_APPLIES_PER_PROJECT))
+        self._min_interval_seconds = min_interval_seconds
+        self._lock = threading.Lock()
+        self._projects: dict[str, _ProjectSlots] = {}
+        self._next_start: dict[str, float] = {}
+
+    def _acquire_or_enqueue(self, project_id: str, wake) -> _Waiter | None:
+        """Takes a free slot and returns None, or queues a waiter and returns it."""
+        with self._lock:
+            slots = self._projects.setdefault(project_id, _ProjectSlots())
+            if slots.active < self._max_concurrent and not slots.waiters:
+                slots.active += 1
+                return None
+            waiter = _Waiter(wake)
+            slots.waiters.append(waiter)
+            return waiter
+
+    def _release(self, project_id: str):
+        with self._lock:
+            slots = self._projects[project_id]
+            while slots.waiters:
+                waiter = slots.waiters.popleft()
+                try:
+                    waiter.wake()
+                except RuntimeError:
+                    continue  # Its event loop has closed; nobody is waiting there any more.
+                waiter.granted = True
+                return
+            slots.active -= 1
+
+    def _abandon(self, project_id: str, waiter: _Waiter):
+        """Withdraws a cancelled waiter, or gives back the slot it was handed meanwhile."""
+        with self._lock:
+            if not waiter.granted:
+                self._projects[project_id].waiters.remove(waiter)
+                return
+        self._release(project_id)
+
+    def _reserve_start(self, project_id: str) -> float:
+        """Returns how long the caller must wait before starting."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(project_id, 0.0))
+            self._next_start[project_id] = start + self._min_interval_seconds
+            return start - now
+
+    def stats(self, project_id: str) -> dict:
+        with self._lock:
+            slots = self._projects.get(project_id) or _ProjectSlots()
+            return {"active": slots.active, "waiting": len(slots.waiters)}
+
+    @contextmanager
+    def slot(self, project_id: str):
+        granted = threading.Event()
+        waiter = self._acquire_or_enqueue(project_id, granted.set)
+        if waiter is not None:
+            granted.wait()
+        try:
+            time.sleep(self._reserve_start(project_id))
+            yield
+        finally:
+            self._release(project_id)
+
+    @asynccontextmanager
+    async def slot_async(self, project_id: str):
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+        waiter = self._acquire_or_enqueue(project_id, lambda: loop.call_soon_threadsafe(_resolve, granted))
+        if waiter is not None:
+            try:
+                await granted
+            except asyncio.CancelledError:
+                self._abandon(project_id, waiter)
+                raise
+        try:
+            await asyncio.sleep(self._reserve_start(project_id))
+            yield
+        finally:
+            self._release(project_id)
+
+
+project_limiter = ProjectRateLimiter()
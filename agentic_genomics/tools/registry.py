@@ -0,0 +1,116 @@
+import importlib
+import threading
+
+from google.adk.tools import BaseTool
+
+from tools.offload import run_blocking
+
+# Agents and tools by name, as "module:attribute". Nothing here is imported
+# until first use, so a cold start only pays for the orchestrator.
+AGENTS = {
+    "pipeline_scout_agent": "agents.pipeline_scout:PipelineScoutAgent",
+    "configurator_agent": "agents.configurator:ConfiguratorAgent",
+    "blueprint_architect_agent": "agents.blueprint_architect:BlueprintArchitectAgent",
+    "deployment_engineer_agent": "agents.deployment_engineer:DeploymentEngineerAgent",
+}
+
+# The order DeploymentWorkflowTool runs the agents in.
+WORKFLOW_STAGES = list(AGENTS)
+
+TOOLS = {
+    "list_nf_core_pipelines": "tools.nf_core_tools:ListNfCorePipelinesTool",
+    "search_nf_core_pipelines": "tools.nf_core_tools:SearchNfCorePipelinesTool",
+    "get_pipeline_schema": "tools.nf_core_tools:GetPipelineSchemaTool",
+    "get_pipeline_params": "tools.nf_core_tools:GetPipelineParamsTool",
+    "validate_samplesheet": "tools.preflight_tools:ValidateSamplesheetTool",
+    "create_params_json": "tools.nextflow_tools:CreateParamsJsonTool",
+    "create_nextflow_config": "tools.nextflow_tools:CreateNextflowConfigTool",
+    "register_nextflow_run": "tools.nextflow_tools:RegisterNextflowRunTool",
+    "recommend_cluster_size": "tools.sizing_tools:RecommendClusterSizeTool",
+    "create_cluster_toolkit_blueprint": "tools.terraform_tools:CreateClusterToolkitBlueprintTool",
+    "estimate_blueprint_cost": "tools.billing_tools:EstimateBlueprintCostTool",
+    "execute_terraform_apply": "tools.terraform_tools:ExecuteTerraformApplyTool",
+    "release_cluster": "tools.terraform_tools:ReleaseClusterTool",
+}
+
+
+class Registry:
+    """
+    Materializes registered objects by name on first use, then returns the
+    same instance. Entries that resolve to a class are instantiated once.
+    """
+
+    def __init__(self, entries: dict[str, str]):
+        self._entries = entries
+        self._loaded: dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def names(self) -> list[str]:
+        return list(self._entries)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._loaded
+
+    def get(self, name: str):
+        if name not in self._loaded:
+            with self._lock:
+                if name not in self._loaded:
+                    if name not in self._entries:
+                        raise KeyError(f"Unknown name '{name}'. Registered: {', '.join(self._entries)}")
+                    module_name, attribute = self._entries[name].split(":")
+                    value = getattr(importlib.import_module(module_name), attribute)
+                    self._loaded[name] = value() if isinstance(value, type) else value
+        return self._loaded[name]
+
+
+agent_registry = Registry(AGENTS)
+tool_registry = Registry(TOOLS)
+
+
+class LazyTool(BaseTool):
+    """
+    Stands in for a registered tool in an agent's tool list. The tool's module
+    is imported the first time the model needs its declaration or calls it.
+    """
+
+    def __init__(self, name: str):
+        if name not in TOOLS:
+            raise KeyError(f"Unknown tool '{name}'. Registered: {', '.join(TOOLS)}")
+        self.name = name
+
+    @property
+    def tool(self) -> BaseTool:
+        return tool_registry.get(self.name)
+
+    def _get_declaration(self):
+        return self.tool._get_declaration()
+
+    def _run(self, **kwargs):
+        return self.tool._run(**kwargs)
+
+    async def run_async(self, *, args: dict, tool_context=None):
+        """
+        Runs the tool without blocking the event loop: natively async tools
+        (e.g. `execute_terraform_apply`) are awaited, and the synchronous
+        ones run in the bounded "tools" pool, so one session's blocking call
+        doesn't stall the others.
+        """
+        if not tool_registry.is_loaded(self.name):
+            # The first use imports the tool's module; keep that off the loop too.
+            await run_blocking("tools", lambda: self.tool)
+        tool = self.tool
+        if hasattr(tool, "_run_async"):
+            return await tool._run_async(**args)
+        return await run_blocking("tools", tool._run, **args)
+
+    def __getattr__(self, attribute):
+        # Only public attributes come from the real tool. Dunder and private
+        # probes (copy, pickle, `hasattr` checks) must not import it, and
+        # before __init__ has set `name` there is no tool to forward to.
+        if attribute.startswith("_") or "name" not in self.__dict__:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {attribute!r}")
+        return getattr(self.tool, attribute)
+
+
+def lazy_tools(*names: str) -> list[LazyTool]:
+    return [LazyTool(name) for name in names]
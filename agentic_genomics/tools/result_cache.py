@@ -0,0 +1,177 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+from tools.cache_dir import cache_dir
+from tools.nf_core_catalog import tokenize
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+# Token-set Jaccard similarity a cached request needs to count as a near duplicate.
+NEAR_DUPLICATE_THRESHOLD = 0.85
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    stage TEXT NOT NULL,
+    key TEXT NOT NULL,
+    context TEXT NOT NULL,
+    tokens TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (stage, key)
+);
+CREATE INDEX IF NOT EXISTS results_by_context ON results (stage, context);
+CREATE INDEX IF NOT EXISTS results_by_last_used ON results (last_used);
+"""
+
+
+def normalize_request(request: str) -> list[str]:
+    """
+    Reduces a request to its sorted, de-duplicated search terms, so
+    'RNA-Seq on GRCh38, paired-end' and 'rnaseq grch38 paired end' agree.
+    """
+    return sorted(set(tokenize(request)))
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class ResultCache:
+    """
+    A persistent (SQLite) cache of agent stage results.
+
+    Entries are keyed on the stage, the normalized request and a context
+    string (e.g. pipeline revision and schema digest) and expire after a TTL.
+    The least recently used entries are evicted once the cache exceeds
+    max_entries or max_bytes. Near-duplicate lookup is opt-in: it returns the
+    most similar cached request with the same stage and context. So is
+    `any_request` lookup, for stages whose entries are matched on their
+    contents (via `accept`) rather than on the request's wording.
+    """
+
+    def __init__(self, path: Path | None = None, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES,
+                 near_duplicate_threshold: float = NEAR_DUPLICATE_THRESHOLD):
+        self._path = path or cache_dir("results") / "stage_results.sqlite3"
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._near_duplicate_threshold = near_duplicate_threshold
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._stats: dict[str, dict[str, int]] = {}
+
+    @staticmethod
+    def make_key(tokens: list[str], context: str) -> str:
+        return hashlib.sha256(json.dumps([tokens, context]).encode()).hexdigest()
+
+    def _count(self, stage: str, outcome: str):
+        stage_stats = self._stats.setdefault(stage, {"hits": 0, "near_hits": 0, "misses": 0})
+        stage_stats[outcome] += 1
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Hit/miss counters per stage since this cache was opened."""
+        with self._lock:
+            return {stage: dict(counts) for stage, counts in self._stats.items()}
+
+    def get(self, stage: str, request: str, context: str = "", near_duplicates: bool = False,
+            accept: Callable[[object], bool] | None = None, any_request: bool = False):
+        """
+        Returns the cached value for the request, or None. With near_duplicates,
+        falls back to the most similar cached request above the threshold.
+        A value `accept` rejects counts as absent, so the next most similar
+        request is tried instead. With any_request (which needs `accept`),
+        then falls back to the most recently used value with the same stage
+        and context that `accept` approves, whatever its request.
+        """
+        tokens = normalize_request(request)
+        now = time.time()
+        cutoff = now - self._ttl_seconds
+        with self._lock:
+            key, value, outcome = self.make_key(tokens, context), None, "hits"
+            row = self._db.execute(
+                "SELECT value FROM results WHERE stage = ? AND key = ? AND created_at >= ?",
+                (stage, key, cutoff),
+            ).fetchone()
+            if row is not None:
+                value = json.loads(row[0])
+                if accept is not None and not accept(value):
+                    value = None
+            if value is None and near_duplicates:
+                query = set(tokens)
+                candidates = []
+                for candidate_key, cached_tokens, payload in self._db.execute(
+                    "SELECT key, tokens, value FROM results WHERE stage = ? AND context = ? AND created_at >= ?",
+                    (stage, context, cutoff),
+                ):
+                    score = _jaccard(query, set(json.loads(cached_tokens)))
+                    if score >= self._near_duplicate_threshold and candidate_key != key:
+                        candidates.append((score, candidate_key, payload))
+                for _, candidate_key, payload in sorted(candidates, key=lambda c: c[0], reverse=True):
+                    candidate = json.loads(payload)
+                    if accept is None or accept(candidate):
+                        key, value, outcome = candidate_key, candidate, "near_hits"
+                        break
+            if value is None and any_request and accept is not None:
+                for candidate_key, payload in self._db.execute(
+                    "SELECT key, value FROM results WHERE stage = ? AND context = ? AND created_at >= ?"
+                    " ORDER BY last_used DESC", (stage, context, cutoff),
+                ).fetchall():
+                    candidate = json.loads(payload)
+                    if candidate_key != key and accept(candidate):
+                        key, value, outcome = candidate_key, candidate, "near_hits"
+                        break
+            if value is None:
+                self._count(stage, "misses")
+                return None
+            self._count(stage, outcome)
+            self._db.execute("UPDATE results SET last_used = ? WHERE stage = ? AND key = ?", (now, stage, key))
+            return value
+
+    def put(self, stage: str, request: str, value, context: str = ""):
+        tokens = normalize_request(request)
+        payload = json.dumps(value)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (stage, self.make_key(tokens, context), context, json.dumps(tokens), payload, len(payload), now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+        self._db.execute("DELETE FROM results WHERE created_at < ?", (now - self._ttl_seconds,))
+        count, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        if count <= self._max_entries and total <= self._max_bytes:
+            return
+        for stage, key, size in self._db.execute(
+            "SELECT stage, key, size FROM results ORDER BY last_used").fetchall():
+            if count <= self._max_entries and total <= self._max_bytes:
+                break
+            self._db.execute("DELETE FROM results WHERE stage = ? AND key = ?", (stage, key))
+            count -= 1
+            total -= size
+
+
+_result_cache: ResultCache | None = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """Returns the process-wide result cache."""
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache()
+    return _result_cache
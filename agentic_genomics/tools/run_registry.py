@@ -0,0 +1,316 @@
+import hashlib
+import json
+import os
+import shlex
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from tools.cache_dir import cache_dir
+from tools.nextflow_config import config_settings
+from tools.nf_core_schema_store import split_pipeline_ref
+from tools.tenancy import current_tenant
+
+RETENTION_DAYS_ENV_VAR = "AGENTIC_GENOMICS_WORKDIR_RETENTION_DAYS"
+DEFAULT_RETENTION_DAYS = 30  # 0 keeps work dirs forever.
+GC_INTERVAL_SECONDS = 24 * 60 * 60
+# Share of params a previous run must agree on for its lineage to be resumed.
+NEAR_MATCH_THRESHOLD = 0.75
+MAX_CANDIDATES = 200
+
+# Params that only change where or how results are published, not any task's
+# inputs, so they never invalidate Nextflow's task cache.
+IGNORED_PARAMS = {
+    "outdir", "publish_dir_mode", "email", "email_on_fail", "plaintext_email", "max_multiqc_email_size",
+    "monochrome_logs", "hook_url", "help", "version", "validate_params", "tracedir",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    lineage TEXT NOT NULL,
+    pipeline TEXT NOT NULL,
+    revision TEXT NOT NULL,
+    project TEXT,
+    params_hash TEXT NOT NULL,
+    params TEXT NOT NULL,
+    config_digest TEXT,
+    tenant TEXT,
+    work_dir TEXT NOT NULL,
+    configured_work_dir TEXT,
+    owned INTEGER NOT NULL DEFAULT 0,
+    launch_dir TEXT NOT NULL,
+    resumed_from TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_pipeline ON runs (pipeline, revision, project, created_at);
+CREATE INDEX IF NOT EXISTS runs_by_lineage ON runs (lineage, created_at);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+# Columns added since the first release, for stores created before them.
+_ADDED_COLUMNS = {"configured_work_dir": "TEXT", "owned": "INTEGER NOT NULL DEFAULT 0", "tenant": "TEXT"}
+
+
+def canonical_params(params: dict) -> dict:
+    """The params that can affect task hashes, with JSON-equal values normalized."""
+    return {key: json.loads(json.dumps(value, sort_keys=True)) for key, value in sorted(params.items())
+            if key not in IGNORED_PARAMS and value is not None}
+
+
+def params_hash(params: dict) -> str:
+    return hashlib.sha256(json.dumps(canonical_params(params), sort_keys=True).encode()).hexdigest()[:16]
+
+
+def changed_params(old: dict, new: dict) -> list[str]:
+    old, new = canonical_params(old), canonical_params(new)
+    return sorted(key for key in old.keys() | new.keys() if old.get(key) != new.get(key))
+
+
+def _similarity(old: dict, new: dict) -> float:
+    keys = canonical_params(old).keys() | canonical_params(new).keys()
+    return 1.0 - len(changed_params(old, new)) / len(keys) if keys else 1.0
+
+
+def predict_reuse(profile: dict, changed: list[str]) -> dict:
+    """
+    Predicts which processes Nextflow will take from the cache on -resume,
+    from the profile's process dependencies (the params each process reads
+    and the processes it runs after). A changed samplesheet (`input`) only
+    re-runs per-sample processes for new or edited samples.
+    """
+    tasks = profile["tasks"]
+    if not any("params" in task or "after" in task for task in tasks):
+        return {"known": False, "changed_params": changed}
+    changed_set = set(changed)
+    mapped = {param for task in tasks for param in task.get("params", [])}
+    processes = [task["process"] for task in tasks]
+    rerun, partial = set(), set()
+    # Upstream processes may be listed later (e.g. the genome index), so repeat until nothing changes.
+    while True:
+        before = (len(rerun), len(partial))
+        for task in tasks:
+            after = task.get("after", [])
+            upstream = set(processes) - {task["process"]} if "*" in after else set(after)
+            if changed_set & set(task.get("params", [])) or rerun & upstream:
+                rerun.add(task["process"])
+            elif partial & upstream:
+                # A per-run task aggregates every sample, so any changed sample re-runs it.
+                (rerun if "per_run" in task else partial).add(task["process"])
+            elif "input" in changed_set and "per_sample" in task:
+                partial.add(task["process"])
+        partial -= rerun
+        if (len(rerun), len(partial)) == before:
+            break
+    return {
+        "known": True,
+        "changed_params": changed,
+        "reused": [p for p in processes if p not in rerun and p not in partial],
+        "rerun": [p for p in processes if p in rerun],
+        # Re-run only for samples that are new or changed in the samplesheet.
+        "rerun_for_changed_samples": [p for p in processes if p in partial],
+        # Changed params no process in the profile is known to read; Nextflow may re-run more.
+        "unmapped_params": sorted(changed_set - mapped - {"input"}),
+    }
+
+
+class RunRegistry:
+    """
+    A persistent (SQLite) record of every Nextflow run this machine has
+    configured: pipeline revision, canonical params hash, config digest,
+    work dir and launch dir.
+
+    A new lineage gets a work dir of its own, a subdirectory named after it
+    under the workDir the user configured, and a launch dir (where Nextflow
+    keeps its `.nextflow` cache index, which `-resume` needs). The same
+    tenant's later runs with the same or nearly the same params and the same
+    configured workDir continue the lineage and share both. A lineage whose newest run is older than the
+    retention period has its launch dir and, if the registry allocated it,
+    its work dir deleted by `collect_garbage`; a workDir the user configured
+    is never deleted.
+    """
+
+    def __init__(self, path: Path | None = None, retention_days: float | None = None):
+        self._dir = path or cache_dir("nextflow_runs")
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._retention_days = retention_days if retention_days is not None else float(
+            os.environ.get(RETENTION_DAYS_ENV_VAR, DEFAULT_RETENTION_DAYS))
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self._dir / "runs.sqlite3", check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(runs)")}
+        for name, definition in _ADDED_COLUMNS.items():
+            if name not in columns:
+                self._db.execute(f"ALTER TABLE runs ADD COLUMN {name} {definition}")
+        self._gc_thread: threading.Thread | None = None
+
+    def find_previous(self, pipeline_name: str, params: dict, project: str | None = None,
+                      configured_work_dir: str | None = None, tenant: str | None = None) -> dict | None:
+        """
+        The tenant's most recent run of the same pipeline revision in the same
+        project, configured with the same workDir, with identical params, else
+        the most similar one above the threshold. Returns the run with its
+        `match` ("exact" or "near") and `similarity`.
+        """
+        pipeline, revision = split_pipeline_ref(pipeline_name)
+        digest = params_hash(params)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT run_id, lineage, params_hash, params, work_dir, launch_dir, created_at FROM runs"
+                " WHERE pipeline = ? AND revision = ? AND project IS ? AND configured_work_dir IS ? AND tenant IS ?"
+                " ORDER BY created_at DESC LIMIT ?",
+                (pipeline, revision, project, configured_work_dir, tenant, MAX_CANDIDATES)).fetchall()
+        best, best_score = None, NEAR_MATCH_THRESHOLD
+        for run_id, lineage, run_hash, run_params, work_dir, launch_dir, created_at in rows:
+            run = {"run_id": run_id, "lineage": lineage, "params": json.loads(run_params), "work_dir": work_dir,
+                   "launch_dir": launch_dir, "created_at": created_at}
+            if run_hash == digest:
+                return {**run, "match": "exact", "similarity": 1.0}
+            score = _similarity(run["params"], params)
+            if score >= best_score and (best is None or score > best_score):
+                best, best_score = run, score
+        return {**best, "match": "near", "similarity": round(best_score, 3)} if best else None
+
+    def record(self, pipeline_name: str, params: dict, work_dir: str, project: str | None = None,
+               config_digest: str | None = None, previous: dict | None = None, tenant: str | None = None) -> dict:
+        """
+        Records a new run under the configured `work_dir`, continuing
+        `previous`'s lineage (and dirs) if given. A new lineage's work dir is
+        allocated under the configured one.
+        """
+        pipeline, revision = split_pipeline_ref(pipeline_name)
+        run_id = uuid.uuid4().hex[:12]
+        lineage = previous["lineage"] if previous else run_id
+        launch_dir = previous["launch_dir"] if previous else str(self._dir / "launch" / lineage)
+        lineage_work_dir = previous["work_dir"] if previous else f"{work_dir.rstrip('/')}/{lineage}"
+        Path(launch_dir).mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO runs (run_id, lineage, pipeline, revision, project, params_hash, params, config_digest,"
+                " tenant, work_dir, configured_work_dir, owned, launch_dir, resumed_from, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?, ?, ?)",
+                (run_id, lineage, pipeline, revision, project, params_hash(params),
+                 json.dumps(canonical_params(params)), config_digest, tenant, lineage_work_dir, work_dir, launch_dir,
+                 previous["run_id"] if previous else None, time.time()))
+        return {"run_id": run_id, "lineage": lineage, "pipeline": pipeline, "revision": revision,
+                "work_dir": lineage_work_dir, "launch_dir": launch_dir}
+
+    def collect_garbage(self, dry_run: bool = False, delete=None) -> dict:
+        """
+        Deletes the launch dirs, and the work dirs the registry allocated, of
+        lineages with no run within the retention period, and forgets their
+        runs. Returns what was (or, with dry_run, would be) deleted.
+        """
+        if self._retention_days <= 0:
+            return {"deleted_work_dirs": [], "expired_lineages": 0}
+        if delete is None:
+            from tools.samplesheet_preflight import backend_for
+
+            def delete(uri):
+                backend_for(uri).delete_tree(uri)
+
+        cutoff = time.time() - self._retention_days * 24 * 60 * 60
+        with self._lock:
+            lineages = self._db.execute(
+                "SELECT lineage, work_dir, launch_dir, MIN(owned), MAX(created_at) FROM runs GROUP BY lineage").fetchall()
+        expired = [(lineage, work_dir, launch_dir) for lineage, work_dir, launch_dir, _, last in lineages if last < cutoff]
+        # Runs recorded before the registry allocated work dirs share the user's; those are kept.
+        kept_work_dirs = {work_dir for _, work_dir, _, owned, last in lineages if last >= cutoff or not owned}
+        deleted, errors = [], []
+        for lineage, work_dir, launch_dir in expired:
+            if dry_run:
+                if work_dir not in kept_work_dirs:
+                    deleted.append(work_dir)
+                continue
+            try:
+                if work_dir not in kept_work_dirs:
+                    delete(work_dir)
+                    deleted.append(work_dir)
+                shutil.rmtree(launch_dir, ignore_errors=True)
+            except Exception as e:
+                errors.append(f"{work_dir}: {e}")
+                continue  # Keep its runs so the next collection retries.
+            with self._lock:
+                self._db.execute("DELETE FROM runs WHERE lineage = ?", (lineage,))
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('last_gc', ?)", (str(time.time()),))
+        result = {"deleted_work_dirs": deleted, "expired_lineages": len(expired)}
+        if errors:
+            result["errors"] = errors
+        return result
+
+    def maybe_collect_garbage(self):
+        """Starts a background collection if none has run in the last GC interval."""
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'last_gc'").fetchone()
+            if row and time.time() - float(row[0]) < GC_INTERVAL_SECONDS:
+                return
+            if self._gc_thread is not None and self._gc_thread.is_alive():
+                return
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('last_gc', ?)", (str(time.time()),))
+            self._gc_thread = threading.Thread(target=self.collect_garbage, name="workdir_gc", daemon=True)
+            self._gc_thread.start()
+
+
+def register_nextflow_run(pipeline_name: str, params_json_path: str, nextflow_config_path: str) -> dict:
+    """
+    Records a configured run in the process-wide registry. The launch command
+    runs it in its lineage's work dir (`-w`), under the config's workDir,
+    which the config itself keeps. If the tenant's earlier run of the same
+    pipeline with the same workDir had the same or nearly the same params,
+    it continues that run's lineage (its work dir and launch dir) with
+    `-resume`: Nextflow's task hashes cover each task's inputs and script,
+    so only the tasks a changed param affects run again. Returns the run ID,
+    work dir and launch command, plus the predicted reuse.
+    """
+    from tools.sizing_engine import load_profile
+
+    params = json.loads(Path(params_json_path).read_text())
+    config = Path(nextflow_config_path).read_text()
+    settings = config_settings(config)
+    if settings["work_dir"] is None:
+        raise ValueError(f"{nextflow_config_path} sets no workDir.")
+    registry = get_run_registry()
+    tenant = current_tenant()
+    previous = registry.find_previous(pipeline_name, params, project=settings["project"],
+                                      configured_work_dir=settings["work_dir"], tenant=tenant)
+    run = registry.record(pipeline_name, params, settings["work_dir"], project=settings["project"],
+                          config_digest=hashlib.sha256(config.encode()).hexdigest()[:16], previous=previous,
+                          tenant=tenant)
+    registry.maybe_collect_garbage()
+
+    command = ["nextflow", "run", run["pipeline"], "-r", run["revision"], "-params-file", params_json_path,
+               "-c", nextflow_config_path, "-w", run["work_dir"]]
+    if previous:
+        # Nextflow finds the cached session in the launch dir's .nextflow directory.
+        command.append("-resume")
+    result = {
+        "run_id": run["run_id"],
+        "work_dir": run["work_dir"],
+        "configured_work_dir": settings["work_dir"],
+        "work_dir_note": f"Task files go to {run['work_dir']}, this run's own directory under the configured "
+                         f"workDir, so it can be resumed and cleaned up without touching anything else there.",
+        "resume": previous is not None,
+        "launch_command": f"cd {shlex.quote(run['launch_dir'])} && {shlex.join(command)}",
+    }
+    if previous:
+        result["resumed_from"] = {key: previous[key] for key in ("run_id", "match", "similarity")}
+        result["reuse"] = predict_reuse(load_profile(pipeline_name), changed_params(previous["params"], params))
+    return result
+
+
+_run_registry: RunRegistry | None = None
+_run_registry_lock = threading.Lock()
+
+
+def get_run_registry() -> RunRegistry:
+    """Returns the process-wide run registry."""
+    global _run_registry
+    if _run_registry is None:
+        with _run_registry_lock:
+            if _run_registry is None:
+                _run_registry = RunRegistry()
+    return _run_registry
@@ -0,0 +1,406 @@
+import asyncio
+import csv
+import itertools
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import TextIO
+
+from tools.cache_dir import cache_dir
+from tools.nf_core_schema_store import FETCH_TIMEOUT_SECONDS, SchemaStore
+
+INPUT_SCHEMA_URL = "https://raw.githubusercontent.com/{repo}/{revision}/assets/schema_input.json"
+
+DEFAULT_CONCURRENCY = 128  # Object existence checks in flight at once.
+MAX_REPORTED_ERRORS = 50  # Per kind; the totals are always reported.
+GCS_DELETE_BATCH = 100
+CACHE_MAX_ENTRIES = 200_000
+# Found objects rarely disappear; a missing one may be uploaded while the user fixes the sheet.
+FOUND_TTL_SECONDS = 60 * 60
+MISSING_TTL_SECONDS = 60
+# Rows parsed per worker-thread read; the sheet's stream may block (e.g. a GCS download).
+ROWS_PER_READ = 1000
+
+_FILE_FORMATS = {"file-path", "path", "directory-path"}
+
+
+def fetch_input_schema(pipeline_name: str, revision: str) -> dict:
+    """Downloads a pipeline's samplesheet schema (assets/schema_input.json) from GitHub."""
+    url = INPUT_SCHEMA_URL.format(repo=pipeline_name, revision=revision)
+    with urllib.request.urlopen(url, timeout=FETCH_TIMEOUT_SECONDS) as response:
+        return json.loads(response.read())
+
+
+def parse_input_schema(raw_schema: dict) -> dict:
+    """
+    Reduces a schema_input.json (a JSON schema for an array of rows) to
+    {"columns": {name: {"type", "pattern", "enum", "file"}}, "required": [...]}.
+    A column is a `file` column if its format is a path or it must exist.
+    """
+    items = raw_schema.get("items", raw_schema)
+    columns = {}
+    for name, spec in items.get("properties", {}).items():
+        types = [option.get("type") for option in spec.get("anyOf", [])] or [spec.get("type", "string")]
+        columns[name] = {
+            "type": next((t for t in types if t and t != "null"), "string"),
+            "pattern": spec.get("pattern"),
+            "enum": spec.get("enum"),
+            "file": spec.get("format") in _FILE_FORMATS or bool(spec.get("exists")),
+        }
+    return {"columns": columns, "required": list(items.get("required", []))}
+
+
+# Samplesheet schemas (assets/schema_input.json) for the pipelines that also
+# have mock parameter schemas in tools/nf_core_tools.py.
+MOCK_INPUT_SCHEMAS = {
+    "nf-core/rnaseq": {
+        "items": {
+            "type": "object",
+            "properties": {
+                "sample": {"type": "string", "pattern": "^\\S+$"},
+                "fastq_1": {"type": "string", "format": "file-path", "exists": True, "pattern": "^\\S+\\.f(ast)?q\\.gz$"},
+                "fastq_2": {"type": "string", "format": "file-path", "exists": True, "pattern": "^\\S+\\.f(ast)?q\\.gz$"},
+                "strandedness": {"type": "string", "enum": ["forward", "reverse", "unstranded", "auto"]},
+            },
+            "required": ["sample", "fastq_1", "strandedness"],
+        },
+    },
+    "nf-core/sarek": {
+        "items": {
+            "type": "object",
+            "properties": {
+                "patient": {"type": "string", "pattern": "^\\S+$"},
+                "sex": {"type": "string", "enum": ["XX", "XY", "NA"]},
+                "status": {"type": "integer", "enum": [0, 1]},
+                "sample": {"type": "string", "pattern": "^\\S+$"},
+                "lane": {"type": "string"},
+                "fastq_1": {"type": "string", "format": "file-path", "exists": True, "pattern": "^\\S+\\.f(ast)?q\\.gz$"},
+                "fastq_2": {"type": "string", "format": "file-path", "exists": True, "pattern": "^\\S+\\.f(ast)?q\\.gz$"},
+                "bam": {"type": "string", "format": "file-path", "exists": True, "pattern": "^\\S+\\.bam$"},
+                "cram": {"type": "string", "format": "file-path", "exists": True, "pattern": "^\\S+\\.cram$"},
+            },
+            "required": ["patient", "sample"],
+        },
+    },
+}
+
+
+def load_input_schema(pipeline_name: str, revision: str) -> dict:
+    if pipeline_name in MOCK_INPUT_SCHEMAS:
+        return MOCK_INPUT_SCHEMAS[pipeline_name]
+    return fetch_input_schema(pipeline_name, revision)
+
+
+_input_schema_store: SchemaStore | None = None
+_input_schema_store_lock = threading.Lock()
+
+
+def get_input_schema_store() -> SchemaStore:
+    """
+    Returns the process-wide store of parsed samplesheet schemas. Like the
+    pipeline schemas, they are keyed on the resolved release and kept in
+    memory and on disk; a branch revision is re-fetched after a TTL.
+    """
+    global _input_schema_store
+    if _input_schema_store is None:
+        with _input_schema_store_lock:
+            if _input_schema_store is None:
+                _input_schema_store = SchemaStore(loader=load_input_schema, parser=parse_input_schema,
+                                                  store_dir=cache_dir("input_schemas"))
+    return _input_schema_store
+
+
+def get_input_schema(pipeline_name: str, revision: str | None = None) -> dict:
+    """The parsed samplesheet schema for a pipeline release."""
+    return get_input_schema_store().get(pipeline_name, revision)
+
+
+# --- Storage backends ------------------------------------------------------
+
+class LocalStorage:
+    """Local (or mounted) filesystem paths and file:// URIs."""
+
+    @staticmethod
+    def _path(uri: str) -> str:
+        return uri.removeprefix("file://")
+
+    def open_text(self, uri: str) -> TextIO:
+        return open(self._path(uri), newline="")
+
+    async def exists(self, uri: str) -> bool:
+        return await asyncio.to_thread(os.path.exists, self._path(uri))
+
+    def delete_tree(self, uri: str):
+        shutil.rmtree(self._path(uri), ignore_errors=True)
+
+
+class GCSStorage:
+    """
+    gs:// URIs through google-cloud-storage. Existence checks are metadata
+    requests run on a dedicated thread pool sized for the validator's
+    concurrency, so thousands of objects are checked in a few round-trips'
+    time.
+    """
+
+    def __init__(self, client=None, max_workers: int = DEFAULT_CONCURRENCY):
+        self._client = client
+        self._client_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gcs_preflight")
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    try:
+                        from google.cloud import storage
+                    except ImportError as e:
+                        raise RuntimeError("Validating gs:// URIs needs the google-cloud-storage package.") from e
+                    self._client = storage.Client()
+        return self._client
+
+    def _blob(self, uri: str):
+        bucket, _, name = uri.removeprefix("gs://").partition("/")
+        return self.client.bucket(bucket).blob(name)
+
+    def open_text(self, uri: str) -> TextIO:
+        # Streams the object in chunks rather than downloading it first.
+        return self._blob(uri).open("r", newline="")
+
+    async def exists(self, uri: str) -> bool:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._blob(uri).exists)
+
+    def delete_tree(self, uri: str):
+        """Deletes every object under the prefix, in batches as the listing pages in."""
+        bucket_name, _, prefix = uri.removeprefix("gs://").partition("/")
+        bucket = self.client.bucket(bucket_name)
+        batch = []
+        for blob in self.client.list_blobs(bucket_name, prefix=prefix.rstrip("/") + "/"):
+            batch.append(blob)
+            if len(batch) == GCS_DELETE_BATCH:
+                bucket.delete_blobs(batch)
+                batch = []
+        if batch:
+            bucket.delete_blobs(batch)
+
+
+_backends = {"": LocalStorage(), "file": LocalStorage()}
+_backends_lock = threading.Lock()
+
+
+def register_backend(scheme: str, backend):
+    """Registers the storage backend for a URI scheme (e.g. a fake 'gs' backend in tests)."""
+    with _backends_lock:
+        _backends[scheme] = backend
+
+
+def backend_for(uri: str):
+    scheme = uri.split("://", 1)[0] if "://" in uri else ""
+    if scheme not in _backends and scheme == "gs":
+        with _backends_lock:
+            _backends.setdefault("gs", GCSStorage())
+    try:
+        return _backends[scheme]
+    except KeyError:
+        raise ValueError(f"No storage backend for '{scheme}://' URIs") from None
+
+
+# --- Existence cache -------------------------------------------------------
+
+class ExistenceCache:
+    """A bounded, process-wide cache of object existence by URI, with separate TTLs for found and missing."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self._entries: OrderedDict[str, tuple[bool, float]] = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def get(self, uri: str) -> bool | None:
+        with self._lock:
+            entry = self._entries.get(uri)
+            if entry is None:
+                return None
+            exists, checked_at = entry
+            if time.monotonic() - checked_at > (FOUND_TTL_SECONDS if exists else MISSING_TTL_SECONDS):
+                del self._entries[uri]
+                return None
+            self._entries.move_to_end(uri)
+            return exists
+
+    def put(self, uri: str, exists: bool):
+        with self._lock:
+            self._entries[uri] = (exists, time.monotonic())
+            self._entries.move_to_end(uri)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+existence_cache = ExistenceCache()
+
+
+# --- Validation ------------------------------------------------------------
+
+def _cell_error(value: str, spec: dict) -> str | None:
+    if spec["enum"] and value not in {str(option) for option in spec["enum"]}:
+        return f"must be one of {', '.join(map(str, spec['enum']))}"
+    if spec["type"] == "integer" and not re.fullmatch(r"-?\d+", value):
+        return "must be an integer"
+    if spec["type"] == "number":
+        try:
+            float(value)
+        except ValueError:
+            return "must be a number"
+    if spec["type"] == "boolean" and value.lower() not in ("true", "false"):
+        return "must be true or false"
+    if spec["pattern"] and not re.search(spec["pattern"], value):
+        return f"does not match {spec['pattern']}"
+    return None
+
+
+def _rows(stream: TextIO) -> csv.DictReader:
+    header = stream.readline()
+    delimiter = "\t" if "\t" in header else ","
+    reader = csv.DictReader(itertools.chain([header], stream), delimiter=delimiter)
+    reader.fieldnames  # Parses the header now, while still on the worker thread.
+    return reader
+
+
+def _open_rows(uri: str) -> tuple[TextIO, csv.DictReader]:
+    stream = backend_for(uri).open_text(uri)
+    try:
+        return stream, _rows(stream)
+    except BaseException:
+        stream.close()
+        raise
+
+
+async def validate_samplesheet(samplesheet_uri: str, input_schema: dict, concurrency: int = DEFAULT_CONCURRENCY,
+                               cache: ExistenceCache | None = existence_cache) -> dict:
+    """
+    Streams a samplesheet (CSV or TSV), validates every row against the
+    parsed input schema and checks that every referenced file exists, with
+    at most `concurrency` checks in flight. Relative paths are checked
+    relative to the samplesheet.
+    """
+    started = time.monotonic()
+    columns, required = input_schema["columns"], input_schema["required"]
+    file_columns = [name for name, spec in columns.items() if spec["file"]]
+    base = samplesheet_uri.rsplit("/", 1)[0] if "/" in samplesheet_uri else "."
+
+    semaphore = asyncio.Semaphore(concurrency)
+    checks: dict[str, asyncio.Task] = {}
+    known: dict[str, bool] = {}  # Answered from the cache.
+    references: dict[str, list[str]] = {}
+    row_errors: list[str] = []
+    row_error_count = 0
+    rows = 0
+
+    async def check(uri: str) -> bool:
+        async with semaphore:
+            exists = await backend_for(uri).exists(uri)
+        if cache is not None:
+            cache.put(uri, exists)
+        return exists
+
+    def row_error(message: str):
+        nonlocal row_error_count
+        row_error_count += 1
+        if len(row_errors) < MAX_REPORTED_ERRORS:
+            row_errors.append(message)
+
+    stream = None
+    try:
+        # Opening and reading may block (a GCS object streams in over the network), so both run in a
+        # worker thread, a chunk of rows at a time, while the checks for earlier rows are in flight.
+        stream, reader = await asyncio.to_thread(_open_rows, samplesheet_uri)
+        header = reader.fieldnames or []
+        missing_columns = [name for name in required if name not in header]
+        if missing_columns:
+            return {"valid": False, "error": f"Samplesheet is missing required columns: {', '.join(missing_columns)}",
+                    "columns": header}
+        line = 1
+        while chunk := await asyncio.to_thread(list, itertools.islice(reader, ROWS_PER_READ)):
+            for row in chunk:
+                line += 1
+                rows += 1
+                for name, spec in columns.items():
+                    value = (row.get(name) or "").strip()
+                    if not value:
+                        if name in required:
+                            row_error(f"line {line}: '{name}' is required")
+                        continue
+                    problem = _cell_error(value, spec)
+                    if problem:
+                        row_error(f"line {line}: '{name}' {problem}")
+                        continue
+                    if name in file_columns:
+                        uri = value if "://" in value or value.startswith("/") else f"{base}/{value}"
+                        where = references.setdefault(uri, [])
+                        if len(where) < 3:
+                            where.append(f"line {line} '{name}'")
+                        if uri not in checks and uri not in known:
+                            cached = cache.get(uri) if cache is not None else None
+                            if cached is not None:
+                                known[uri] = cached
+                            else:
+                                # Checks start while the rest of the sheet is still being read.
+                                checks[uri] = asyncio.create_task(check(uri))
+        results = dict(zip(checks, await asyncio.gather(*checks.values(), return_exceptions=True)))
+    except FileNotFoundError:
+        return {"valid": False, "error": f"Samplesheet not found: {samplesheet_uri}"}
+    except csv.Error as e:
+        return {"valid": False, "error": f"Samplesheet is not valid CSV/TSV: {e}"}
+    finally:
+        # Whatever ended the read early (a bad sheet, a storage error, cancellation), stop the checks in flight.
+        pending = [task for task in checks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        if stream is not None:
+            await asyncio.to_thread(stream.close)
+
+    results.update(known)
+    missing, check_errors = [], []
+    for uri, result in results.items():
+        if isinstance(result, Exception):
+            check_errors.append(f"{uri}: {result}")
+        elif not result:
+            missing.append(f"{uri} ({', '.join(references[uri])})")
+
+    return {
+        "valid": not (row_error_count or missing or check_errors) and rows > 0,
+        "rows": rows,
+        "objects_checked": len(results),
+        "cache_hits": len(known),
+        "missing_count": len(missing),
+        "missing": missing[:MAX_REPORTED_ERRORS],
+        "row_error_count": row_error_count,
+        "row_errors": row_errors,
+        **({"check_errors": check_errors[:MAX_REPORTED_ERRORS]} if check_errors else {}),
+        **({"error": "Samplesheet has no rows"} if rows == 0 else {}),
+        "elapsed_s": round(time.monotonic() - started, 2),
+    }
+
+
+async def preflight_samplesheet(samplesheet_uri: str, pipeline_name: str,
+                                concurrency: int = DEFAULT_CONCURRENCY) -> dict:
+    """Validates a samplesheet against its pipeline's schema; errors are reported in the result."""
+    try:
+        input_schema = await asyncio.to_thread(get_input_schema, pipeline_name)
+    except Exception as e:
+        return {"valid": False, "error": f"Could not load the samplesheet schema for {pipeline_name}: {e}"}
+    try:
+        return await validate_samplesheet(samplesheet_uri, input_schema, concurrency=concurrency)
+    except Exception as e:
+        return {"valid": False, "error": f"Could not validate {samplesheet_uri}: {e}"}
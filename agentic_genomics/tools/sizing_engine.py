@@ -0,0 +1,260 @@
+import csv
+import functools
+import json
+import math
+import re
+import statistics
+from pathlib import Path
+
+import numpy as np
+
+from tools.cost_engine import DEFAULT_DISK_SIZE_GB, DEFAULT_DISK_TYPE, SkuIndex, get_sku_index, parse_machine_type, region_of
+
+# Task resource profiles per pipeline: nf-core label requests plus the
+# historical run time and count of every process, and (for the run registry)
+# the params each process reads and the processes it runs after.
+PROFILES_PATH = Path(__file__).parent / "data" / "pipeline_profiles.json"
+
+# The shapes the solver chooses from: (family, shape, vCPU counts).
+CANDIDATE_SHAPES = [
+    ("e2", "standard", (2, 4, 8, 16, 32)), ("e2", "highmem", (2, 4, 8, 16)), ("e2", "highcpu", (2, 4, 8, 16, 32)),
+    ("n2", "standard", (2, 4, 8, 16, 32, 48, 64, 80)), ("n2", "highmem", (2, 4, 8, 16, 32, 48, 64, 80)),
+    ("n2", "highcpu", (2, 4, 8, 16, 32, 48, 64, 80)),
+    ("n2d", "standard", (2, 4, 8, 16, 32, 48, 64, 96)), ("n2d", "highmem", (2, 4, 8, 16, 32, 48, 64, 96)),
+    ("n2d", "highcpu", (2, 4, 8, 16, 32, 48, 64, 96)),
+    ("c2", "standard", (4, 8, 16, 30, 60)),
+]
+CANDIDATE_MACHINE_TYPES = [f"{family}-{shape}-{vcpus}" for family, shape, sizes in CANDIDATE_SHAPES for vcpus in sizes]
+
+DEFAULT_MAX_NODES = 64
+# Share of a node's allocatable capacity that scheduling actually fills.
+PACKING_EFFICIENCY = 0.85
+# Expected Spot preemptions per node-hour; a preempted task restarts from scratch,
+# so on average it loses half its run time.
+SPOT_PREEMPTIONS_PER_HOUR = 0.05
+# Headroom on a task's observed peak memory when a trace doesn't record its request.
+TRACE_MEMORY_HEADROOM = 1.2
+MAX_ALTERNATIVES = 3
+
+# GKE's kubelet and system reservations, as (up to GiB or vCPUs, fraction) tiers.
+_CPU_RESERVED_TIERS = [(1, 0.06), (1, 0.01), (2, 0.005), (math.inf, 0.0025)]
+_MEMORY_RESERVED_TIERS = [(4, 0.25), (4, 0.20), (8, 0.10), (112, 0.06), (math.inf, 0.02)]
+EVICTION_THRESHOLD_GB = 0.1
+
+_DURATION_PART = re.compile(r"(?P<value>[\d.]+)\s*(?P<unit>ms|d|h|m|s)")
+_MEMORY = re.compile(r"^(?P<value>[\d.]+)\s*(?P<unit>[KMGT]?B)$")
+_MEMORY_UNITS_GB = {"B": 1 / 1024 ** 3, "KB": 1 / 1024 ** 2, "MB": 1 / 1024, "GB": 1.0, "TB": 1024.0}
+_DURATION_UNITS_H = {"ms": 1 / 3_600_000, "s": 1 / 3600, "m": 1 / 60, "h": 1.0, "d": 24.0}
+
+
+def _reserved(amount: float, tiers: list[tuple[float, float]]) -> float:
+    reserved = 0.0
+    for size, fraction in tiers:
+        portion = min(amount, size)
+        reserved += portion * fraction
+        amount -= portion
+        if amount <= 0:
+            break
+    return reserved
+
+
+def allocatable(vcpus: int, memory_gb: float) -> tuple[float, float]:
+    """The vCPUs and GiB a GKE node of this size leaves for pods."""
+    return (vcpus - _reserved(vcpus, _CPU_RESERVED_TIERS),
+            memory_gb - _reserved(memory_gb, _MEMORY_RESERVED_TIERS) - EVICTION_THRESHOLD_GB)
+
+
+@functools.lru_cache(maxsize=1)
+def _profiles() -> dict:
+    return json.loads(PROFILES_PATH.read_text())
+
+
+def load_profile(pipeline_name: str) -> dict:
+    """
+    The pipeline's task profile, {"source", "tasks": [...]}, with each task's
+    label resolved to cpus and memory_gb. Pipelines without history get the
+    generic per-label profile.
+    """
+    profiles = _profiles()
+    name = pipeline_name.split("@", 1)[0]
+    name = name if "/" in name else f"nf-core/{name}"
+    profile = profiles["pipelines"].get(name, profiles["default"])
+    return {"source": profile["source"], "tasks": [_resolve(task, profiles["labels"]) for task in profile["tasks"]]}
+
+
+def _resolve(task: dict, labels: dict) -> dict:
+    defaults = labels.get(task.get("label"), labels["process_single"])
+    return {**defaults, **task}
+
+
+def _duration_hours(text: str) -> float:
+    """'1h 2m 3s', '850ms' or a plain millisecond count, in hours."""
+    text = text.strip()
+    if text.isdigit():
+        return int(text) / 3_600_000
+    return sum(float(m["value"]) * _DURATION_UNITS_H[m["unit"]] for m in _DURATION_PART.finditer(text))
+
+
+def _memory_gb(text: str) -> float | None:
+    text = text.strip()
+    if text.isdigit():
+        return int(text) / 1024 ** 3
+    match = _MEMORY.match(text)
+    return float(match["value"]) * _MEMORY_UNITS_GB[match["unit"]] if match else None
+
+
+def profile_from_trace(trace_path: str, samples: int) -> dict:
+    """
+    Builds a task profile from a Nextflow trace file (trace.txt) of an earlier
+    run with `samples` samples: per process, the median run time and the
+    requested cpus and memory (or the observed %cpu and peak RSS, with
+    headroom, if the trace doesn't record requests).
+    """
+    by_process: dict[str, list[dict]] = {}
+    with open(trace_path, newline="") as trace:
+        for row in csv.DictReader(trace, delimiter="\t"):
+            if row.get("status", "COMPLETED") not in ("COMPLETED", "CACHED"):
+                continue
+            # 'NFCORE_RNASEQ:RNASEQ:STAR_ALIGN (sample1)' -> 'STAR_ALIGN'
+            process = row["name"].split(" (", 1)[0].rsplit(":", 1)[-1]
+            by_process.setdefault(process, []).append(row)
+
+    tasks = []
+    for process, rows in by_process.items():
+        def median(values):
+            values = [v for v in values if v is not None]
+            return statistics.median(values) if values else None
+
+        cpus = median(int(r["cpus"]) for r in rows if r.get("cpus", "").isdigit())
+        if cpus is None:
+            cpus = median(math.ceil(float(r["%cpu"].rstrip("%") or 0) / 100) for r in rows if r.get("%cpu", "-") != "-")
+        memory = median(_memory_gb(r["memory"]) for r in rows if r.get("memory", "-") != "-")
+        if memory is None:
+            memory = median(_memory_gb(r["peak_rss"]) for r in rows if r.get("peak_rss", "-") != "-")
+            memory = memory * TRACE_MEMORY_HEADROOM if memory is not None else None
+        count = len(rows)
+        tasks.append({
+            "process": process,
+            "cpus": max(1, int(cpus or 1)),
+            "memory_gb": round(memory or 1.0, 2),
+            "hours": median(_duration_hours(r["realtime"]) for r in rows if r.get("realtime", "-") != "-") or 0.0,
+            **({"per_run": 1} if count == 1 and samples > 1 else {"per_sample": count / samples}),
+        })
+    if not tasks:
+        raise ValueError(f"No completed tasks in {trace_path}")
+    return {"source": f"Nextflow trace {trace_path} ({samples} samples)", "tasks": tasks}
+
+
+def recommend_cluster(profile: dict, samples: int, location: str, deadline_hours: float | None = None,
+                      budget_usd: float | None = None, max_nodes: int = DEFAULT_MAX_NODES,
+                      machine_types: list[str] | None = None, disk_size_gb: float = DEFAULT_DISK_SIZE_GB,
+                      index: SkuIndex | None = None) -> dict:
+    """
+    Chooses the machine type, node pool size and Spot setting that process
+    `samples` samples with the most samples per dollar, within the deadline
+    and budget if given. Every candidate is priced from the billing snapshot
+    in one vectorized pass, so the answer is deterministic and offline.
+
+    A run is modelled as the profile's tasks packed onto nodes by their
+    cpu/memory requests: it takes its node-hours spread over the nodes, but
+    never less than its critical path (every process once, in sequence). On
+    Spot nodes, each task's run time grows by the work expected to be lost to
+    preemptions.
+
+    Only the maximum node count is solved for. The blueprint has a single
+    node pool, so Spot is all-or-nothing rather than a mix, and the pool
+    always scales from zero (`min_node_count` 0) since nodes kept warm
+    between runs would only add cost.
+    """
+    index = index or get_sku_index()
+    region = region_of(location)
+    r = index.region_index(region)
+    machine_types = machine_types or CANDIDATE_MACHINE_TYPES
+
+    tasks = profile["tasks"]
+    cpus = np.array([t["cpus"] for t in tasks], dtype=float)
+    memory = np.array([t["memory_gb"] for t in tasks], dtype=float)
+    hours = np.array([t["hours"] for t in tasks], dtype=float)
+    count = np.array([t.get("per_sample", 0) * samples + t.get("per_run", 0) for t in tasks], dtype=float)
+
+    specs = [parse_machine_type(mt) for mt in machine_types]
+    capacity = np.array([allocatable(vcpus, mem) for _, vcpus, mem in specs])
+    # Tasks of each kind one node runs at once, shape (machine_types, tasks).
+    slots = np.minimum(np.floor(capacity[:, :1] / cpus), np.floor(capacity[:, 1:] / memory))
+    fits = (slots >= 1).all(axis=1)
+    slots = np.maximum(slots, 1)
+
+    # Axis 1 of everything below is Spot: [on-demand, spot].
+    rework = np.stack([np.ones_like(hours), 1 + SPOT_PREEMPTIONS_PER_HOUR * hours / 2])
+    task_hours = hours * rework
+    node_hours = (count * task_hours / slots[:, None, :]).sum(axis=2) / PACKING_EFFICIENCY
+    # One sample's processes run one after another, after the per-run ones (e.g. the genome index).
+    critical_path = np.where(count > 0, task_hours, 0).sum(axis=1)
+
+    family_idx = np.array([index.family_index(family) for family, _, _ in specs])
+    vcpus = np.array([v for _, v, _ in specs], dtype=float)
+    mem = np.array([m for _, _, m in specs], dtype=float)
+    disk = disk_size_gb * index.disk[DEFAULT_DISK_TYPE][r]
+    node_hourly = np.stack([vcpus * index.cpu[usage][family_idx, r] + mem * index.ram[usage][family_idx, r] + disk
+                            for usage in ("ondemand", "spot")], axis=1)
+
+    # Shape (machine_types, spot, node_counts).
+    nodes = np.arange(1, max_nodes + 1, dtype=float)
+    makespan = np.maximum(node_hours[..., None] / nodes, critical_path[None, :, None])
+    usd = (node_hourly[..., None] * nodes + index.cluster_fee[r]) * makespan
+    valid = fits[:, None, None] & ~np.isnan(usd)
+    within = valid.copy()
+    if deadline_hours is not None:
+        within &= makespan <= deadline_hours
+    if budget_usd is not None:
+        within &= usd <= budget_usd
+    if not valid.any():
+        raise ValueError("No candidate machine type fits the pipeline's largest task")
+    constraints_met = bool(within.any())
+    node_key = np.broadcast_to(nodes, usd.shape).ravel()
+    if constraints_met:
+        # Most samples per dollar, then the shorter run, then fewer nodes.
+        keys = (node_key, makespan.ravel(), np.where(within, -samples / usd, np.inf).ravel())
+    else:
+        # Nothing meets both; fall back to the fastest if there is a deadline, else the cheapest.
+        within = valid
+        primary, secondary = (makespan, usd) if deadline_hours is not None else (usd, makespan)
+        keys = (node_key, secondary.ravel(), np.where(valid, primary, np.inf).ravel())
+    order = np.lexsort(keys)
+
+    def describe(flat: int) -> dict:
+        m, s, n = np.unravel_index(flat, usd.shape)
+        return {
+            "machine_type": machine_types[m],
+            "max_node_count": int(nodes[n]),
+            "spot": bool(s),
+            "makespan_hours": round(float(makespan[m, s, n]), 2),
+            "total_usd": round(float(usd[m, s, n]), 2),
+            "samples_per_usd": round(float(samples / usd[m, s, n]), 3),
+        }
+
+    best = describe(order[0])
+    alternatives, seen = [], {best["machine_type"]}
+    for flat in order[1:]:
+        if len(alternatives) == MAX_ALTERNATIVES or not within.ravel()[flat]:
+            break
+        candidate = describe(flat)
+        if candidate["machine_type"] not in seen:
+            seen.add(candidate["machine_type"])
+            alternatives.append(candidate)
+
+    return {
+        "region": region,
+        "samples": samples,
+        "profile": profile["source"],
+        "tasks": int(count.sum()),
+        # Not solved for: the node pool scales to zero between runs; the cluster pool keeps the cluster itself.
+        "toolkit_variables": {"machine_type": best["machine_type"], "min_node_count": 0,
+                              "max_node_count": best["max_node_count"], "spot": best["spot"],
+                              "disk_size_gb": disk_size_gb},
+        "estimate": {k: best[k] for k in ("makespan_hours", "total_usd", "samples_per_usd")},
+        "constraints": {"deadline_hours": deadline_hours, "budget_usd": budget_usd, "met": constraints_met},
+        "alternatives": alternatives,
+        "configurations_compared": int(valid.sum()),
+        "prices_as_of": index.snapshot_date,
+    }
@@ -0,0 +1,40 @@
+from google.adk.tools import BaseTool, tool_code
+
+from tools.sizing_engine import DEFAULT_MAX_NODES, load_profile, profile_from_trace, recommend_cluster
+
+
+class RecommendClusterSizeTool(BaseTool):
+    """
+    A tool to size the cluster's node pool for a pipeline run from the
+    pipeline's task resource profile, instead of guessing from phrases like
+    'small compute cluster'.
+    """
+
+    def _get_declaration(self):
+        return tool_code(
+            name="recommend_cluster_size",
+            description="Chooses the machine type, node pool max size and Spot setting that process the samples with the most samples per dollar, within an optional deadline and budget. The blueprint has a single node pool, so Spot is all-or-nothing (no on-demand/Spot mix), and the pool always scales from zero (min_node_count is 0). Returns `toolkit_variables` to pass to create_cluster_toolkit_blueprint, plus the estimated run time and cost.",
+            parameters={
+                "pipeline_name": {"type": "string", "description": "The pipeline, e.g. 'nf-core/rnaseq'."},
+                "samples": {"type": "integer", "description": "The number of samples (samplesheet rows)."},
+                "location": {"type": "string", "description": "The GCP region or zone, e.g. 'us-central1'."},
+                "deadline_hours": {"type": "number", "description": "Optional: the run must finish within this many hours."},
+                "budget_usd": {"type": "number", "description": "Optional: the run must cost at most this many USD."},
+                "max_nodes": {"type": "integer", "description": f"Optional: the most nodes the pool may grow to (default {DEFAULT_MAX_NODES})."},
+                "trace_path": {"type": "string", "description": "Optional: a Nextflow trace.txt from an earlier run of this pipeline, to size from instead of the stored profile."},
+                "trace_samples": {"type": "integer", "description": "The number of samples in the traced run (required with trace_path)."},
+            },
+        )
+
+    def _run(self, pipeline_name: str, samples: int, location: str, deadline_hours: float = None,
+             budget_usd: float = None, max_nodes: int = DEFAULT_MAX_NODES, trace_path: str = None,
+             trace_samples: int = None) -> dict:
+        try:
+            if trace_path:
+                profile = profile_from_trace(trace_path, trace_samples or samples)
+            else:
+                profile = load_profile(pipeline_name)
+            return recommend_cluster(profile, samples, location, deadline_hours=deadline_hours,
+                                     budget_usd=budget_usd, max_nodes=max_nodes)
+        except Exception as e:
+            return {"error": f"Could not size the cluster: {e}"}
@@ -0,0 +1,286 @@
+import json
+import os
+import re
+from pathlib import Path
+from typing import Callable
+
+from tools.nextflow_config import config_settings, write_atomic
+from tools.offload import run_blocking
+from tools.result_cache import get_result_cache
+from tools.tenancy import scoped
+from tools.tracing import tracer
+from tools.workflow_context import split_request
+
+# Set to "1" to also reuse results cached for a sufficiently similar request.
+NEAR_DUPLICATES_ENV_VAR = "AGENTIC_GENOMICS_MEMO_NEAR_DUPLICATES"
+
+# Pipeline params that are the user's answers even when the schema doesn't mark them required.
+ANSWER_PARAMS = ("input", "outdir")
+
+PIPELINE_SELECTION_KEY = "pipeline_selection"
+CONFIGURATION_KEY = "configuration"
+BLUEPRINT_KEY = "blueprint"
+DEPLOYMENT_KEY = "deployment"
+
+# A trailing "." or "-" is punctuation, not part of the revision.
+PIPELINE_REF = re.compile(r"nf-core/[a-z0-9_-]+(?:@[\w./-]*\w)?")
+_JSON_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def parse_json_object(text: str) -> dict | None:
+    try:
+        value = json.loads(_JSON_FENCE.sub("", text.strip()))
+    except ValueError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def selected_pipeline(state) -> str | None:
+    """The 'nf-core/name@release' the pipeline scout selected, if any."""
+    from tools.nf_core_schema_store import pin_release
+
+    match = PIPELINE_REF.search(state.get(PIPELINE_SELECTION_KEY) or "")
+    return pin_release(match.group()) if match else None
+
+
+def pin_pipeline_selection(callback_context) -> None:
+    """
+    After-agent callback for the pipeline scout: rewrites a selection that
+    names no revision (e.g. 'nf-core/rnaseq') to the latest release, so the
+    selection that is cached, checkpointed and handed off names the release
+    that was used. A branch the user asked for (e.g. '@dev') is kept.
+    """
+    from tools.nf_core_schema_store import pin_release
+
+    selection = callback_context.state.get(PIPELINE_SELECTION_KEY) or ""
+    match = PIPELINE_REF.search(selection)
+    if match is not None and (pinned := pin_release(match.group())) != match.group():
+        callback_context.state[PIPELINE_SELECTION_KEY] = selection[:match.start()] + pinned + selection[match.end():]
+    return None
+
+
+def _selected_schema(state) -> dict | None:
+    from tools.nf_core_schema_store import get_schema_store
+
+    pipeline = selected_pipeline(state)
+    if pipeline is None:
+        return None
+    try:
+        return get_schema_store().get(pipeline)
+    except Exception:
+        return None
+
+
+def pipeline_context(state) -> str | None:
+    """
+    The cache context for stages that depend on the selected pipeline: its
+    revision and schema digest, so a new release or schema change misses.
+    """
+    schema = _selected_schema(state)
+    if schema is None:
+        return None  # Without a schema digest a cached configuration can't be trusted.
+    return f"{schema['pipeline']}@{schema['revision']}#{schema['schema_digest']}"
+
+
+# Characters that continue a path, URI or identifier; a value only counts as
+# stated if it isn't part of a longer one ('gs://b/work' doesn't state 'gs://b').
+_CONTINUES_BEFORE = r"(?<![\w./:@~+-])"
+_CONTINUES_AFTER = r"(?![\w/:@~+-]|\.[\w/])"
+
+
+def _stated_value(name: str, value, request: str) -> bool:
+    if isinstance(value, str):
+        text = value.rstrip("/") if len(value) > 1 else value
+        return re.search(f"{_CONTINUES_BEFORE}{re.escape(text)}/?{_CONTINUES_AFTER}", request) is not None
+    # A flag or number means nothing on its own ('1', 'false'); it must follow its
+    # param's name, e.g. 'skip_qc true', 'max_cpus=16' or '--pseudo_aligner salmon'.
+    param = name.removeprefix("params.")
+    return re.search(rf"\b{re.escape(param)}\b\W{{0,3}}{re.escape(json.dumps(value))}\b", request,
+                     re.IGNORECASE) is not None
+
+
+def _stated(answers: dict, request: str) -> bool:
+    """Whether the request states every answer as a whole value, not as part of a longer one."""
+    return all(_stated_value(name, value, request) for name, value in answers.items())
+
+
+class StageMemo:
+    """
+    Before/after agent callbacks that memoize an LlmAgent stage across
+    sessions in the persistent result cache.
+
+    After the stage runs, its final output (the agent's `output_key`) and the
+    contents of any files it points at are stored under the normalized user
+    request plus the stage's context. On a later hit the agent is skipped:
+    the files are re-created in the current run's work dir and the output is
+    returned with the new paths.
+
+    A stage whose result depends on answers the user gives while it runs
+    declares them in `_answers`; see ConfigurationMemo.
+
+    The cache and the files are SQLite and disk IO, so the callbacks do that
+    work in the "tools" pool (`tools.offload`), not on the event loop.
+    """
+
+    def __init__(self, stage: str, output_key: str, context: Callable[[dict], str | None] | None = None):
+        self.stage = stage
+        self.output_key = output_key
+        self._context = context
+        self.near_duplicates = os.environ.get(NEAR_DUPLICATES_ENV_VAR) == "1"
+
+    def _lookup_args(self, callback_context) -> tuple[str | None, str, str] | None:
+        parts = callback_context.user_content.parts if callback_context.user_content else []
+        work_dir, request = split_request("".join(part.text or "" for part in parts))
+        context = self._context(callback_context.state) if self._context else ""
+        if context is None:
+            return None
+        # One tenant's configuration (project, buckets, samplesheet) is never served to another.
+        return work_dir, request, scoped(context)
+
+    def _answers(self, captured: dict, state) -> dict | None:
+        """
+        The values the user supplied while the stage ran, from its captured
+        output; None if they can't be determined. The base stage has none.
+        """
+        return {}
+
+    def _accept(self, request: str) -> Callable[[dict], bool] | None:
+        return None
+
+    # Whether an entry may be served to a request worded differently (see ResultCache.get).
+    any_request = False
+
+    def _cached(self, callback_context) -> tuple[dict, str | None] | None:
+        """The cached entry and the current run's work dir; blocking."""
+        args = self._lookup_args(callback_context)
+        if args is None:
+            return None
+        work_dir, request, context = args
+        cached = get_result_cache().get(self.stage, request, context, near_duplicates=self.near_duplicates,
+                                        accept=self._accept(request), any_request=self.any_request)
+        return None if cached is None else (cached, work_dir)
+
+    async def lookup(self, callback_context) -> str | None:
+        """The cached output replayed into the current run, or None to run the stage."""
+        found = await run_blocking("tools", self._cached, callback_context)
+        if found is None:
+            return None
+        return await self._replay(*found, callback_context.state)
+
+    async def before_agent(self, callback_context):
+        from google.genai import types
+
+        output = await self.lookup(callback_context)
+        if output is None:
+            return None
+        callback_context.state[self.output_key] = output
+        callback_context.state[f"temp:memo_hit:{self.stage}"] = True
+        # A skipped agent gets no after-agent callbacks, so close its span here.
+        tracer.after_agent(callback_context, memo_hit=True)
+        return types.Content(role="model", parts=[types.Part(text=output)])
+
+    async def after_agent(self, callback_context) -> None:
+        if callback_context.state.get(f"temp:memo_hit:{self.stage}"):
+            return None
+        await run_blocking("tools", self._store, callback_context)
+        return None
+
+    def _store(self, callback_context):
+        output = callback_context.state.get(self.output_key)
+        args = self._lookup_args(callback_context)
+        if not output or args is None:
+            return
+        _, request, context = args
+        captured = self._capture(output)
+        answers = self._answers(captured, callback_context.state)
+        if answers is None:
+            return  # Can't tell which requests the result would be right for.
+        get_result_cache().put(self.stage, request, {**captured, "answers": answers}, context)
+
+    @staticmethod
+    def _capture(output: str) -> dict:
+        files = {}
+        data = parse_json_object(output) or {}
+        for key, value in data.items():
+            if isinstance(value, str) and Path(value).is_file():
+                files[key] = Path(value).read_text()
+        return {"output": output, "files": files}
+
+    async def _replay(self, cached: dict, work_dir: str | None, state) -> str | None:
+        if not cached["files"]:
+            return cached["output"]
+        if work_dir is None:
+            return None  # Nowhere to re-create the files; run the stage instead.
+        return await run_blocking("tools", self._restore_files, cached, work_dir)
+
+    @staticmethod
+    def _restore_files(cached: dict, work_dir: str) -> str:
+        data = parse_json_object(cached["output"])
+        for key, content in cached["files"].items():
+            path = Path(work_dir) / Path(data[key]).name
+            write_atomic(path, content)
+            data[key] = str(path)
+        return json.dumps(data)
+
+
+class ConfigurationMemo(StageMemo):
+    """
+    The configurator's memo. A configuration embodies the user's answers
+    (GCP project, region, workDir bucket, samplesheet and the pipeline's
+    other required params), which the agent normally asks for. Every
+    configuration is stored with its answers, however the user gave them,
+    and is served to any later request that states all the same values,
+    whatever its wording, so it can never hand one project's or dataset's
+    configuration to another.
+
+    A hit replays what the stage's tools would have done for the current run:
+    the samplesheet is validated again and the run is registered anew, so
+    the output carries its own run ID, work dir and launch command.
+    """
+
+    def _answers(self, captured: dict, state) -> dict | None:
+        config = captured["files"].get("nextflow_config_path")
+        params = parse_json_object(captured["files"].get("params_json_path") or "")
+        if config is None or params is None:
+            return None
+        answers = config_settings(config)
+        if None in answers.values():
+            return None
+        schema = _selected_schema(state)
+        names = [*ANSWER_PARAMS, *(schema["required"] if schema else [])]
+        answers.update({f"params.{name}": params[name] for name in names if params.get(name) is not None})
+        return answers
+
+    any_request = True
+
+    def _accept(self, request: str) -> Callable[[dict], bool]:
+        # Entries from before answers were recorded can't be checked, so they never match.
+        return lambda cached: "answers" in cached and _stated(cached["answers"], request)
+
+    async def _replay(self, cached: dict, work_dir: str | None, state) -> str | None:
+        from tools.run_registry import register_nextflow_run
+        from tools.samplesheet_preflight import preflight_samplesheet
+
+        output = await super()._replay(cached, work_dir, state)
+        pipeline = selected_pipeline(state)
+        data = parse_json_object(output or "")
+        if data is None or pipeline is None or not {"params_json_path", "nextflow_config_path"} <= data.keys():
+            return None
+        params = parse_json_object(await run_blocking("tools", Path(data["params_json_path"]).read_text)) or {}
+        if params.get("input"):
+            # The files may have changed since; a failing sheet needs the agent to walk the user through it.
+            preflight = await preflight_samplesheet(params["input"], pipeline)
+            if not preflight.get("valid"):
+                return None
+            data["samples"] = preflight["rows"]
+        try:
+            run = await run_blocking("tools", register_nextflow_run, pipeline, data["params_json_path"],
+                                     data["nextflow_config_path"])
+        except Exception:
+            return None
+        data.update(run_id=run["run_id"], work_dir=run["work_dir"], launch_command=run["launch_command"])
+        return json.dumps(data)
+
+
+pipeline_scout_memo = StageMemo("pipeline_scout", output_key=PIPELINE_SELECTION_KEY)
+configurator_memo = ConfigurationMemo("configurator", output_key=CONFIGURATION_KEY, context=pipeline_context)
@@ -0,0 +1,28 @@
+import contextvars
+from contextlib import contextmanager
+
+# The tenant the current turn runs for, set by the serving layer (main.py).
+# Context variables carry over into `run_blocking` workers, so tools and
+# callbacks deep in a workflow see it too. None outside the server (e.g.
+# `adk web`), where there is a single user.
+_tenant: contextvars.ContextVar[str | None] = contextvars.ContextVar("tenant", default=None)
+
+
+def current_tenant() -> str | None:
+    return _tenant.get()
+
+
+@contextmanager
+def tenant_scope(tenant: str | None):
+    """Runs the block on behalf of the tenant."""
+    token = _tenant.set(tenant)
+    try:
+        yield
+    finally:
+        _tenant.reset(token)
+
+
+def scoped(key: str) -> str:
+    """A cache key or context that only matches for the current tenant; unchanged without one."""
+    tenant = current_tenant()
+    return key if tenant is None else f"tenant:{tenant}\n{key}"
@@ -0,0 +1,199 @@
+import hashlib
+import os
+import re
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from tools.cache_dir import cache_dir
+from tools.nextflow_config import write_atomic
+
+# Set to "1" to force offline mode (providers from the filesystem mirror only).
+OFFLINE_ENV_VAR = "AGENTIC_GENOMICS_TERRAFORM_OFFLINE"
+REGISTRY_HOST = "registry.terraform.io"
+NETWORK_PROBE_TIMEOUT_SECONDS = 2
+# The probe blocks for up to its timeout, so its answer is reused for a while.
+NETWORK_PROBE_TTL_SECONDS = 5 * 60
+
+# Files `terraform init` produces that make a later init a no-op.
+INIT_ARTIFACTS = (".terraform", ".terraform.lock.hcl")
+
+_MODULE_BLOCK = re.compile(r'source\s*=\s*"(?P<source>[^"]+)"(?:\s*\n\s*version\s*=\s*"(?P<version>[^"]+)")?')
+_PROVIDER_BLOCK = re.compile(r'required_providers\s*{(?P<body>[^}]*(?:{[^}]*}[^}]*)*)}', re.S)
+
+
+def plugin_cache_dir() -> Path:
+    return cache_dir("terraform/plugin-cache")
+
+
+def provider_mirror_dir() -> Path:
+    """
+    A filesystem mirror of providers (`terraform providers mirror <dir>`
+    layout), used instead of the registry when there is no network. An
+    online init fills it for the blueprint's providers (see `needs_mirror`).
+    """
+    return cache_dir("terraform/provider-mirror")
+
+
+def _mirror_marker(blueprint_path: str) -> Path:
+    return cache_dir("terraform/provider-mirror-keys") / init_key(blueprint_path)
+
+
+def needs_mirror(blueprint_path: str) -> bool:
+    """Whether the blueprint's providers haven't been copied into the provider mirror yet."""
+    return not _mirror_marker(blueprint_path).exists()
+
+
+def mark_mirrored(blueprint_path: str):
+    _mirror_marker(blueprint_path).touch()
+
+
+def warm_pool_dir() -> Path:
+    return cache_dir("terraform/warm-init")
+
+
+_probe: tuple[float, bool] | None = None  # (probed at, offline)
+_probe_lock = threading.Lock()
+
+
+def is_offline() -> bool:
+    """
+    Whether the Terraform registry is unreachable. The probe's result is
+    cached for NETWORK_PROBE_TTL_SECONDS; it blocks, so async code should
+    call `terraform_env` through `asyncio.to_thread`.
+    """
+    global _probe
+    if os.environ.get(OFFLINE_ENV_VAR) == "1":
+        return True
+    with _probe_lock:
+        if _probe is None or time.monotonic() - _probe[0] > NETWORK_PROBE_TTL_SECONDS:
+            try:
+                socket.create_connection((REGISTRY_HOST, 443), timeout=NETWORK_PROBE_TIMEOUT_SECONDS).close()
+                offline = False
+            except OSError:
+                offline = True
+            _probe = (time.monotonic(), offline)
+        return _probe[1]
+
+
+def _write_cli_config(offline: bool) -> Path:
+    """
+    Writes the terraform CLI config that points provider installation at the
+    local mirror, either exclusively (offline) or in front of the registry.
+    """
+    mirror = provider_mirror_dir()
+    direct = "" if offline else "\n  direct {}"
+    config = f'provider_installation {{\n  filesystem_mirror {{\n    path = "{mirror}"\n  }}{direct}\n}}\n'
+    config_path = cache_dir("terraform") / ("offline.tfrc" if offline else "online.tfrc")
+    if not config_path.exists() or config_path.read_text() != config:
+        # Concurrent runs read it while another run rewrites it.
+        write_atomic(config_path, config)
+    return config_path
+
+
+def terraform_env(offline: bool | None = None) -> dict:
+    """
+    Returns the environment for terraform subprocesses: a shared plugin cache
+    so providers are downloaded once per machine, and a CLI config that
+    prefers the local provider mirror.
+    """
+    if offline is None:
+        offline = is_offline()
+    env = dict(os.environ)
+    env["TF_PLUGIN_CACHE_DIR"] = str(plugin_cache_dir())
+    # Lets the cache be used even when a lock file lists hashes for other platforms.
+    env["TF_PLUGIN_CACHE_MAY_BREAK_DEPENDENCY_LOCK_FILE"] = "true"
+    env["TF_CLI_CONFIG_FILE"] = str(_write_cli_config(offline))
+    env["TF_IN_AUTOMATION"] = "1"
+    return env
+
+
+def init_key(blueprint_path: str) -> str:
+    """
+    Keys a blueprint's init state on the module sources/versions and provider
+    requirements in its .tf files. Variable values don't affect `init`, so every
+    blueprint generated from the same template shares one warm entry.
+    """
+    pins = []
+    for tf_file in sorted(Path(blueprint_path).glob("*.tf")):
+        text = tf_file.read_text()
+        pins.extend(f"{m['source']}@{m['version'] or ''}" for m in _MODULE_BLOCK.finditer(text))
+        pins.extend(re.sub(r"\s+", " ", m["body"]).strip() for m in _PROVIDER_BLOCK.finditer(text))
+    return hashlib.sha256("\n".join(sorted(pins)).encode()).hexdigest()[:16]
+
+
+def _link_or_copy(src: str, dst: str):
+    # Module sources are never edited in place, so hard links are safe and
+    # avoid copying the (large) cluster-toolkit checkout on every run.
+    # Manifests like modules.json may be rewritten by init, so those are copied.
+    if src.endswith(".json"):
+        shutil.copy2(src, dst)
+        return
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _tree(path: Path) -> set[str]:
+    return {str(p.relative_to(path)) for p in path.rglob("*")}
+
+
+def restore_warm_init(blueprint_path: str) -> bool:
+    """
+    Populates the blueprint with a pre-initialized `.terraform` directory and
+    lock file, if the pool has one for its module versions. Module files are
+    hard-linked and provider binaries are symlinks into the plugin cache, so
+    this is cheap.
+
+    Returns True only if this call restored a complete copy of the entry, so
+    the caller may skip module installation (`init -get=false`). A blueprint
+    that already has a `.terraform` (from an earlier init, possibly partial)
+    is left for a normal init to complete.
+    """
+    entry = warm_pool_dir() / init_key(blueprint_path)
+    target = Path(blueprint_path)
+    if not (entry / ".terraform").is_dir() or (target / ".terraform").exists():
+        return False
+    try:
+        shutil.copytree(entry / ".terraform", target / ".terraform", symlinks=True, copy_function=_link_or_copy)
+        if (entry / ".terraform.lock.hcl").exists():
+            shutil.copy2(entry / ".terraform.lock.hcl", target / ".terraform.lock.hcl")
+        if _tree(target / ".terraform") == _tree(entry / ".terraform"):
+            return True
+    except OSError:
+        pass
+    # A partial copy would make `init -get=false` fail; start the init from scratch instead.
+    shutil.rmtree(target / ".terraform", ignore_errors=True)
+    (target / ".terraform.lock.hcl").unlink(missing_ok=True)
+    return False
+
+
+def save_warm_init(blueprint_path: str):
+    """
+    Adds a freshly initialized blueprint's init state to the pool. The entry
+    is staged in a temp dir and renamed into place, so concurrent runs never
+    see a half-copied `.terraform`.
+    """
+    entry = warm_pool_dir() / init_key(blueprint_path)
+    source = Path(blueprint_path)
+    if entry.exists() or not (source / ".terraform").is_dir():
+        return
+    staging = Path(tempfile.mkdtemp(prefix=f".{entry.name}.", dir=warm_pool_dir()))
+    try:
+        for name in INIT_ARTIFACTS:
+            if (source / name).is_dir():
+                shutil.copytree(source / name, staging / name, symlinks=True)
+            elif (source / name).exists():
+                shutil.copy2(source / name, staging / name)
+        staging.rename(entry)
+    except OSError:
+        # Another run saved the same key first; theirs is just as good.
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def clear_warm_pool():
+    shutil.rmtree(warm_pool_dir(), ignore_errors=True)
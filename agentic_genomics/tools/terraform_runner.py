@@ -0,0 +1,298 @@
+import asyncio
+import collections
+import os
+import re
+import signal
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from tools.cache_dir import cache_dir
+from tools.terraform_cache import (is_offline, mark_mirrored, needs_mirror, provider_mirror_dir,
+                                   restore_warm_init, save_warm_init, terraform_env)
+from tools.tracing import subprocess_span
+
+# Lets tests and benchmarks point at a fake `terraform` script.
+TERRAFORM_BIN_ENV_VAR = "AGENTIC_GENOMICS_TERRAFORM_BIN"
+
+DEFAULT_TIMEOUT_SECONDS = 45 * 60  # A GKE apply routinely takes 15+ minutes.
+INTERRUPT_GRACE_SECONDS = 30  # Time terraform gets to release its state lock after SIGINT.
+RING_BUFFER_LINES = 200
+# Longer output lines (e.g. a large JSON diagnostic) are truncated, not read whole.
+MAX_LINE_BYTES = 64 * 1024
+SUMMARY_TAIL_LINES = 20
+
+_ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+_RESOURCE_EVENT = re.compile(
+    r"^(?P<resource>\S+): (?P<action>Creation|Modifications|Destruction) complete after (?P<elapsed>\S+)"
+)
+_RESOURCE_STARTED = re.compile(r"^(?P<resource>\S+): (?P<action>Creating|Modifying|Destroying)\.\.\.")
+_APPLY_COMPLETE = re.compile(r"^Apply complete! Resources: (\d+) added, (\d+) changed, (\d+) destroyed")
+_DESTROY_COMPLETE = re.compile(r"^Destroy complete! Resources: (\d+) destroyed")
+
+EVENT_TYPES = {"Creation": "resource_created", "Modifications": "resource_modified", "Destruction": "resource_destroyed"}
+
+
+def terraform_bin() -> str:
+    return os.environ.get(TERRAFORM_BIN_ENV_VAR, "terraform")
+
+
+def _parse_progress(line: str) -> dict | None:
+    """Turns a terraform output line into a structured progress event, if it is one."""
+    match = _RESOURCE_EVENT.match(line)
+    if match:
+        return {"type": EVENT_TYPES[match["action"]], "resource": match["resource"], "took": match["elapsed"]}
+    match = _RESOURCE_STARTED.match(line)
+    if match:
+        return {"type": "resource_started", "resource": match["resource"], "action": match["action"].lower()}
+    match = _APPLY_COMPLETE.match(line)
+    if match:
+        added, changed, destroyed = (int(n) for n in match.groups())
+        return {"type": "apply_complete", "added": added, "changed": changed, "destroyed": destroyed}
+    match = _DESTROY_COMPLETE.match(line)
+    if match:
+        return {"type": "destroy_complete", "destroyed": int(match[1])}
+    return None
+
+
+class TerraformRun:
+    """
+    Runs one terraform command asynchronously, streaming stdout/stderr line by
+    line to a log file and a bounded ring buffer instead of holding the whole
+    output in memory.
+
+    Progress events (resource started/created, apply complete) are passed to
+    `on_event` as they happen, each stamped with the elapsed time. The run can
+    be stopped with `cancel()` or by a timeout; terraform first gets a SIGINT
+    so it can release its state lock, and is killed if it doesn't exit.
+    """
+
+    def __init__(self, args: list[str], cwd: str, log_path: Path, timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+                 on_event: Callable[[dict], None] | None = None, buffer_lines: int = RING_BUFFER_LINES,
+                 env: dict | None = None):
+        self.args = args
+        self.cwd = cwd
+        self.env = env
+        self.log_path = log_path
+        self.timeout_seconds = timeout_seconds
+        self.on_event = on_event
+        self.tail = collections.deque(maxlen=buffer_lines)
+        self.events: list[dict] = []
+        self._cancelled = asyncio.Event()
+        self._started_at = 0.0
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def _emit(self, event: dict):
+        event["elapsed_s"] = round(time.monotonic() - self._started_at, 1)
+        self.events.append(event)
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def _line(self, raw: bytes, name: str, log):
+        line = _ANSI_ESCAPE.sub("", raw.decode(errors="replace").rstrip())
+        log.write(f"[{name}] {line}\n")
+        self.tail.append(line if name == "stdout" else f"[stderr] {line}")
+        event = _parse_progress(line)
+        if event is not None:
+            self._emit(event)
+
+    async def _pump(self, stream: asyncio.StreamReader, name: str, log):
+        # Reads until EOF whatever the line lengths, so terraform never blocks on a full pipe.
+        partial = b""
+        while True:
+            try:
+                raw = await stream.readuntil(b"\n")
+            except asyncio.IncompleteReadError as e:
+                # EOF; the last line may have no newline.
+                if partial or e.partial:
+                    self._line((partial + e.partial)[:MAX_LINE_BYTES], name, log)
+                return
+            except asyncio.LimitOverrunError as e:
+                # A line longer than the reader's buffer: keep its start and drain the rest.
+                partial = (partial + await stream.read(e.consumed))[:MAX_LINE_BYTES]
+                continue
+            self._line((partial + raw)[:MAX_LINE_BYTES], name, log)
+            partial = b""
+
+    @staticmethod
+    async def _drain(pumps: asyncio.Future):
+        """Waits for the output pumps after the process was stopped, giving up after the grace period."""
+        try:
+            await asyncio.wait_for(pumps, INTERRUPT_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            pass  # wait_for cancelled them; a leftover child still holds the pipes.
+
+    async def _stop(self, process: asyncio.subprocess.Process):
+        if process.returncode is not None:
+            return
+        # Signal the whole process group so provider plugins stop too.
+        try:
+            os.killpg(process.pid, signal.SIGINT)
+            await asyncio.wait_for(process.wait(), INTERRUPT_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            os.killpg(process.pid, signal.SIGKILL)
+            await process.wait()
+        except ProcessLookupError:  # Exited on its own in the meantime.
+            await process.wait()
+
+    async def run(self) -> dict:
+        """Runs the command to completion, cancellation or timeout and returns a summary."""
+        with subprocess_span(" ".join(self.args[:2]), cwd=str(self.cwd)) as span_attributes:
+            summary = await self._run()
+            span_attributes.update(status=summary["status"], exit_code=summary["exit_code"])
+            return summary
+
+    async def _run(self) -> dict:
+        self._started_at = time.monotonic()
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        status = "failed"
+        with open(self.log_path, "a", buffering=1) as log:
+            log.write(f"$ {' '.join(self.args)}  (cwd={self.cwd})\n")
+            process = await asyncio.create_subprocess_exec(
+                *self.args, cwd=self.cwd, env=self.env, stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, start_new_session=True,
+            )
+            pumps = asyncio.gather(self._pump(process.stdout, "stdout", log), self._pump(process.stderr, "stderr", log))
+            cancelled = asyncio.ensure_future(self._cancelled.wait())
+            try:
+                done, _ = await asyncio.wait({pumps, cancelled}, timeout=self.timeout_seconds,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if pumps in done:
+                    # The output closed; the process gets the rest of the timeout to exit.
+                    remaining = max(self.timeout_seconds - (time.monotonic() - self._started_at), 0)
+                    try:
+                        await asyncio.wait_for(process.wait(), remaining)
+                        status = "succeeded" if process.returncode == 0 else "failed"
+                    except asyncio.TimeoutError:
+                        status = "timed_out"
+                        await self._stop(process)
+                else:
+                    status = "cancelled" if cancelled in done else "timed_out"
+                    await self._stop(process)
+                    await self._drain(pumps)
+            except asyncio.CancelledError:
+                # The caller's task was cancelled; don't leave terraform or the pumps running.
+                await self._stop(process)
+                await self._drain(pumps)
+                raise
+            finally:
+                cancelled.cancel()
+            log.write(f"# exit code {process.returncode}, status {status}\n")
+
+        return {
+            "command": " ".join(self.args[:2]),
+            "status": status,
+            "exit_code": process.returncode,
+            "elapsed_s": round(time.monotonic() - self._started_at, 1),
+            "events": len(self.events),
+            "tail": list(self.tail)[-SUMMARY_TAIL_LINES:],
+        }
+
+
+async def init_blueprint(blueprint_path: str, log_path: Path, timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+                         on_event: Callable[[dict], None] | None = None, env: dict | None = None) -> tuple[dict, bool]:
+    """
+    Runs `terraform init` against the shared plugin cache, starting from a
+    pre-initialized `.terraform` from the warm pool when one matches the
+    blueprint's module versions. A cold init that succeeds seeds the pool,
+    and the first successful online init of its module versions copies the
+    providers into the provider mirror, so later inits work offline.
+    Returns the run summary and whether the warm pool was used.
+    """
+    # Copying the warm entry and probing the network both block; keep them off the event loop.
+    warm = await asyncio.to_thread(restore_warm_init, blueprint_path)
+    args = [terraform_bin(), "init", "-input=false", "-no-color"]
+    if warm:
+        args.append("-get=false")  # Modules are already installed.
+    init = await TerraformRun(args, blueprint_path, log_path, timeout_seconds=timeout_seconds, on_event=on_event,
+                              env=env or await asyncio.to_thread(terraform_env)).run()
+    if init["status"] != "succeeded":
+        return init, warm
+    if not warm:
+        await asyncio.to_thread(save_warm_init, blueprint_path)
+    if await asyncio.to_thread(needs_mirror, blueprint_path) and not await asyncio.to_thread(is_offline):
+        # A failed mirror only costs offline mode; the next online init tries again.
+        mirror = await TerraformRun([terraform_bin(), "providers", "mirror", str(provider_mirror_dir())],
+                                    blueprint_path, log_path, timeout_seconds=timeout_seconds,
+                                    env=env or await asyncio.to_thread(terraform_env)).run()
+        if mirror["status"] == "succeeded":
+            await asyncio.to_thread(mark_mirrored, blueprint_path)
+    return init, warm
+
+
+def _log_path(blueprint_path: str, suffix: str = "") -> Path:
+    log_name = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}_{Path(blueprint_path).name}{suffix}.log"
+    return cache_dir("terraform_logs") / log_name
+
+
+async def apply_blueprint(blueprint_path: str, timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+                          on_event: Callable[[dict], None] | None = None) -> dict:
+    """
+    Runs `terraform init` and, if it succeeds, `terraform apply` in the
+    blueprint directory. Returns a compact summary with the resources that
+    were created and the path of the full log, not the raw output.
+    """
+    log_path = _log_path(blueprint_path)
+    deadline = time.monotonic() + timeout_seconds
+    binary = terraform_bin()
+    env = await asyncio.to_thread(terraform_env)
+
+    init, warm = await init_blueprint(blueprint_path, log_path, timeout_seconds=timeout_seconds, on_event=on_event, env=env)
+    if init["status"] != "succeeded":
+        return {"status": f"init_{init['status']}", "log_path": str(log_path), "init": init}
+
+    apply_run = TerraformRun([binary, "apply", "-auto-approve", "-input=false", "-no-color"], blueprint_path,
+                             log_path, timeout_seconds=max(deadline - time.monotonic(), 0), on_event=on_event, env=env)
+    apply = await apply_run.run()
+    created = [e["resource"] for e in apply_run.events if e["type"] == "resource_created"]
+    complete = next((e for e in apply_run.events if e["type"] == "apply_complete"), None)
+    summary = {
+        "status": apply["status"],
+        "exit_code": apply["exit_code"],
+        "elapsed_s": round(init["elapsed_s"] + apply["elapsed_s"], 1),
+        "resources_created": created,
+        "init": "warm" if warm else "cold",
+        "log_path": str(log_path),
+    }
+    if complete is not None:
+        summary["resources"] = {k: complete[k] for k in ("added", "changed", "destroyed")}
+    if apply["status"] != "succeeded":
+        summary["tail"] = apply["tail"]
+    return summary
+
+
+async def check_blueprint(blueprint_path: str, timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS) -> dict:
+    """
+    Checks that an applied blueprint's resources still exist and match its
+    config, with `terraform plan -detailed-exitcode` (exit 0: no changes).
+    Much cheaper than an apply, and makes no changes.
+    """
+    log_path = _log_path(blueprint_path, "_plan")
+    plan = await TerraformRun([terraform_bin(), "plan", "-detailed-exitcode", "-input=false", "-no-color",
+                               "-lock=false"], blueprint_path, log_path, timeout_seconds=timeout_seconds,
+                              env=await asyncio.to_thread(terraform_env)).run()
+    return {"healthy": plan["status"] == "succeeded", "exit_code": plan["exit_code"],
+            "elapsed_s": plan["elapsed_s"], "log_path": str(log_path)}
+
+
+async def destroy_blueprint(blueprint_path: str, timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+                            on_event: Callable[[dict], None] | None = None) -> dict:
+    """Runs `terraform destroy` in an applied blueprint directory and returns a compact summary."""
+    log_path = _log_path(blueprint_path, "_destroy")
+    destroy_run = TerraformRun([terraform_bin(), "destroy", "-auto-approve", "-input=false", "-no-color"],
+                               blueprint_path, log_path, timeout_seconds=timeout_seconds, on_event=on_event,
+                               env=await asyncio.to_thread(terraform_env))
+    destroy = await destroy_run.run()
+    summary = {
+        "status": destroy["status"],
+        "exit_code": destroy["exit_code"],
+        "elapsed_s": destroy["elapsed_s"],
+        "resources_destroyed": [e["resource"] for e in destroy_run.events if e["type"] == "resource_destroyed"],
+        "log_path": str(log_path),
+    }
+    if destroy["status"] != "succeeded":
+        summary["tail"] = destroy["tail"]
+    return summary
@@ -1,10 +1,89 @@
-import json
-import subprocess
-from datetime import datetime
+import asyncio
 from pathlib import Path
 
 from google.adk.tools import BaseTool, tool_code
 
+from tools.cluster_pool import get_cluster_pool, pool_enabled
+from tools.terraform_runner import DEFAULT_TIMEOUT_SECONDS, apply_blueprint
+from tools.project_limits import project_limiter
+from tools.tenancy import current_tenant
+from tools.tfvars import read_tfvars, render_tfvars
+from tools.workflow_runs import get_workflow_runs
+
+# main.tf that uses a GKE module from the cluster toolkit as an example.
+# A more advanced version could select different modules based on input.
+# Every blueprint shares this file, so they all share one warm `terraform init`.
+MAIN_TF_TEMPLATE = """
+module "gke_cluster" {
+  # This example uses the GKE module. Other modules like 'gce' could also be used.
+  source  = "GoogleCloudPlatform/cluster-toolkit/google//modules/gke"
+  version = "2.0.0" # Pin to a specific version for stability
+
+  project_id = var.project_id
+  location   = var.location
+  name       = var.cluster_name
+}
+
+# The node pool the pipeline's tasks run on, sized by `recommend_cluster_size`.
+module "gke_node_pool" {
+  source  = "GoogleCloudPlatform/cluster-toolkit/google//modules/compute/gke-node-pool"
+  version = "2.0.0"
+
+  project_id                  = var.project_id
+  cluster_id                  = module.gke_cluster.cluster_id
+  machine_type                = var.machine_type
+  autoscaling_total_min_nodes = var.min_node_count
+  autoscaling_total_max_nodes = var.max_node_count
+  spot                        = var.spot
+  disk_size_gb                = var.disk_size_gb
+}
+
+variable "project_id" {
+  type        = string
+  description = "The GCP project ID."
+}
+
+variable "location" {
+  type        = string
+  description = "The GCP location (region or zone)."
+}
+
+variable "cluster_name" {
+  type        = string
+  description = "The name of the GKE cluster."
+}
+
+variable "machine_type" {
+  type        = string
+  description = "The machine type of the pipeline node pool."
+  default     = "n2-standard-4"
+}
+
+variable "min_node_count" {
+  type        = number
+  description = "The fewest nodes the pipeline node pool scales down to."
+  default     = 3
+}
+
+variable "max_node_count" {
+  type        = number
+  description = "The most nodes the pipeline node pool scales up to."
+  default     = 3
+}
+
+variable "spot" {
+  type        = bool
+  description = "Whether the pipeline node pool uses Spot VMs."
+  default     = false
+}
+
+variable "disk_size_gb" {
+  type        = number
+  description = "The boot disk size of each node, in GB."
+  default     = 100
+}
+""".strip()
+
 
 class CreateClusterToolkitBlueprintTool(BaseTool):
     """
@@ -33,50 +112,9 @@ class CreateClusterToolkitBlueprintTool(BaseTool):
             bp_path = Path(blueprint_path)
             bp_path.mkdir(parents=True, exist_ok=True)
 
-            # Create a main.tf that uses a GKE module from the cluster toolkit as an example.
-            # A more advanced version could select different modules based on input.
-            main_tf_content = """
-module "gke_cluster" {
-  # This example uses the GKE module. Other modules like 'gce' could also be used.
-  source  = "GoogleCloudPlatform/cluster-toolkit/google//modules/gke"
-  version = "2.0.0" # Pin to a specific version for stability
-
-  project_id = var.project_id
-  location   = var.location
-  name       = var.cluster_name
-}
-
-variable "project_id" {
-  type        = string
-  description = "The GCP project ID."
-}
-
-variable "location" {
-  type        = string
-  description = "The GCP location (region or zone)."
-}
+            (bp_path / "main.tf").write_text(MAIN_TF_TEMPLATE)
 
-variable "cluster_name" {
-  type        = string
-  description = "The name of the GKE cluster."
-}
-"""
-            (bp_path / "main.tf").write_text(main_tf_content.strip())
-
-            # Create terraform.tfvars from the dictionary
-            tfvars_lines = [f"# Auto-generated by agentic_genomics on {datetime.now().isoformat()}"]
-            for key, value in toolkit_variables.items():
-                if isinstance(value, str):
-                    escaped_value = value.replace("\\", "\\\\").replace('"', '\\"')
-                    tfvars_lines.append(f'{key} = "{escaped_value}"')
-                elif isinstance(value, bool):
-                    tfvars_lines.append(f'{key} = {str(value).lower()}')
-                elif isinstance(value, (int, float)):
-                    tfvars_lines.append(f'{key} = {value}')
-                else:
-                    tfvars_lines.append(f"{key} = {json.dumps(value)}")
-
-            (bp_path / "terraform.tfvars").write_text("\n".join(tfvars_lines))
+            (bp_path / "terraform.tfvars").write_text(render_tfvars(toolkit_variables))
 
             return f"Successfully created Cluster Toolkit blueprint at {blueprint_path}"
         except Exception as e:
@@ -91,20 +129,59 @@ class ExecuteTerraformApplyTool(BaseTool):
     def _get_declaration(self):
         return tool_code(
             name="execute_terraform_apply",
-            description="Runs 'terraform init' and 'terraform apply' in a specified directory.",
+            description="Runs 'terraform init' and 'terraform apply' in a specified directory and returns a compact summary with the path to the full log. If an identical cluster is already running it is reused instead (`reused` is true).",
             parameters={"blueprint_path": {"type": "string", "description": "The path to the directory containing the Terraform blueprint."}},
         )
 
-    def _run(self, blueprint_path: str) -> str:
-        """Runs terraform init and apply, capturing output."""
+    def _run(self, blueprint_path: str) -> dict:
+        """Runs terraform init and apply, blocking until both finish."""
+        return asyncio.run(self._run_async(blueprint_path))
+
+    async def _run_async(self, blueprint_path: str, timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS, on_event=None) -> dict:
+        """
+        Runs terraform init and apply without blocking the event loop, streaming output to a log file.
+        A healthy cluster from an identical blueprint is leased from the cluster pool instead.
+        """
+        project_id = read_tfvars(blueprint_path).get("project_id", "default")
+
+        async def provision(path: str) -> dict:
+            # Concurrent workflow runs against one project queue here rather than hitting quota errors.
+            async with project_limiter.slot_async(project_id):
+                return await apply_blueprint(path, timeout_seconds=timeout_seconds, on_event=on_event)
+
         try:
-            # Run terraform init first and check its success
-            subprocess.run(["terraform", "init", "-input=false"], cwd=blueprint_path, capture_output=True, text=True, check=True)
-            apply_result = subprocess.run(["terraform", "apply", "-auto-approve", "-input=false"], cwd=blueprint_path, capture_output=True, text=True, check=True)
-            return f"Terraform apply successful.\nSTDOUT:\n{apply_result.stdout}"
-        except subprocess.CalledProcessError as e:
-            return f"Terraform command failed with exit code {e.returncode}.\nSTDOUT:\n{e.stdout}\nSTDERR:\n{e.stderr}"
+            if not pool_enabled():
+                return await provision(blueprint_path)
+            # A workflow run's lease lasts until the run is released or deleted, however long its pipeline runs.
+            holder = get_workflow_runs().run_containing(blueprint_path)
+            return await get_cluster_pool().lease(blueprint_path, provision, timeout_seconds=timeout_seconds,
+                                                  holder=holder, tenant=current_tenant())
         except FileNotFoundError:
-            return "Error: 'terraform' command not found. Is Terraform installed and in the system's PATH?"
+            return {"status": "error", "error": "'terraform' command not found. Is Terraform installed and in the system's PATH?"}
         except Exception as e:
-            return f"An unexpected error occurred: {e}"
\ No newline at end of file
+            return {"status": "error", "error": f"An unexpected error occurred: {e}"}
+
+
+class ReleaseClusterTool(BaseTool):
+    """
+    A tool to release a pooled cluster once its pipeline has finished.
+    """
+
+    def _get_declaration(self):
+        return tool_code(
+            name="release_cluster",
+            description="Releases the cluster a deployment workflow run leased, once the user's pipeline on it has finished or they no longer need it. The cluster is destroyed after it has been idle for a while, unless another run leases it first.",
+            parameters={"run_id": {"type": "string", "description": "The workflow run whose cluster leases to release."}},
+        )
+
+    def _run(self, run_id: str) -> dict:
+        """Ends the run's leases in the cluster pool."""
+        if not pool_enabled():
+            return {"status": "error", "error": "The cluster pool is disabled; there are no leases to release."}
+        # Another tenant's run counts as unknown, so its cluster can't be released from here.
+        if get_workflow_runs().owned(run_id) is None:
+            return {"status": "error", "error": f"Unknown workflow run '{run_id}'."}
+        released = get_cluster_pool().release_holder(run_id)
+        if not released:
+            return {"status": "error", "error": f"Workflow run '{run_id}' holds no cluster leases."}
+        return {"status": "released", "lease_ids": released}
@@ -0,0 +1,54 @@
+import json
+from datetime import datetime
+from pathlib import Path
+
+
+def render_tfvars(variables: dict) -> str:
+    """
+    Renders a dictionary as terraform.tfvars content, one variable per line.
+    Lists and maps are written as JSON, which is valid HCL.
+    """
+    tfvars_lines = [f"# Auto-generated by agentic_genomics on {datetime.now().isoformat()}"]
+    for key, value in variables.items():
+        if isinstance(value, str):
+            escaped_value = value.replace("\\", "\\\\").replace('"', '\\"')
+            tfvars_lines.append(f'{key} = "{escaped_value}"')
+        elif isinstance(value, bool):
+            tfvars_lines.append(f'{key} = {str(value).lower()}')
+        elif isinstance(value, (int, float)):
+            tfvars_lines.append(f'{key} = {value}')
+        else:
+            tfvars_lines.append(f"{key} = {json.dumps(value)}")
+    return "\n".join(tfvars_lines)
+
+
+def parse_tfvars(text: str) -> dict:
+    """
+    Parses terraform.tfvars content written by `render_tfvars` back into a
+    dictionary. Only the single-line forms that function emits are supported.
+    """
+    variables = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith(("#", "//")) or "=" not in line:
+            continue
+        key, _, raw = line.partition("=")
+        raw = raw.strip()
+        if raw in ("true", "false"):
+            value = raw == "true"
+        else:
+            try:
+                # Quoted strings, numbers, lists and maps are all valid JSON here.
+                value = json.loads(raw)
+            except ValueError:
+                value = raw
+        variables[key.strip()] = value
+    return variables
+
+
+def read_tfvars(blueprint_path: str) -> dict:
+    """Returns the variables in a blueprint's terraform.tfvars, or {} if it has none."""
+    try:
+        return parse_tfvars((Path(blueprint_path) / "terraform.tfvars").read_text())
+    except FileNotFoundError:
+        return {}
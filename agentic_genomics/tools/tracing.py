@@ -0,0 +1,387 @@
+import atexit
+import contextvars
+import hashlib
+import json
+import os
+import queue
+import resource
+import secrets
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+from tools.cache_dir import cache_dir
+
+# Tracing is on by default; set to "0" to disable it.
+TRACING_ENV_VAR = "AGENTIC_GENOMICS_TRACING"
+TRACE_DIR_ENV_VAR = "AGENTIC_GENOMICS_TRACE_DIR"
+# A trace file is rotated to `<name>.1` (then `.2`, ...) once it reaches this size.
+MAX_TRACE_FILE_BYTES = 64 * 1024 * 1024
+TRACE_FILE_BACKUPS = 3
+# Bounds on what the tracer keeps in memory for traces that never complete
+# (e.g. a run killed mid-flight); the oldest are summarized and dropped first.
+MAX_TRACKED_TRACES = 1000
+MAX_TRACKED_INVOCATIONS = 10000
+
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("agentic_genomics_span", default=None)
+
+
+def _payload_size(value) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(str(value))
+
+
+def _process_peak_rss_kb() -> int:
+    # This process's high-water mark since it started, not any one span's; ru_maxrss is in KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class Span:
+    """
+    One timed operation. Serialized in the OpenTelemetry span layout (hex
+    trace/span IDs, Unix-nanosecond timestamps, flat attributes), one JSON
+    object per line.
+    """
+
+    __slots__ = ("trace_id", "span_id", "parent_span_id", "name", "kind", "attributes", "start_ns", "end_ns", "status")
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_span_id: str | None, attributes: dict):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.status = {"code": "OK"}
+
+    def to_dict(self) -> dict:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "status": self.status,
+        }
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+
+class TraceWriter:
+    """
+    Appends JSON lines to the trace files from a background thread, keeping
+    each file open, so recording a span only enqueues a line. Files are
+    rotated once they reach `max_bytes`, keeping `backups` old ones.
+    """
+
+    def __init__(self, max_bytes: int = MAX_TRACE_FILE_BYTES, backups: int = TRACE_FILE_BACKUPS):
+        self._max_bytes = max_bytes
+        self._backups = backups
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def write(self, path: Path, line: str):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._drain, name="trace_writer", daemon=True)
+                    self._thread.start()
+        self._queue.put((path, line))
+
+    def flush(self, timeout: float | None = 10.0):
+        """Blocks until every line enqueued so far is written."""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _rotate(self, path: Path):
+        for i in range(self._backups - 1, 0, -1):
+            older = path.with_name(f"{path.name}.{i}")
+            if older.exists():
+                older.replace(path.with_name(f"{path.name}.{i + 1}"))
+        path.replace(path.with_name(f"{path.name}.1"))
+
+    def _drain(self):
+        files: dict[Path, object] = {}
+        while True:
+            item = self._queue.get()
+            if isinstance(item, threading.Event):
+                for f in files.values():
+                    f.flush()
+                item.set()
+                continue
+            path, line = item
+            try:
+                f = files.get(path)
+                if f is None:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    f = files[path] = open(path, "a")
+                f.write(line)
+                if f.tell() >= self._max_bytes:
+                    f.close()
+                    del files[path]
+                    self._rotate(path)
+                elif self._queue.empty():
+                    f.flush()
+            except OSError:
+                # Tracing must never take the workflow down; drop the line (e.g. the trace dir was removed).
+                stale = files.pop(path, None)
+                if stale is not None:
+                    stale.close()
+
+
+class Tracer:
+    """
+    Records spans for workflow runs, agent turns, model calls, tool calls and
+    subprocesses, and appends them to `spans.jsonl` in the trace directory.
+
+    Workflow code uses `span()`; agents get the ADK callbacks from
+    `callbacks()`, which time every sub-agent turn, every model call (with
+    token counts) and every tool call including `get_user_choice` waits. When a
+    root span ends and nothing else in its trace is still open, a per-trace
+    summary is written to `summaries.jsonl` and the trace is forgotten.
+
+    Spans are written by a background `TraceWriter`; call `flush()` before
+    reading the files.
+    """
+
+    def __init__(self, trace_dir: Path | None = None, enabled: bool | None = None):
+        self.enabled = os.environ.get(TRACING_ENV_VAR, "1") != "0" if enabled is None else enabled
+        self._trace_dir = trace_dir
+        self._lock = threading.Lock()
+        self._open: OrderedDict[tuple, Span] = OrderedDict()
+        # Finished spans per trace, and how many of each trace's spans are still open.
+        self._finished: OrderedDict[str, list[Span]] = OrderedDict()
+        self._open_counts: dict[str, int] = defaultdict(int)
+        # The span each ADK invocation's agent spans hang off, and the trace it belongs to.
+        self._invocation_parents: OrderedDict[str, tuple[Span | None, str]] = OrderedDict()
+        self._writer = TraceWriter()
+
+    def _write(self, record: dict, file_name: str = "spans.jsonl"):
+        trace_dir = self._trace_dir or Path(os.environ.get(TRACE_DIR_ENV_VAR) or cache_dir("traces"))
+        self._writer.write(trace_dir / file_name, json.dumps(record, default=str) + "\n")
+
+    def flush(self):
+        """Waits until every span and summary recorded so far is on disk."""
+        self._writer.flush()
+
+    def _start(self, name: str, kind: str, parent: Span | None, trace_id: str | None = None, **attributes) -> Span:
+        if parent is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            trace_id, parent_id = trace_id or secrets.token_hex(16), None
+        with self._lock:
+            self._open_counts[trace_id] += 1
+        return Span(name, kind, trace_id, parent_id, attributes)
+
+    def _finish(self, span: Span, error: BaseException | None = None):
+        span.end_ns = time.time_ns()
+        span.attributes["duration_ms"] = round(span.duration_ms, 3)
+        if error is not None:
+            span.status = {"code": "ERROR", "message": str(error)}
+        self._write(span.to_dict())
+        completed, evicted = None, []
+        with self._lock:
+            self._finished.setdefault(span.trace_id, []).append(span)
+            self._open_counts[span.trace_id] -= 1
+            if span.parent_span_id is None and self._open_counts[span.trace_id] <= 0:
+                completed = self._forget(span.trace_id)
+            while len(self._finished) > MAX_TRACKED_TRACES:
+                trace_id = next(iter(self._finished))
+                evicted.append((trace_id, self._forget(trace_id)))
+        if completed is not None:
+            self._write(self._summary(span.trace_id, completed, root=span), "summaries.jsonl")
+        for trace_id, spans in evicted:
+            self._write({**self._summary(trace_id, spans), "evicted": True}, "summaries.jsonl")
+
+    def _forget(self, trace_id: str) -> list[Span]:
+        """Drops everything kept for a trace and returns its finished spans. Holds the lock."""
+        self._open_counts.pop(trace_id, None)
+        for invocation_id, (_, invocation_trace) in list(self._invocation_parents.items()):
+            if invocation_trace == trace_id:
+                del self._invocation_parents[invocation_id]
+        return self._finished.pop(trace_id, [])
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes):
+        """Times the enclosed block as a child of the current span and yields its attribute dict."""
+        if not self.enabled:
+            yield {}
+            return
+        span = self._start(name, kind, _current_span.get(), **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span.attributes
+        except BaseException as e:
+            _current_span.reset(token)
+            self._finish(span, e)
+            raise
+        _current_span.reset(token)
+        self._finish(span)
+
+    def record_error(self, name: str, error: BaseException, kind: str = "internal", **attributes):
+        """Records a failure that no caller will see (e.g. in a background thread) as an error span."""
+        if self.enabled:
+            self._finish(self._start(name, kind, _current_span.get(), **attributes), error)
+
+    def summarize(self, trace_id: str) -> dict:
+        """Totals per agent, model, tool and subprocess for one run; forgets the run's spans."""
+        with self._lock:
+            spans = self._forget(trace_id)
+        return self._summary(trace_id, spans)
+
+    @staticmethod
+    def _summary(trace_id: str, spans: list[Span], root: Span | None = None) -> dict:
+        groups: dict[str, dict] = {}
+        for span in spans:
+            group = groups.setdefault(f"{span.kind}:{span.name}", defaultdict(int))
+            group["count"] += 1
+            group["total_ms"] += span.duration_ms
+            for key in ("tokens_in", "tokens_out", "args_bytes", "result_bytes", "cpu_user_s", "cpu_system_s"):
+                group[key] += span.attributes.get(key, 0) or 0
+            if span.kind == "model" and span.attributes.get("agent"):
+                # Also total the tokens per stage, whatever model each agent uses.
+                stage = groups.setdefault(f"agent:{span.attributes['agent']}", defaultdict(int))
+                stage["tokens_in"] += span.attributes.get("tokens_in", 0)
+                stage["tokens_out"] += span.attributes.get("tokens_out", 0)
+        return {
+            "traceId": trace_id,
+            **({"root": root.name, "kind": root.kind} if root is not None else {}),
+            "spans": len(spans),
+            "process_peak_rss_kb": _process_peak_rss_kb(),
+            "by_operation": {name: {k: v if k == "count" else round(v, 3) for k, v in g.items() if v}
+                             for name, g in sorted(groups.items())},
+        }
+
+    # --- ADK callbacks -----------------------------------------------------
+
+    @staticmethod
+    def _trace_id_for(trace_seed: str) -> str:
+        # Runs outside a workflow span get a trace ID derived from the invocation.
+        return hashlib.sha256(trace_seed.encode()).hexdigest()[:32]
+
+    def _begin(self, key: tuple, name: str, kind: str, parent: Span | None, trace_seed: str, **attributes):
+        if not self.enabled:
+            return
+        span = self._start(name, kind, parent, trace_id=self._trace_id_for(trace_seed), **attributes)
+        with self._lock:
+            self._open[key] = span
+            # Spans whose end callback never came (e.g. the run was killed) are dropped eventually.
+            while len(self._open) > MAX_TRACKED_INVOCATIONS:
+                _, lost = self._open.popitem(last=False)
+                self._open_counts[lost.trace_id] -= 1
+        return span
+
+    def _end(self, key: tuple, **attributes) -> Span | None:
+        with self._lock:
+            span = self._open.pop(key, None)
+        if span is not None:
+            span.attributes.update(attributes)
+            self._finish(span)
+        return span
+
+    def before_agent(self, callback_context):
+        if not self.enabled:
+            return None
+        invocation_id = callback_context.invocation_id
+        with self._lock:
+            if invocation_id not in self._invocation_parents:
+                current = _current_span.get()
+                trace_id = current.trace_id if current is not None else self._trace_id_for(invocation_id)
+                self._invocation_parents[invocation_id] = (current, trace_id)
+                while len(self._invocation_parents) > MAX_TRACKED_INVOCATIONS:
+                    self._invocation_parents.popitem(last=False)
+            parent = self._invocation_parents[invocation_id][0]
+        self._begin(("agent", invocation_id, callback_context.agent_name), callback_context.agent_name, "agent",
+                    parent, invocation_id)
+        return None
+
+    def after_agent(self, callback_context, **attributes):
+        """Ends the agent's span. Safe to call more than once (e.g. by a callback that short-circuits the agent)."""
+        self._end(("agent", callback_context.invocation_id, callback_context.agent_name), **attributes)
+        return None
+
+    def before_model(self, callback_context, llm_request):
+        agent_key = ("agent", callback_context.invocation_id, callback_context.agent_name)
+        with self._lock:
+            parent = self._open.get(agent_key)
+        self._begin(("model", callback_context.invocation_id, callback_context.agent_name),
+                    getattr(llm_request, "model", None) or "model", "model", parent, callback_context.invocation_id,
+                    agent=callback_context.agent_name,
+                    request_bytes=_payload_size(getattr(llm_request, "contents", None)))
+        return None
+
+    def after_model(self, callback_context, llm_response):
+        usage = getattr(llm_response, "usage_metadata", None)
+        self._end(("model", callback_context.invocation_id, callback_context.agent_name),
+                  tokens_in=getattr(usage, "prompt_token_count", 0) or 0,
+                  tokens_out=getattr(usage, "candidates_token_count", 0) or 0,
+                  response_bytes=_payload_size(getattr(llm_response, "content", None)))
+        return None
+
+    def before_tool(self, tool, args, tool_context):
+        agent_key = ("agent", tool_context.invocation_id, tool_context.agent_name)
+        with self._lock:
+            parent = self._open.get(agent_key)
+        self._begin(("tool", tool_context.invocation_id, getattr(tool_context, "function_call_id", None) or tool.name),
+                    tool.name, "tool", parent, tool_context.invocation_id, args_bytes=_payload_size(args))
+        return None
+
+    def after_tool(self, tool, args, tool_context, tool_response):
+        self._end(("tool", tool_context.invocation_id, getattr(tool_context, "function_call_id", None) or tool.name),
+                  result_bytes=_payload_size(tool_response))
+        return None
+
+    def callbacks(self, before_agent: list | None = None, after_agent: list | None = None) -> dict:
+        """
+        Keyword arguments that instrument an LlmAgent. Extra agent callbacks
+        (e.g. memoization) run after the tracing ones.
+        """
+        return {
+            "before_agent_callback": [self.before_agent, *(before_agent or [])],
+            "after_agent_callback": [self.after_agent, *(after_agent or [])],
+            "before_model_callback": [self.before_model],
+            "after_model_callback": [self.after_model],
+            "before_tool_callback": [self.before_tool],
+            "after_tool_callback": [self.after_tool],
+        }
+
+
+tracer = Tracer()
+atexit.register(tracer.flush)
+
+
+@contextmanager
+def subprocess_span(name: str, **attributes):
+    """
+    A span for a child process that also records its CPU time. Child rusage
+    is process-wide, so with concurrent subprocesses the CPU time is an upper
+    bound. There is no peak RSS: RUSAGE_CHILDREN only has the largest child
+    ever reaped, and asyncio reaps the child itself, so no per-PID figure.
+    """
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    with tracer.span(name, kind="subprocess", **attributes) as span_attributes:
+        try:
+            yield span_attributes
+        finally:
+            after = resource.getrusage(resource.RUSAGE_CHILDREN)
+            span_attributes["cpu_user_s"] = round(after.ru_utime - before.ru_utime, 3)
+            span_attributes["cpu_system_s"] = round(after.ru_stime - before.ru_stime, 3)
@@ -0,0 +1,24 @@
+import re
+
+# Prepended to the user's request by DeploymentWorkflowTool. This makes all
+# sub-agents aware of the unique path they should use for file I/O.
+REQUEST_PREFIX = "You are part of a workflow operating in the following run directory: '{work_dir}'. All file outputs must be written to this directory.\n\nUser request: "
+
+_PREFIX_PATTERN = re.compile(
+    re.escape(REQUEST_PREFIX).replace(re.escape("{work_dir}"), "(?P<work_dir>[^']*)"), re.S
+)
+
+
+def build_request(work_dir: str, request: str) -> str:
+    return REQUEST_PREFIX.format(work_dir=work_dir) + request
+
+
+def split_request(text: str) -> tuple[str | None, str]:
+    """
+    Splits a workflow request back into (work_dir, user request). Text that
+    wasn't built by `build_request` is returned as (None, text).
+    """
+    match = _PREFIX_PATTERN.match(text)
+    if match is None:
+        return None, text
+    return match["work_dir"], text[match.end():]
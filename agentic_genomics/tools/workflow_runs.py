@@ -0,0 +1,274 @@
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from tools.cache_dir import cache_dir
+from tools.nextflow_config import write_atomic
+from tools.stage_memo import (BLUEPRINT_KEY, CONFIGURATION_KEY, DEPLOYMENT_KEY, PIPELINE_SELECTION_KEY,
+                              parse_json_object)
+from tools.tenancy import current_tenant
+from tools.tracing import tracer
+from tools.workflow_context import split_request
+
+RETENTION_DAYS_ENV_VAR = "AGENTIC_GENOMICS_WORKFLOW_RUN_RETENTION_DAYS"
+DEFAULT_RETENTION_DAYS = 30  # 0 keeps run dirs forever.
+MANIFEST = "run.json"
+_RUN_ID = re.compile(r"[0-9a-f]{12}")
+
+# The workflow stages in order, with the session state key of each one's final output.
+STAGE_OUTPUT_KEYS = {
+    "pipeline_scout_agent": PIPELINE_SELECTION_KEY,
+    "configurator_agent": CONFIGURATION_KEY,
+    "blueprint_architect_agent": BLUEPRINT_KEY,
+    "deployment_engineer_agent": DEPLOYMENT_KEY,
+}
+
+COMPLETED = "completed"
+INCOMPLETE = "incomplete"
+FAILED = "failed"
+RUNNING = "running"
+
+
+def _stage_completed(stage: str, output: str) -> bool:
+    if not output:
+        return False
+    if stage == "deployment_engineer_agent":
+        # Only a successful apply completes the run; a cancelled or failed one is retried on resume.
+        return (parse_json_object(output) or {}).get("status") == "succeeded"
+    return True
+
+
+def _holds_terraform_state(run_dir: Path) -> bool:
+    for state_path in run_dir.rglob("terraform.tfstate"):
+        try:
+            if json.loads(state_path.read_text()).get("resources"):
+                return True
+        except (OSError, ValueError):
+            return True  # Can't tell what it tracks; keep it.
+    return False
+
+
+class WorkflowRuns:
+    """
+    Durable run directories for DeploymentWorkflowTool, one per run ID.
+
+    Each run's directory is its work dir (the agents write params.json,
+    nextflow.config and the blueprint there) and holds a `run.json` manifest
+    with the request and the checkpointed output of every completed stage.
+    Resuming a run re-enters the same directory, and `before_agent` skips
+    the stages that already completed.
+
+    A run belongs to the tenant that created it (`tools.tenancy`); only
+    that tenant can resume it.
+
+    Run dirs not updated within the retention period are deleted when a new
+    run is created, unless they hold the terraform state of resources that
+    still exist (an apply run in place, with the cluster pool disabled).
+    """
+
+    def __init__(self, path: Path | None = None, retention_days: float | None = None):
+        self._dir = path or cache_dir("workflow_runs")
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._retention_days = retention_days if retention_days is not None else float(
+            os.environ.get(RETENTION_DAYS_ENV_VAR, DEFAULT_RETENTION_DAYS))
+        self._lock = threading.Lock()
+        # Runs executing in this process; a run can't be resumed while it runs.
+        self._active: set[str] = set()
+
+    def _manifest_path(self, run_id: str) -> Path:
+        return self._dir / run_id / MANIFEST
+
+    def _read(self, run_id: str) -> dict:
+        return json.loads(self._manifest_path(run_id).read_text())
+
+    def _write(self, manifest: dict):
+        manifest["updated_at"] = time.time()
+        write_atomic(self._manifest_path(manifest["run_id"]), json.dumps(manifest, indent=2))
+
+    def create(self, request: str) -> dict:
+        """Creates a run dir for a new request and marks the run as running."""
+        self.prune()
+        run_id = uuid.uuid4().hex[:12]
+        (self._dir / run_id).mkdir()
+        manifest = {"run_id": run_id, "request": request, "work_dir": str(self._dir / run_id),
+                    "tenant": current_tenant(), "created_at": time.time(), "status": RUNNING, "stages": {}}
+        with self._lock:
+            self._write(manifest)
+            self._active.add(run_id)
+        return manifest
+
+    def resume(self, run_id: str) -> dict:
+        """Marks an existing, not currently running run of the current tenant as running again."""
+        if self.owned(run_id) is None:
+            raise KeyError(f"Unknown workflow run '{run_id}'.")
+        with self._lock:
+            if run_id in self._active:
+                raise ValueError(f"Workflow run '{run_id}' is already running.")
+            manifest = self._read(run_id)
+            if manifest["status"] == COMPLETED:
+                raise ValueError(f"Workflow run '{run_id}' already completed; start a new run instead.")
+            manifest.update(status=RUNNING, error=None)
+            self._write(manifest)
+            self._active.add(run_id)
+        return manifest
+
+    def finish(self, run_id: str, output: str | None = None, error: str | None = None) -> dict:
+        """Records the end of a run and returns its summary for the orchestrator."""
+        with self._lock:
+            self._active.discard(run_id)
+            manifest = self._read(run_id)
+            pending = [stage for stage in STAGE_OUTPUT_KEYS if stage not in manifest["stages"]]
+            manifest["status"] = FAILED if error else (INCOMPLETE if pending else COMPLETED)
+            manifest["error"] = error
+            self._write(manifest)
+        summary = {"run_id": run_id, "status": manifest["status"], "work_dir": manifest["work_dir"],
+                   "completed_stages": list(manifest["stages"])}
+        if output is not None:
+            summary["result"] = output
+        if error:
+            summary["error"] = error
+        if pending:
+            summary["next_stage"] = pending[0]
+        return summary
+
+    def get(self, run_id: str) -> dict | None:
+        if not _RUN_ID.fullmatch(run_id or "") or not self._manifest_path(run_id).is_file():
+            return None
+        return self._read(run_id)
+
+    def owned(self, run_id: str) -> dict | None:
+        """The run's manifest if the current tenant created it; another tenant's run counts as unknown."""
+        manifest = self.get(run_id)
+        return manifest if manifest is not None and manifest.get("tenant") == current_tenant() else None
+
+    def _run_for(self, work_dir: str | None) -> str | None:
+        if work_dir is None or Path(work_dir).parent != self._dir:
+            return None  # Not a durable run, e.g. a stage run on its own.
+        run_id = Path(work_dir).name
+        return run_id if _RUN_ID.fullmatch(run_id) and self._manifest_path(run_id).is_file() else None
+
+    def run_containing(self, path: str) -> str | None:
+        """The ID of the run whose dir holds the path (e.g. its blueprint), if any."""
+        resolved = Path(path).resolve()
+        if not resolved.is_relative_to(self._dir.resolve()) or resolved == self._dir.resolve():
+            return None
+        return self._run_for(str(self._dir / resolved.relative_to(self._dir.resolve()).parts[0]))
+
+    def checkpoint(self, run_id: str, stage: str, output: str) -> bool:
+        """Records a stage's final output if it completed the stage."""
+        if not _stage_completed(stage, output):
+            return False
+        with self._lock:
+            manifest = self._read(run_id)
+            # A stage re-run because its files were gone replaces its old checkpoint.
+            if manifest["stages"].get(stage, {}).get("output") != output:
+                manifest["stages"][stage] = {"output": output, "completed_at": time.time()}
+                self._write(manifest)
+        return True
+
+    def checkpointed_output(self, run_id: str, stage: str) -> str | None:
+        """A completed stage's output, unless a file or dir it points at in the run dir is gone."""
+        with self._lock:
+            checkpoint = self._read(run_id)["stages"].get(stage)
+        if checkpoint is None:
+            return None
+        run_dir = self._dir / run_id
+        for value in (parse_json_object(checkpoint["output"]) or {}).values():
+            if isinstance(value, str) and Path(value).is_relative_to(run_dir) and not Path(value).exists():
+                return None
+        return checkpoint["output"]
+
+    def prune(self) -> list[str]:
+        """Deletes the dirs of runs not updated within the retention period that hold no live terraform state."""
+        if self._retention_days <= 0:
+            return []
+        cutoff = time.time() - self._retention_days * 24 * 60 * 60
+        pruned = []
+        for manifest_path in self._dir.glob(f"*/{MANIFEST}"):
+            run_id = manifest_path.parent.name
+            try:
+                expired = json.loads(manifest_path.read_text())["updated_at"] < cutoff
+            except (OSError, ValueError, KeyError):
+                continue
+            # Deleting the state would orphan the cluster it tracks; it goes once the cluster is destroyed.
+            if expired and run_id not in self._active and not _holds_terraform_state(manifest_path.parent):
+                shutil.rmtree(manifest_path.parent, ignore_errors=True)
+                pruned.append(run_id)
+        return pruned
+
+    def _stage_args(self, callback_context) -> tuple[str, str] | None:
+        stage = callback_context.agent_name
+        if stage not in STAGE_OUTPUT_KEYS:
+            return None
+        parts = callback_context.user_content.parts if callback_context.user_content else []
+        run_id = self._run_for(split_request("".join(part.text or "" for part in parts))[0])
+        return (run_id, stage) if run_id else None
+
+    def restore(self, callback_context) -> str | None:
+        """
+        The stage's output, restored into session state, if the run already
+        completed it; None to run the stage. Also checkpoints earlier stages
+        that finished without after-agent callbacks (e.g. replayed from the
+        stage result cache).
+        """
+        args = self._stage_args(callback_context)
+        if args is None:
+            return None
+        run_id, stage = args
+        state = callback_context.state
+        for earlier in list(STAGE_OUTPUT_KEYS)[:list(STAGE_OUTPUT_KEYS).index(stage)]:
+            if state.get(STAGE_OUTPUT_KEYS[earlier]):
+                self.checkpoint(run_id, earlier, state[STAGE_OUTPUT_KEYS[earlier]])
+        output = self.checkpointed_output(run_id, stage)
+        if output is None:
+            return None
+        state[STAGE_OUTPUT_KEYS[stage]] = output
+        # A skipped agent gets no after-agent callbacks, so close its span here.
+        tracer.after_agent(callback_context, checkpoint_hit=True)
+        return output
+
+    def before_agent(self, callback_context):
+        """Skips the stage if the run already completed it (see `restore`)."""
+        output = self.restore(callback_context)
+        if output is None:
+            return None
+        from google.genai import types
+
+        return types.Content(role="model", parts=[types.Part(text=output)])
+
+    def after_agent(self, callback_context) -> None:
+        args = self._stage_args(callback_context)
+        if args is None:
+            return None
+        run_id, stage = args
+        output = callback_context.state.get(STAGE_OUTPUT_KEYS[stage])
+        if output:
+            self.checkpoint(run_id, stage, output)
+        return None
+
+
+_workflow_runs: WorkflowRuns | None = None
+_workflow_runs_lock = threading.Lock()
+
+
+def get_workflow_runs() -> WorkflowRuns:
+    """Returns the process-wide workflow run store."""
+    global _workflow_runs
+    if _workflow_runs is None:
+        with _workflow_runs_lock:
+            if _workflow_runs is None:
+                _workflow_runs = WorkflowRuns()
+    return _workflow_runs
+
+
+def checkpoint_before_agent(callback_context):
+    return get_workflow_runs().before_agent(callback_context)
+
+
+def checkpoint_after_agent(callback_context):
+    return get_workflow_runs().after_agent(callback_context)